@@ -1,18 +1,20 @@
 import uuid
+import asyncio
 import re
+import json
 import shutil
 import logging
 from pathlib import Path
 from datetime import datetime
-from fastapi import APIRouter, File, HTTPException, UploadFile, BackgroundTasks, Request
+from fastapi import APIRouter, File, HTTPException, UploadFile, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse
 from app.models.avatar import (
     PhotoUploadResponse, AvatarGenerateRequest, AvatarJobStatus, 
-    AvatarSystemInfo, BatchAvatarRequest
+    AvatarSystemInfo, BatchAvatarRequest, AvatarLiveRequest
 )
 from app.config import settings
 from app.utils.state_manager import state
 import app.services.instances as instances
-from app.tasks import run_avatar_generation_task, run_batch_avatar_task
 
 logger = logging.getLogger(__name__)
 
@@ -31,13 +33,13 @@ async def get_avatar_system_info():
 
 @router.post("/force-unlock")
 async def force_unlock_avatar():
-    """Force release the avatar generation lock."""
+    """Cancel every running avatar render (queued jobs keep their place)."""
     if not instances.avatar_service:
         raise HTTPException(status_code=503, detail="Avatar service not available")
     
-    instances.avatar_service.release_lock(user_id="admin_force")
-    logger.warning("Avatar generation lock has been forcibly released by user.")
-    return {"status": "unlocked", "message": "System lock forced released"}
+    cancelled = instances.avatar_service.render_queue.cancel_running()
+    logger.warning(f"Running avatar renders forcibly cancelled by user ({cancelled}).")
+    return {"status": "unlocked", "message": f"Cancelled {cancelled} running render(s)"}
 
 @router.post("/upload-photo", response_model=PhotoUploadResponse)
 async def upload_avatar_photo(file: UploadFile = File(...)):
@@ -94,7 +96,7 @@ async def upload_avatar_photo(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Failed to upload photo: {exc}")
 
 @router.post("/generate")
-async def generate_avatar_video(request: AvatarGenerateRequest, background_tasks: BackgroundTasks):
+async def generate_avatar_video(request: AvatarGenerateRequest):
     """Generate single avatar video."""
     if not instances.avatar_service:
         raise HTTPException(status_code=503, detail="Avatar service not available")
@@ -116,15 +118,6 @@ async def generate_avatar_video(request: AvatarGenerateRequest, background_tasks
             else:
                 raise HTTPException(status_code=404, detail=f"Photo {request.photo_id} not found")
     
-    # Check for concurrency lock
-    if not instances.avatar_service.acquire_lock(user_id=request.photo_id, message="Generating Single Video"):
-        busy_msg = instances.avatar_service._busy_message or "System Busy"
-        raise HTTPException(status_code=409, detail=f"System is busy: {busy_msg}")
-    else: # Indentation fix for the 'else' block of 'if not photo_data' is NOT needed? 
-          # Wait, the original code had 'else: raise'. 
-          # My new block handles the raise inside the 'else' of 'if matches'.
-          pass
-    
     raw_audio_path = request.audio_path.lstrip("/\\")
     audio_path = Path(raw_audio_path)
     if not audio_path.is_absolute():
@@ -139,18 +132,25 @@ async def generate_avatar_video(request: AvatarGenerateRequest, background_tasks
     output_path = request.output_path or str(settings.OUTPUT_DIR / f"avatar_{job_id}.mp4")
     
     state.add_ppt_job(f"avatar_{job_id}", {
-        "job_id": job_id, "type": "avatar", "status": "processing",
-        "progress": 0, "message": "Starting avatar generation...", "video_url": None
+        "job_id": job_id, "type": "avatar", "status": "queued",
+        "progress": 0, "message": "Waiting in render queue...", "video_url": None
     })
     
-    background_tasks.add_task(
-        run_avatar_generation_task, job_id, photo_data["path"], str(audio_path), output_path, request.dict()
+    # Short previews jump ahead of full renders
+    priority = 0 if request.preview_duration else request.priority
+    position = await instances.avatar_service.render_queue.submit(
+        job_id, "avatar",
+        {
+            "job_id": job_id, "photo_path": photo_data["path"], "audio_path": str(audio_path),
+            "output_path": output_path, "options": request.dict()
+        },
+        priority=priority
     )
     
-    return {"job_id": job_id, "status": "processing"}
+    return {"job_id": job_id, "status": "queued", "queue_position": position}
 
 @router.post("/generate-batch")
-async def generate_avatar_batch(request: Request, background_tasks: BackgroundTasks):
+async def generate_avatar_batch(request: Request):
     """Start batch avatar generation."""
     import logging
     logger = logging.getLogger(__name__)
@@ -217,15 +217,10 @@ async def generate_avatar_batch(request: Request, background_tasks: BackgroundTa
                     logger.error(f"Fallback failed: {e}")
                     raise HTTPException(status_code=404, detail="Photo not found")
 
-    # Check for concurrency lock
-    if not instances.avatar_service.acquire_lock(user_id=photo_id, message="Batch Generation"):
-        busy_msg = instances.avatar_service._busy_message or "System Busy"
-        raise HTTPException(status_code=409, detail=f"System is busy: {busy_msg}")
-
     job_id = str(uuid.uuid4())
     state.add_ppt_job(f"avatar_batch_{job_id}", {
-        "job_id": job_id, "type": "avatar_batch", "status": "processing",
-        "progress": 0, "message": "Starting batch generation...", "results": []
+        "job_id": job_id, "type": "avatar_batch", "status": "queued",
+        "progress": 0, "message": "Waiting in render queue...", "results": []
     })
 
     # Get Client IP for logging
@@ -233,13 +228,113 @@ async def generate_avatar_batch(request: Request, background_tasks: BackgroundTa
     # Sanitize IP for filename
     safe_ip = client_ip.replace(":", "_")
     
-    background_tasks.add_task(run_batch_avatar_task, job_id, photo_data["path"], audio_paths, raw_data, safe_ip)
-    return {"job_id": job_id, "status": "processing"}
+    try:
+        priority = int(raw_data.get("priority", 1))
+    except (TypeError, ValueError):
+        priority = 1
+    position = await instances.avatar_service.render_queue.submit(
+        job_id, "avatar_batch",
+        {
+            "job_id": job_id, "image_path": photo_data["path"], "audio_paths": audio_paths,
+            "options": raw_data, "log_ip": safe_ip
+        },
+        priority=priority
+    )
+    return {"job_id": job_id, "status": "queued", "queue_position": position}
+
+async def _close_live_input_when_finished(service, job_id: str):
+    """Drop the buffered audio input of a live job once it has finished or was cancelled"""
+    try:
+        await service.render_queue.wait(job_id)
+    finally:
+        service.close_live_input(job_id)
+
+@router.websocket("/live")
+async def avatar_live(websocket: WebSocket):
+    """
+    Real-time avatar generation.
+    1. client sends AvatarLiveRequest (JSON)
+    2. server replies {"job_id", "status": "queued", "queue_position", "stream_url"}
+    3. client streams audio as binary messages (16 kHz mono int16 PCM), then {"event": "end"}
+    Frames are rendered as the audio arrives; poll /job/{job_id}/status or play stream_url.
+    """
+    await websocket.accept()
+    if not instances.avatar_service:
+        await websocket.close(code=1013, reason="Avatar service not available")
+        return
+
+    try:
+        request = AvatarLiveRequest(**await websocket.receive_json())
+    except Exception as e:
+        await websocket.close(code=1003, reason=f"Invalid request: {e}")
+        return
+
+    photo_data = state.get_uploaded_file(f"avatar_{request.photo_id}")
+    photo_path = photo_data["path"] if photo_data else settings.UPLOAD_DIR / request.photo_id
+    if not Path(photo_path).exists():
+        await websocket.close(code=1003, reason=f"Photo {request.photo_id} not found")
+        return
+
+    service = instances.avatar_service
+    job_id = str(uuid.uuid4())
+    output_path = request.output_path or str(settings.OUTPUT_DIR / f"avatar_live_{job_id}.mp4")
+    stream_url = f"/api/avatar/job/{job_id}/stream/index.m3u8"
+    state.add_ppt_job(f"avatar_live_{job_id}", {
+        "job_id": job_id, "type": "avatar_live", "status": "queued",
+        "progress": 0, "message": "Waiting in render queue..."
+    })
+    state.update_ppt_job(f"avatar_live_{job_id}", {"stream_url": stream_url})
+
+    # audio sent while the job is still queued is buffered
+    service.open_live_input(job_id)
+    try:
+        position = await service.render_queue.submit(
+            job_id, "avatar_live",
+            {"job_id": job_id, "photo_path": str(photo_path), "output_path": output_path, "options": request.dict()},
+            priority=0
+        )
+    except Exception:
+        service.close_live_input(job_id)
+        raise
+    # the render closes its input itself; a job cancelled while queued never starts
+    asyncio.create_task(_close_live_input_when_finished(service, job_id))
+    await websocket.send_json({
+        "job_id": job_id, "status": "queued", "queue_position": position, "stream_url": stream_url
+    })
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                service.push_live_audio(job_id, message["bytes"])
+            elif message.get("text"):
+                try:
+                    if json.loads(message["text"]).get("event") == "end":
+                        break
+                except (ValueError, AttributeError):
+                    pass
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # end of audio: the job renders the rest and muxes the final video
+        service.push_live_audio(job_id, None)
+
+    try:
+        await websocket.send_json({"job_id": job_id, "status": "audio_complete"})
+        await websocket.close()
+    except Exception:
+        pass
 
 @router.get("/job/{job_id}/status", response_model=AvatarJobStatus)
 async def get_avatar_job_status(job_id: str):
     """Get avatar job status."""
-    job_data = state.get_ppt_job(f"avatar_{job_id}") or state.get_ppt_job(f"avatar_batch_{job_id}")
+    job_data = (
+        state.get_ppt_job(f"avatar_{job_id}")
+        or state.get_ppt_job(f"avatar_batch_{job_id}")
+        or state.get_ppt_job(f"avatar_live_{job_id}")
+    )
     if not job_data:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -251,5 +346,36 @@ async def get_avatar_job_status(job_id: str):
         video_url=job_data.get("video_url"),
         error=job_data.get("error"),
         duration=job_data.get("duration"),
-        current_frame=job_data.get("current_frame")
+        current_frame=job_data.get("current_frame"),
+        queue_position=instances.avatar_service.render_queue.position(job_id) if instances.avatar_service else None,
+        stream_url=job_data.get("stream_url")
     )
+
+STREAM_MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+}
+
+@router.get("/job/{job_id}/stream/{filename}")
+async def get_avatar_job_stream(job_id: str, filename: str):
+    """Serve the growing HLS playlist / segments of a streaming avatar job."""
+    if not re.fullmatch(r"[\w\-]+", job_id) or not re.fullmatch(r"[\w\-]+\.(m3u8|ts)", filename):
+        raise HTTPException(status_code=400, detail="Invalid stream path")
+
+    path = settings.OUTPUT_DIR / "avatar_streams" / job_id / filename
+    if not path.is_file():
+        # the playlist appears once the first segment is encoded
+        raise HTTPException(status_code=404, detail="Stream not available yet")
+
+    # the playlist is rewritten after every segment, segments never change
+    cache_control = "no-cache" if path.suffix == ".m3u8" else "public, max-age=3600"
+    return FileResponse(path, media_type=STREAM_MEDIA_TYPES[path.suffix], headers={"Cache-Control": cache_control})
+
+@router.post("/job/{job_id}/cancel")
+async def cancel_avatar_job(job_id: str):
+    """Cancel a queued or running avatar job."""
+    if not instances.avatar_service:
+        raise HTTPException(status_code=503, detail="Avatar service not available")
+    if not instances.avatar_service.render_queue.cancel(job_id):
+        raise HTTPException(status_code=404, detail="Job not queued or running")
+    return {"job_id": job_id, "status": "cancelling"}
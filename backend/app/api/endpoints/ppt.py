@@ -1,10 +1,10 @@
 import uuid
 from pathlib import Path
-from fastapi import APIRouter, File, HTTPException, UploadFile, BackgroundTasks
-from app.models import PPTUploadResponse, ParseStatusResponse, NarratedPPTRequest, NarratedPPTStatusResponse, FinalAssembleRequest
+from fastapi import APIRouter, File, HTTPException, UploadFile, BackgroundTasks, Request
+from app.models import PPTUploadResponse, ParseStatusResponse, NarratedPPTRequest, NarratedPPTStatusResponse, FinalAssembleRequest, ProducePresentationRequest
 from app.config import settings
 from app.utils.state_manager import state
-from app.tasks import background_parse_ppt, run_narrated_pptx_task, run_assemble_task
+from app.tasks import background_parse_ppt, run_narrated_pptx_task, run_assemble_task, run_produce_task
 import shutil
 import re
 from datetime import datetime
@@ -276,3 +276,37 @@ async def assemble_final_ppt(request: FinalAssembleRequest, background_tasks: Ba
     )
     
     return {"job_id": full_job_id, "status": "processing"}
+
+@router.post("/ppt/produce")
+async def produce_presentation(request: ProducePresentationRequest, http_request: Request, background_tasks: BackgroundTasks):
+    """Start the pipelined TTS -> avatar -> assembly job (per-slide progress in result.slides)"""
+    if not state.get_uploaded_file(request.file_id):
+        raise HTTPException(status_code=404, detail="File info not found. Please re-upload.")
+
+    full_job_id = f"produce_{str(uuid.uuid4())}"
+    session_id = getattr(http_request.state, 'session_id', None) or 'default'
+
+    state.add_ppt_job(full_job_id, {
+        "job_id": full_job_id,
+        "file_id": request.file_id,
+        "type": "produce",
+        "status": "processing",
+        "progress": 0,
+        "message": "Starting production...",
+        "result": None
+    })
+
+    background_tasks.add_task(
+        run_produce_task,
+        full_job_id,
+        request.file_id,
+        request.slide_scripts,
+        request.voice,
+        request.rate,
+        request.pitch,
+        photo_id=request.photo_id,
+        avatar_options=request.avatar_options,
+        session_id=session_id
+    )
+
+    return {"job_id": full_job_id, "status": "processing"}
@@ -19,6 +19,36 @@ class Settings:
     OUTPUT_DIR: Path = BASE_DIR / "outputs"
     PROMPTS_DIR: Path = Path("prompts")
     
+    # Avatar render queue: parallel worker slots (each loads its own Ditto SDK)
+    AVATAR_WORKERS: int = int(os.getenv("AVATAR_WORKERS", "1"))
+    # "process": each slot renders in its own worker process (models loaded once per worker)
+    # "thread": render inside the API process (legacy)
+    AVATAR_WORKER_MODE: str = os.getenv("AVATAR_WORKER_MODE", "process").lower()
+    # torch / onnx threads per render worker process (0 = cpu_count / AVATAR_WORKERS)
+    AVATAR_WORKER_THREADS: int = int(os.getenv("AVATAR_WORKER_THREADS", "0"))
+    # Rendered avatar video cache (outputs/video_cache), least recently used entries evicted beyond this
+    VIDEO_CACHE_MAX_GB: float = float(os.getenv("VIDEO_CACHE_MAX_GB", "20"))
+    # TTS engine: "edge" (Microsoft Edge online TTS) or "offline" (deterministic local audio, for load tests)
+    TTS_ENGINE: str = os.getenv("TTS_ENGINE", "edge").lower()
+    # Batch TTS: concurrent edge-tts requests, and the request rate ceiling (adaptive, halves on errors)
+    TTS_CONCURRENCY: int = int(os.getenv("TTS_CONCURRENCY", "6"))
+    TTS_MAX_RPS: float = float(os.getenv("TTS_MAX_RPS", "4"))
+    # Synthesize and cache per sentence, so an edited script only re-synthesizes the changed sentences.
+    # Off by default: a slide seen for the first time then costs one request per sentence instead of one
+    TTS_SEGMENT_CACHE: bool = os.getenv("TTS_SEGMENT_CACHE", "0").lower() in ("1", "true", "yes")
+    # TTS cache (outputs/.cache), least recently used entries evicted beyond this
+    TTS_CACHE_MAX_GB: float = float(os.getenv("TTS_CACHE_MAX_GB", "2"))
+    # Also deliver <audio>.16k.npy (16 kHz float32 PCM) so avatar renders skip MP3 decode + resample.
+    # Decoded in the background after each TTS call; off by default, only avatar renders read it
+    TTS_PCM_SIDECAR: bool = os.getenv("TTS_PCM_SIDECAR", "0").lower() in ("1", "true", "yes")
+    # PCM sidecar cache (outputs/.cache/pcm16k), separate budget: float32 PCM is ~10x the MP3 size
+    TTS_PCM_CACHE_MAX_GB: float = float(os.getenv("TTS_PCM_CACHE_MAX_GB", "4"))
+    # Final PPTX assembly: "pptx" (python-pptx object model) or "opc" (rewrite only the changed
+    # parts at ZIP level, copy the rest raw; falls back to "pptx" for packages it cannot handle)
+    PPT_ASSEMBLER: str = os.getenv("PPT_ASSEMBLER", "pptx").lower()
+    # PPTX assemblies running at once on the assembly thread pool (more wait in FIFO order)
+    PPT_ASSEMBLY_WORKERS: int = int(os.getenv("PPT_ASSEMBLY_WORKERS", "2"))
+    
     # API Keys
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     
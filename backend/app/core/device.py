@@ -2,6 +2,8 @@ import logging
 import asyncio
 from typing import Dict
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
 class DeviceManager:
@@ -36,7 +38,8 @@ class DeviceManager:
                 # When running multiple worker threads (like in stream_pipeline), 
                 # getting torch to use all cores for every op causes massive thrashing.
                 # Limiting it to 1 thread per op allows the worker threads to parallelize efficiently.
-                if self._device == "cpu":
+                # Process workers (AVATAR_WORKER_MODE=process) set their own thread budget instead.
+                if self._device == "cpu" and settings.AVATAR_WORKER_MODE == "thread":
                      logger.info("Setting torch.set_num_threads(1) to avoid CPU contention.")
                      torch.set_num_threads(1)
             except ImportError:
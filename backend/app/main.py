@@ -55,6 +55,16 @@ async def lifespan(app: FastAPI):
             logger.error(f"Avatar service init failed: {e}")
 
     threading.Thread(target=background_init, daemon=True).start()
+
+    # Resume avatar jobs left in the render queue once the service is up
+    async def resume_avatar_queue():
+        for _ in range(60):
+            if instances.avatar_service is not None:
+                await instances.avatar_service.render_queue.start()
+                return
+            await asyncio.sleep(1)
+
+    asyncio.create_task(resume_avatar_queue())
     
     # 3. Pre-fetch TTS voices
     try:
@@ -75,6 +85,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown Logic
     logger.info("Application shutting down...")
+    if instances.avatar_service is not None:
+        instances.avatar_service.shutdown_workers()
 
 # App Definition
 app = FastAPI(
@@ -15,6 +15,7 @@ from .schemas import (
     BatchTTSRequest,
     BatchTTSResponse,
     FinalAssembleRequest,
+    ProducePresentationRequest,
     PPTVideoEmbedRequest,
     ModelInfo,
     ModelListResponse,
@@ -27,18 +27,38 @@ class AvatarGenerateRequest(BaseModel):
     fade_in: int = Field(5, ge=0, description="淡入幀數")
     fade_out: int = Field(5, ge=0, description="淡出幀數")
     preview_duration: Optional[float] = Field(None, description="預覽時長 (秒), 若設定則只生成片段")
+    frame_batch_size: int = Field(1, ge=1, le=32, description="Warp/Decode 每批幀數")
+    skip_silence: bool = Field(True, description="靜音片段改用待機動作 (不逐幀渲染)")
+    priority: int = Field(1, ge=0, le=9, description="排程優先權 (數字小者優先)")
+    stream: bool = Field(False, description="邊生成邊輸出 HLS 串流 (stream_url)")
+
+
+class AvatarLiveRequest(BaseModel):
+    """即時生成請求 (WebSocket 第一則訊息, 之後傳送 16 kHz mono int16 PCM)"""
+    photo_id: str = Field(..., description="照片 ID")
+    output_path: Optional[str] = Field(None, description="輸出路徑 (選填)")
+
+    emotion: int = Field(4, ge=0, le=7, description="情緒強度 (0-7)")
+    crop_scale: float = Field(2.3, description="裁切比例")
+    sampling_steps: int = Field(10, ge=5, le=100, description="Diffusion 步數 (即時模式建議低步數)")
+    fade_in: int = Field(5, ge=0, description="淡入幀數")
+    fade_out: int = Field(5, ge=0, description="淡出幀數")
+    max_size: int = Field(720, ge=256, le=1920, description="輸出最大邊長")
+    frame_batch_size: int = Field(1, ge=1, le=32, description="Warp/Decode 每批幀數")
 
 
 class AvatarJobStatus(BaseModel):
     """任務狀態"""
     job_id: str = Field(..., description="任務 ID")
-    status: str = Field(..., description="狀態: pending, processing, completed, failed")
+    status: str = Field(..., description="狀態: queued, processing, completed, failed, cancelled")
     progress: int = Field(0, ge=0, le=100, description="進度 (0-100)")
     message: str = Field("", description="狀態訊息")
     video_url: Optional[str] = Field(None, description="影片 URL (完成時)")
     error: Optional[str] = Field(None, description="錯誤訊息 (失敗時)")
     duration: Optional[float] = Field(None, description="生成耗時 (秒)")
     current_frame: Optional[str] = Field(None, description="目前畫面預覽 (base64)")
+    queue_position: Optional[int] = Field(None, description="排隊位置 (0: 生成中)")
+    stream_url: Optional[str] = Field(None, description="HLS 播放清單 URL (串流模式, 生成中即可播放)")
 
 
 class AvatarSystemInfo(BaseModel):
@@ -52,6 +72,7 @@ class AvatarSystemInfo(BaseModel):
     is_generating: bool = Field(False, description="是否正在生成中")
     busy_message: Optional[str] = Field(None, description="忙碌時的提示訊息")
     current_frame: Optional[str] = Field(None, description="當前預覽幀 (base64)")
+    queue_length: int = Field(0, description="排隊中的任務數")
 
 
 class NarratedPPTWithAvatarRequest(BaseModel):
@@ -81,6 +102,10 @@ class BatchAvatarRequest(BaseModel):
     crop_scale: Optional[float] = Field(2.3, description="裁切比例")
     sampling_steps: Optional[int] = Field(50, ge=1, le=200, description="生成步數")
     preview_duration: Optional[float] = Field(None, description="預覽時長 (秒)")
+    frame_batch_size: Optional[int] = Field(1, ge=1, le=32, description="Warp/Decode 每批幀數")
+    motion_batch_size: Optional[int] = Field(4, ge=1, le=16, description="LMDM 同批投影片數")
+    skip_silence: Optional[bool] = Field(True, description="靜音片段改用待機動作 (不逐幀渲染)")
+    priority: Optional[int] = Field(1, ge=0, le=9, description="排程優先權 (數字小者優先)")
 
 
 class PPTVideoEmbedRequest(BaseModel):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, JSON, DateTime, Text, create_engine
+from sqlalchemy import Column, String, Integer, BigInteger, JSON, DateTime, Text, create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
 import datetime
@@ -51,5 +51,48 @@ class CacheRecord(Base):
     data = Column(JSON)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
+class RenderQueueRecord(Base):
+    __tablename__ = "render_queue"
+
+    job_id = Column(String, primary_key=True, index=True)
+    kind = Column(String)  # 'avatar', 'avatar_batch', 'avatar_live'
+    payload = Column(JSON)
+    priority = Column(Integer, default=1)
+    status = Column(String, index=True)  # 'queued', 'running', 'done', 'cancelled'
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+class MediaCacheRecord(Base):
+    __tablename__ = "media_cache"
+
+    cache_key = Column(String, primary_key=True, index=True)  # "{namespace}/{content key}"
+    namespace = Column(String, index=True)  # 'video', 'tts', ...
+    path = Column(String)
+    size = Column(BigInteger, default=0)
+    meta = Column(JSON, nullable=True)  # e.g. duration / codec for audio
+    refcount = Column(Integer, default=0)  # live hardlinks handed out (st_nlink - 1), evicted last
+    last_access = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class MediaProbeRecord(Base):
+    __tablename__ = "media_probe"
+
+    path = Column(String, primary_key=True, index=True)
+    size = Column(BigInteger, default=0)
+    mtime_ns = Column(BigInteger, default=0)  # with size: a changed file no longer matches
+    meta = Column(JSON, nullable=True)  # width / height / fps / duration / codec ...
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+# Columns added after a table was first created: (table, column, DDL type)
+_ADDED_COLUMNS = [
+    ("media_cache", "refcount", "INTEGER DEFAULT 0"),
+]
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    # create_all never alters existing tables
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, column, ddl in _ADDED_COLUMNS:
+            if column not in {c["name"] for c in inspector.get_columns(table)}:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
@@ -169,6 +169,16 @@ class FinalAssembleRequest(BaseModel):
     voice: str  # 備用，用於 notes 同步或其他邏輯
     photo_id: Optional[str] = None  # 用於在無法生成影片時插入靜態說話人圖片
 
+class ProducePresentationRequest(BaseModel):
+    """一站式製作請求：TTS → 數位人影片 → 最終 PPT (逐頁管線化)"""
+    file_id: str
+    slide_scripts: List[Dict[str, Any]]
+    voice: str
+    rate: str = "+0%"
+    pitch: str = "+0Hz"
+    photo_id: Optional[str] = None  # 無照片時只嵌入音訊
+    avatar_options: Dict[str, Any] = {}  # emotion / crop_scale / sampling_steps / max_size ...
+
 class PPTVideoEmbedRequest(BaseModel):
     """將影片嵌入現有 PPTX 的請求"""
     pptx_path: str
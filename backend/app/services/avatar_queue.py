@@ -0,0 +1,179 @@
+"""
+Avatar render scheduler
+
+Persistent priority queue (FIFO within a priority) feeding N worker slots.
+Each slot renders one job at a time with its own StreamSDK; the slot and the
+job's cancel flag travel with the worker task through context variables, so
+they are also visible inside asyncio.to_thread() calls.
+"""
+import asyncio
+import contextvars
+import itertools
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.utils.state_manager import state
+
+logger = logging.getLogger(__name__)
+
+# Worker slot of the running job (0 outside the queue)
+current_slot: contextvars.ContextVar[int] = contextvars.ContextVar("avatar_render_slot", default=0)
+# Cancel flag of the running job (None outside the queue)
+current_cancel: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "avatar_render_cancel", default=None
+)
+
+
+def is_cancelled() -> bool:
+    """True once the job running in this context has been cancelled"""
+    event = current_cancel.get()
+    return event is not None and event.is_set()
+
+
+class AvatarRenderQueue:
+    """數位播報員渲染排程 (優先權佇列 + 多個工作槽)"""
+
+    def __init__(self, num_workers: int = 1):
+        self.num_workers = max(1, int(num_workers))
+        self.on_cancel: Optional[Callable[[int], None]] = None  # slot -> stop its SDK
+
+        self._handlers: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+        self._pending: Dict[str, Tuple[int, int, str, Dict]] = {}  # job_id -> (priority, seq, kind, payload)
+        self._running: Dict[str, Tuple[int, threading.Event]] = {}  # job_id -> (slot, cancel event)
+        self._finished: Dict[str, asyncio.Future] = {}  # job_id -> resolved when the job leaves the queue
+        self._workers: List[asyncio.Task] = []
+        self._start_lock = asyncio.Lock()
+
+    def register(self, kind: str, handler: Callable[..., Awaitable[Any]]):
+        """kind: job type, also the state key prefix ("{kind}_{job_id}")"""
+        self._handlers[kind] = handler
+
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def start(self):
+        """Start the worker slots on the running loop and resume persisted jobs (idempotent)"""
+        async with self._start_lock:
+            if self._workers:
+                return
+            self._queue = asyncio.PriorityQueue()
+            for slot in range(self.num_workers):
+                self._workers.append(asyncio.create_task(self._worker(slot)))
+
+            resumed = 0
+            for item in state.get_pending_render_jobs():
+                if item["kind"] not in self._handlers or item["job_id"] in self._pending:
+                    continue
+                self._enqueue(item["job_id"], item["kind"], item["payload"], item["priority"])
+                state.update_ppt_job(f"{item['kind']}_{item['job_id']}", {
+                    "status": "queued", "message": "Waiting in render queue (resumed)"
+                })
+                resumed += 1
+            logger.info(f"Avatar render queue started: {self.num_workers} worker(s), {resumed} job(s) resumed")
+
+    def _enqueue(self, job_id: str, kind: str, payload: Dict, priority: int):
+        self._finished.setdefault(job_id, asyncio.get_running_loop().create_future())
+        seq = next(self._seq)
+        self._pending[job_id] = (priority, seq, kind, payload)
+        self._queue.put_nowait((priority, seq, job_id))
+
+    async def submit(self, job_id: str, kind: str, payload: Dict, priority: int = 1) -> int:
+        """
+        Queue a job; payload is passed to the handler as kwargs (must be JSON serializable).
+        Lower priority runs first. Returns the 1-based queue position.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown render job kind: {kind}")
+        await self.start()
+        state.add_render_job(job_id, kind, payload, priority)
+        self._enqueue(job_id, kind, payload, priority)
+        return self.position(job_id)
+
+    async def wait(self, job_id: str) -> str:
+        """Wait until a submitted job has finished; returns "done" or "cancelled" """
+        future = self._finished.get(job_id)
+        if future is None:
+            return "done"
+        return await asyncio.shield(future)
+
+    def _finish(self, job_id: str, status: str):
+        future = self._finished.pop(job_id, None)
+        if future is not None and not future.done():
+            future.set_result(status)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based position among queued jobs, 0 while rendering, None if unknown"""
+        if job_id in self._running:
+            return 0
+        if job_id not in self._pending:
+            return None
+        key = self._pending[job_id][:2]
+        return 1 + sum(1 for item in self._pending.values() if item[:2] < key)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job"""
+        item = self._pending.pop(job_id, None)
+        if item is not None:
+            kind = item[2]
+            state.update_render_job(job_id, "cancelled")
+            state.update_ppt_job(f"{kind}_{job_id}", {"status": "cancelled", "message": "Cancelled"})
+            self._finish(job_id, "cancelled")
+            return True
+
+        running = self._running.get(job_id)
+        if running is None:
+            return False
+        slot, event = running
+        event.set()
+        if self.on_cancel:
+            try:
+                self.on_cancel(slot)
+            except Exception as e:
+                logger.warning(f"Failed to stop render slot {slot}: {e}")
+        return True
+
+    def cancel_running(self) -> int:
+        """Cancel every running job, returns how many"""
+        job_ids = list(self._running.keys())
+        for job_id in job_ids:
+            self.cancel(job_id)
+        return len(job_ids)
+
+    async def _worker(self, slot: int):
+        current_slot.set(slot)
+        while True:
+            _, _, job_id = await self._queue.get()
+            item = self._pending.pop(job_id, None)
+            if item is None:
+                # cancelled while queued
+                continue
+            _, _, kind, payload = item
+            state_key = f"{kind}_{job_id}"
+
+            event = threading.Event()
+            self._running[job_id] = (slot, event)
+            token = current_cancel.set(event)
+            state.update_render_job(job_id, "running")
+            state.update_ppt_job(state_key, {"status": "processing", "message": "Starting render..."})
+            try:
+                await self._handlers[kind](**payload)
+            except Exception as e:
+                logger.error(f"Render job {job_id} ({kind}) failed in slot {slot}: {e}")
+            finally:
+                current_cancel.reset(token)
+                self._running.pop(job_id, None)
+                if event.is_set():
+                    state.update_render_job(job_id, "cancelled")
+                    state.update_ppt_job(state_key, {"status": "cancelled", "message": "Cancelled"})
+                    self._finish(job_id, "cancelled")
+                else:
+                    state.update_render_job(job_id, "done")
+                    self._finish(job_id, "done")
@@ -1,13 +1,22 @@
 import asyncio
+import hashlib
+import json
 import logging
 import shutil
 import subprocess
 import time
 import os
+import wave
 from pathlib import Path
-from typing import Dict, Optional, Callable, Any
+from typing import AsyncIterator, Dict, List, Optional, Callable, Any
 
+from app.config import settings
 from app.core.device import device_manager
+from app.services.avatar_queue import AvatarRenderQueue, current_slot, is_cancelled
+from app.services.avatar_worker import AvatarWorkerPool
+from app.utils import pcm_sidecar
+from app.utils.media_cache import MediaCache
+from app.utils.media_probe import get_probe_index, probe_video
 from app.utils.validators import ImageValidator
 
 logger = logging.getLogger(__name__)
@@ -28,10 +37,31 @@ class AvatarService:
         self.config_path = Path(config_path)
         self.sdk = None
         self._is_loaded = False
+        # Persistent avatar registration cache (face detection / feature extraction results)
+        self.source_cache_dir = settings.OUTPUT_DIR / "avatar_cache"
+        # Persistent HuBERT audio feature cache (re-renders of the same narration)
+        self.feat_cache_dir = settings.OUTPUT_DIR / "audio_feat_cache"
+        # HuBERT windows per ONNX call during offline feature extraction
+        self.hubert_batch_size = 16
+        # Rendered videos keyed by content (image bytes + audio PCM + render options)
+        self.video_cache = MediaCache(
+            "video",
+            settings.OUTPUT_DIR / "video_cache",
+            max_bytes=int(settings.VIDEO_CACHE_MAX_GB * 1024**3),
+            ext=".mp4",
+        )
+        self._content_hashes: Dict[tuple, str] = {}
         
-        # Concurrency Control
-        self._is_generating = False
-        self._current_user = None
+        # Concurrency Control: queued jobs, N worker slots
+        # process mode: one render worker process per slot (see avatar_worker.py)
+        # thread mode: renders run in this process (slot 0 uses self.sdk)
+        self.render_queue = AvatarRenderQueue(num_workers=settings.AVATAR_WORKERS)
+        self.render_queue.on_cancel = self._cancel_slot
+        self.worker_pool: Optional[AvatarWorkerPool] = None
+        # Live mode audio per job_id (PCM chunks, None = end of audio)
+        self._live_inputs: Dict[str, asyncio.Queue] = {}
+        self._slot_sdks: Dict[int, Any] = {}
+        self._device = None
         self._busy_message = None
         self._current_frame = None
         
@@ -62,6 +92,9 @@ class AvatarService:
             if not self.model_path.exists():
                 logger.error(f"模型路徑不存在: {self.model_path}")
                 return False
+
+            if settings.AVATAR_WORKER_MODE == "process":
+                return self._start_worker_pool(device)
             
             try:
                 from app.services.ditto.stream_pipeline import StreamSDK, run, USE_MOCK
@@ -88,12 +121,9 @@ class AvatarService:
                 logger.error("模型檔案驗證失敗")
                 return False
             
-            # 初始化 SDK
-            self.sdk = StreamSDK(
-                str(self.config_path),
-                str(self.model_path),
-                device=device
-            )
+            # 初始化 SDK (slot 0; other worker slots create theirs on first use)
+            self._device = device
+            self.sdk = StreamSDK(**self._sdk_kwargs(device))
             
             self._is_loaded = True
             logger.info(f"✅ Ditto 模型載入成功 ({device})")
@@ -103,27 +133,118 @@ class AvatarService:
             logger.error(f"❌ 模型載入失敗: {e}", exc_info=True)
             return False
 
-    def acquire_lock(self, user_id: str = "unknown", message: str = "Processing") -> bool:
-        """嘗試獲取生成鎖"""
-        if self._is_generating:
+    def _sdk_kwargs(self, device: Optional[str]) -> Dict[str, Any]:
+        """StreamSDK constructor kwargs (shared by in-process SDKs and render workers)"""
+        kwargs = {
+            "cfg_pkl": str(self.config_path.absolute()),
+            "data_root": str(self.model_path.absolute()),
+            "source_cache_dir": str(self.source_cache_dir),
+            "feat_cache_dir": str(self.feat_cache_dir),
+            "hubert_batch_size": self.hubert_batch_size,
+        }
+        if device:
+            kwargs["device"] = device
+        return kwargs
+
+    def _start_worker_pool(self, device: str) -> bool:
+        """Spawn the render worker processes and wait until every worker loaded its models"""
+        self._device = device
+        if self.worker_pool is None:
+            self.worker_pool = AvatarWorkerPool(
+                num_workers=settings.AVATAR_WORKERS,
+                sdk_kwargs=self._sdk_kwargs(device),
+                threads_per_worker=settings.AVATAR_WORKER_THREADS or None,
+            )
+        if not self.worker_pool.start(wait=True):
+            logger.error("❌ 渲染工作行程載入模型失敗")
             return False
-        self._is_generating = True
-        self._current_user = user_id
-        self._busy_message = message
+        self._is_loaded = True
+        mode = "Mock" if self.worker_pool.use_mock else device
+        logger.info(f"✅ Ditto 渲染工作行程已就緒 ({settings.AVATAR_WORKERS} workers, {mode})")
         return True
 
-    def release_lock(self, user_id: str = "unknown"):
-        """釋放生成鎖"""
-        # Simple release for now, strict ownership check can be added if needed
-        self._is_generating = False
-        self._current_user = None
-        self._busy_message = None
+    def _use_mock(self) -> bool:
+        if self.worker_pool is not None:
+            return self.worker_pool.use_mock
+        from app.services.ditto.stream_pipeline import USE_MOCK
+        return USE_MOCK
+
+    async def _call_sdk(
+        self,
+        method: str,
+        kwargs: Dict[str, Any],
+        progress_callback: Optional[Callable] = None,
+        audio_chunks: Optional[AsyncIterator[bytes]] = None
+    ) -> Any:
+        """Run a stream_pipeline entry point ("run" | "run_live" | "gen_motion_batch") on the current slot"""
+        if self.worker_pool is not None:
+            return await self.worker_pool.call(current_slot.get(), method, kwargs, progress_callback, audio_chunks)
+
+        from app.services.ditto import stream_pipeline
+        sdk = self._ensure_sdk()
+        # drop a cancel left over from the slot's previous job, then honour this job's own
+        if hasattr(sdk, "reset_cancel"):
+            sdk.reset_cancel()
+        if is_cancelled():
+            raise RuntimeError("Render cancelled")
+        if method == "run":
+            return await asyncio.to_thread(stream_pipeline.run, sdk, progress_callback=progress_callback, **kwargs)
+        if method == "run_live":
+            return await self._run_live_in_thread(stream_pipeline.run_live, sdk, kwargs, progress_callback, audio_chunks)
+        return await asyncio.to_thread(getattr(stream_pipeline, method), sdk, **kwargs)
+
+    async def _run_live_in_thread(self, run_live, sdk, kwargs, progress_callback, audio_chunks) -> Any:
+        """Thread mode: bridge the async chunk source to the blocking run_live loop"""
+        import queue as sync_queue
+        # Unbounded (16 kHz PCM is ~32 KB/s): put_nowait never blocks the event loop
+        chunk_q: sync_queue.SimpleQueue = sync_queue.SimpleQueue()
+
+        def _chunks():
+            while True:
+                try:
+                    chunk = chunk_q.get(timeout=1)
+                except sync_queue.Empty:
+                    if getattr(sdk, "cancelled", False):
+                        return
+                    continue
+                if chunk is None:
+                    return
+                yield chunk
+
+        async def _forward():
+            try:
+                async for chunk in audio_chunks:
+                    if getattr(sdk, "cancelled", False):
+                        break
+                    chunk_q.put_nowait(chunk)
+            finally:
+                chunk_q.put_nowait(None)
+
+        forward_task = asyncio.create_task(_forward())
+        try:
+            return await asyncio.to_thread(run_live, sdk, _chunks(), progress_callback=progress_callback, **kwargs)
+        finally:
+            forward_task.cancel()
+
+    def shutdown_workers(self):
+        """Stop the render worker processes (app shutdown)"""
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+
+    def _cancel_slot(self, slot: int):
+        """Stop the render running on a worker slot (called from AvatarRenderQueue.cancel)"""
+        if self.worker_pool is not None:
+            self.worker_pool.cancel(slot)
+            return
+        sdk = self.sdk if slot == 0 else self._slot_sdks.get(slot)
+        if sdk is not None and hasattr(sdk, "cancel"):
+            sdk.cancel()
 
     async def get_system_info(self) -> Dict[str, Any]:
         """Get system info including lock status"""
         try:
             # Optimization: Skip heavy hardware checks during generation to satisfy high CPU load
-            if self._is_generating:
+            if self.render_queue.running_count > 0:
                 return {
                     "cuda_available": False, # Just a placeholder
                     "gpu_name": "Generating...",
@@ -131,7 +252,7 @@ class AvatarService:
                     "gpu_memory_available": 0,
                     "model_loaded": self._is_loaded,
                     "avatar_enabled": True,
-                    "is_generating": self._is_generating,
+                    "is_generating": self.render_queue.running_count > 0,
                     "busy_message": self._busy_message,
                     "current_frame": self._current_frame
                 }
@@ -146,7 +267,7 @@ class AvatarService:
                 "gpu_memory_available": info.get("free_memory"),
                 "model_loaded": self._is_loaded,
                 "avatar_enabled": True,
-                "is_generating": self._is_generating,
+                "is_generating": self.render_queue.running_count > 0,
                 "busy_message": self._busy_message,
                 "current_frame": self._current_frame
             }
@@ -157,7 +278,7 @@ class AvatarService:
                 "cuda_available": False,
                 "model_loaded": self._is_loaded,
                 "avatar_enabled": True,
-                "is_generating": self._is_generating,
+                "is_generating": self.render_queue.running_count > 0,
                 "busy_message": self._busy_message or "System error (recovering)",
                 "current_frame": self._current_frame
             }
@@ -174,14 +295,20 @@ class AvatarService:
         image_path: str,
         output_path: str,
         progress_callback: Optional[Callable] = None,
-        options: Optional[Dict[str, Any]] = None
+        options: Optional[Dict[str, Any]] = None,
+        motion: Optional[Any] = None
     ) -> Dict[str, Any]:
         """
         生成數位播報員影片
+
+        motion: generate_motion_batch 預先算好的動作序列 (選填)
         """
         start_time = time.time()
         
         try:
+            if is_cancelled():
+                return {"success": False, "message": "已取消", "duration": 0}
+
             # 1. 確保模型已準備好
             if not self._is_loaded:
                 self._busy_message = "載入核心模型中..."
@@ -216,39 +343,16 @@ class AvatarService:
                 if not audio_path:
                      raise Exception("音訊處理失敗")
 
-            # 3. 準備參數與路徑
-            # ... (caching logic can remain here as os.stat is fast enough, md5 is fast for small files)
-            # But MD5 for large files might block. Let's wrap caching too?
-            # For now, let's stick to wrapping the heaviest parts.
-            
-            # ... (rest of logic)
-            
+            # 3. 快取 (hashing decodes the audio: run in thread)
             # ======== CACHING LOGIC START ========
-            import hashlib
-            
-            # Calculate fingerprint
-            # Added "v3_final_h264" to salt to invalidate old caches and ensure H264
-            cache_key_str = f"{image_path}-{os.path.getsize(image_path)}-{audio_path}-{os.path.getsize(audio_path)}-{str(options)}-v3_final_h264"
-            params_hash = hashlib.md5(cache_key_str.encode()).hexdigest()
-            
-            # Define cache path
-            cache_dir = Path(output_path).parent.parent / "video_cache"
-            cache_dir.mkdir(parents=True, exist_ok=True)
-            cached_filename = f"cached_{params_hash}.mp4"
-            cached_file = cache_dir / cached_filename
-            
-            # Check cache
-            if cached_file.exists():
-                short_hash = cached_filename[:15] + "..." + cached_filename[-8:]
-                logger.info(f"✨ Found cached video: {short_hash}. Skipping generation.")
-                if progress_callback:
-                    progress_callback(50, "發現已生成的快取影片...")
-                    time.sleep(0.5)
-                    progress_callback(90, "應用快取...")
-                
-                # Copy cached file to output path
-                shutil.copy2(cached_file, output_path)
-                
+            cache_key = await asyncio.to_thread(
+                self._video_cache_key, image_path, audio_path, options, is_preview
+            )
+            
+            # Check cache (delivered as a hardlink / reflink, copy only across filesystems)
+            if await asyncio.to_thread(self.video_cache.fetch, cache_key, output_path):
+                logger.info(f"✨ Found cached video: {cache_key[:12]}... Skipping generation.")
+                await asyncio.to_thread(self._record_video_info, str(output_path), cache_key)
                 if progress_callback:
                     progress_callback(100, "生成完成 (Used Cache)!")
                     
@@ -260,46 +364,29 @@ class AvatarService:
                 }
             # ======== CACHING LOGIC END ========
             
-            setup_kwargs = {
-                "crop_scale": options.get("crop_scale", 2.0),
-                "smo_k_s": 5,
-                # For preview: 10 steps (Fast). For full: 30 steps (Balanced).
-                "sampling_timesteps": 10 if is_preview else options.get("sampling_steps", 30),
-                # Disable face restoration for preview to save massive CPU time
-                "enable_face_restoration": not is_preview,
-                # Force SD resolution for preview (480p)
-                # For full generation: Use user option (default 1920)
-                "max_size": 480 if is_preview else options.get("max_size", 1920),
-                "pbar_desc": options.get("pbar_desc", "Video Gen")
-            }
-            run_kwargs = {
-                "fade_in": options.get("fade_in", 5),
-                "fade_out": options.get("fade_out", 5),
-                "emo": options.get("emotion", 4),
-            }
-            
-            backend_dir = Path(__file__).parent.parent.parent.absolute()
-            cfg_pkl = backend_dir / "checkpoints/ditto_cfg/v0.4_hubert_cfg_pytorch.pkl"
-            data_root = backend_dir / "checkpoints/ditto_pytorch"
-            
-            # 4. 執行實體生成
-            # 從 stream_pipeline 導入正確的 SDK (mock 或 full)
-            from app.services.ditto.stream_pipeline import StreamSDK, run
+            setup_kwargs = self._build_setup_kwargs(options, is_preview)
+            run_kwargs = self._build_run_kwargs(options, is_preview)
+            if motion is not None:
+                # Motion precomputed by generate_motion_batch (skips LMDM)
+                run_kwargs["res_kp_seq"] = motion
             
-            if not self.sdk:
-                # 初始化 SDK (mock 模式下每次都會創建新實例)
-                self.sdk = StreamSDK(
-                    cfg_pkl=str(cfg_pkl),
-                    data_root=str(data_root),
-                )
-            
-            video_output = await asyncio.to_thread(
-                run,
-                self.sdk,
-                audio_path=audio_path,
-                source_path=image_path,
-                output_path=output_path,
-                more_kwargs={"setup_kwargs": setup_kwargs, "run_kwargs": run_kwargs},
+            # Writers may truncate output_path in place: never let them reach a cache inode
+            if os.path.lexists(output_path):
+                os.remove(output_path)
+
+            # cancelled while hashing / slicing / loading models
+            if is_cancelled():
+                return {"success": False, "message": "已取消", "duration": 0}
+
+            # 4. 執行實體生成 (render worker process or in-process SDK of this slot)
+            video_output = await self._call_sdk(
+                "run",
+                {
+                    "audio_path": audio_path,
+                    "source_path": image_path,
+                    "output_path": output_path,
+                    "more_kwargs": {"setup_kwargs": setup_kwargs, "run_kwargs": run_kwargs},
+                },
                 progress_callback=progress_callback
             )
             
@@ -318,16 +405,18 @@ class AvatarService:
             #     logger.warning(f"Circular mask failed (using square video): {e}")
 
             # Enforce H.264 Compatibility (Fix for "Codec Unavailable")
-            compatible_output = self._ensure_compatibility(video_output)
-            if compatible_output:
-                video_output = compatible_output
+            # The ffmpeg_pipe writer already emits the final compatible file.
+            single_pass = setup_kwargs["writer_type"] in ("ffmpeg_pipe", "hls") and not self._use_mock()
+            if not single_pass:
+                compatible_output = self._ensure_compatibility(video_output)
+                if compatible_output:
+                    video_output = compatible_output
 
-            # Save to cache
-            try:
-                shutil.copy2(video_output, cached_file)
+            # Save to cache (with its stream info, so assembly never probes it)
+            video_meta = await asyncio.to_thread(self._record_video_info, video_output)
+            cached_file = await asyncio.to_thread(self.video_cache.put, cache_key, video_output, video_meta)
+            if cached_file:
                 logger.info(f"✅ Video cached to: {cached_file}")
-            except Exception as e:
-                logger.warning(f"Failed to cache video: {e}")
 
             duration = time.time() - start_time
             # if progress_callback:
@@ -348,6 +437,290 @@ class AvatarService:
                 "duration": time.time() - start_time
             }
     
+    def _ensure_sdk(self):
+        """
+        SDK of the current worker slot, created on first use
+        (mock 模式下每次都會創建新實例)
+        """
+        from app.services.ditto.stream_pipeline import StreamSDK
+
+        slot = current_slot.get()
+        sdk = self.sdk if slot == 0 else self._slot_sdks.get(slot)
+        if sdk:
+            return sdk
+        sdk = StreamSDK(**self._sdk_kwargs(self._device))
+        if slot == 0:
+            self.sdk = sdk
+        else:
+            self._slot_sdks[slot] = sdk
+        return sdk
+
+    def _build_setup_kwargs(self, options: Dict[str, Any], is_preview: bool) -> Dict[str, Any]:
+        """Map user options to StreamSDK.setup kwargs"""
+        return {
+            "crop_scale": options.get("crop_scale", 2.0),
+            "smo_k_s": 5,
+            # For preview: 10 steps (Fast). For full: 30 steps (Balanced).
+            "sampling_timesteps": 10 if is_preview else options.get("sampling_steps", 30),
+            # Disable face restoration for preview to save massive CPU time
+            "enable_face_restoration": not is_preview,
+            # Force SD resolution for preview (480p)
+            # For full generation: Use user option (default 1920)
+            "max_size": 480 if is_preview else options.get("max_size", 1920),
+            # Warp/Decode micro-batching: amortizes per-call overhead on CPU
+            "frame_batch_size": options.get("frame_batch_size", 1),
+            # Single-pass encode (frames + audio -> final H.264/yuv420p/faststart)
+            # stream_dir: same encode, also playable as HLS while rendering
+            "writer_type": "hls" if options.get("stream_dir") else options.get("writer_type", "ffmpeg_pipe"),
+            "stream_dir": options.get("stream_dir"),
+            "pbar_desc": options.get("pbar_desc", "Video Gen")
+        }
+
+    def open_live_input(self, job_id: str):
+        """Register the audio input of a live job (fed by push_live_audio before / while it renders)"""
+        self._live_inputs[job_id] = asyncio.Queue()
+
+    def push_live_audio(self, job_id: str, chunk: Optional[bytes]):
+        """chunk: 16 kHz mono int16 PCM, None = end of audio"""
+        live_input = self._live_inputs.get(job_id)
+        if live_input is not None:
+            live_input.put_nowait(chunk)
+
+    def close_live_input(self, job_id: str):
+        self._live_inputs.pop(job_id, None)
+
+    async def _live_chunks(self, job_id: str) -> AsyncIterator[bytes]:
+        live_input = self._live_inputs[job_id]
+        while True:
+            chunk = await live_input.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    async def generate_talking_head_live(
+        self,
+        job_id: str,
+        image_path: str,
+        output_path: str,
+        progress_callback: Optional[Callable] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        即時模式: 音訊邊到邊生成 (online LMDM)，不需事先取得完整音訊。
+        音訊由 push_live_audio(job_id, ...) 送入; options["stream_dir"] 設定時可邊生成邊播放 (HLS)
+        """
+        start_time = time.time()
+        try:
+            if is_cancelled():
+                return {"success": False, "message": "已取消", "duration": 0}
+            if job_id not in self._live_inputs:
+                raise Exception("即時音訊來源已中斷 (live session lost)")
+
+            if not self._is_loaded:
+                self._busy_message = "載入核心模型中..."
+                if progress_callback:
+                    progress_callback(0, self._busy_message)
+                await self.load_models()
+
+            original_callback = progress_callback
+            def internal_progress(p, m, img=None):
+                self._busy_message = m
+                if img:
+                    self._current_frame = img
+                if original_callback:
+                    original_callback(p, m, img)
+
+            options = options or {}
+            setup_kwargs = self._build_setup_kwargs(options, is_preview=False)
+            run_kwargs = self._build_run_kwargs(options, is_preview=False)
+            # silence detection needs the whole audio
+            run_kwargs["skip_silence"] = False
+
+            if os.path.lexists(output_path):
+                os.remove(output_path)
+
+            if is_cancelled():
+                return {"success": False, "message": "已取消", "duration": 0}
+
+            video_output = await self._call_sdk(
+                "run_live",
+                {
+                    "source_path": image_path,
+                    "output_path": output_path,
+                    "more_kwargs": {"setup_kwargs": setup_kwargs, "run_kwargs": run_kwargs},
+                },
+                progress_callback=internal_progress,
+                audio_chunks=self._live_chunks(job_id)
+            )
+
+            if not Path(video_output).exists():
+                raise Exception("影片生成失敗，輸出檔案未產生")
+            # live output is always muxed afterwards (no single-pass encode)
+            compatible_output = await asyncio.to_thread(self._ensure_compatibility, video_output)
+            if compatible_output:
+                video_output = compatible_output
+            await asyncio.to_thread(self._record_video_info, video_output)
+
+            return {
+                "success": True,
+                "video_path": video_output,
+                "duration": time.time() - start_time,
+                "message": "Live avatar generation successful"
+            }
+        except Exception as e:
+            logger.error(f"Live avatar generation failed: {e}", exc_info=True)
+            return {
+                "success": False,
+                "message": f"生成失敗: {str(e)}",
+                "duration": time.time() - start_time
+            }
+        finally:
+            self.close_live_input(job_id)
+
+    def prepare_stream_dir(self, job_id: str, keep_hours: float = 24) -> Path:
+        """HLS directory of a streaming job (outputs/avatar_streams/<job_id>); prunes old streams"""
+        streams_dir = settings.OUTPUT_DIR / "avatar_streams"
+        streams_dir.mkdir(parents=True, exist_ok=True)
+        expire = time.time() - keep_hours * 3600
+        for old_dir in streams_dir.iterdir():
+            try:
+                if old_dir.is_dir() and old_dir.stat().st_mtime < expire:
+                    shutil.rmtree(old_dir, ignore_errors=True)
+            except OSError:
+                pass
+        stream_dir = streams_dir / job_id
+        if stream_dir.exists():
+            shutil.rmtree(stream_dir, ignore_errors=True)
+        stream_dir.mkdir()
+        return stream_dir
+
+    def _build_run_kwargs(self, options: Dict[str, Any], is_preview: bool) -> Dict[str, Any]:
+        """Map user options to stream_pipeline.run run_kwargs"""
+        return {
+            "fade_in": options.get("fade_in", 5),
+            "fade_out": options.get("fade_out", 5),
+            "emo": options.get("emotion", 4),
+            # Silent spans reuse the avatar's cached idle clip instead of being rendered
+            "skip_silence": options.get("skip_silence", True) and not is_preview,
+        }
+
+    def _content_hash(self, path: str, pcm: bool = False) -> str:
+        """
+        SHA-256 of a file's content (memoized per path/size/mtime).
+        pcm=True hashes the decoded samples, so re-tagged or re-muxed audio still matches.
+        """
+        st = os.stat(path)
+        memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns, pcm)
+        digest = self._content_hashes.get(memo_key)
+        if digest:
+            return digest
+
+        h = hashlib.sha256()
+        decoded = False
+        samples = pcm_sidecar.load_sidecar(path) if pcm else None
+        if samples is not None:
+            # The TTS stage already decoded it: hash the 16 kHz sidecar instead of decoding again
+            import numpy as np
+            h.update(f"pcm16k:{pcm_sidecar.SAMPLE_RATE}".encode())
+            h.update(np.ascontiguousarray(samples).data)
+            decoded = True
+        elif pcm:
+            try:
+                from pydub import AudioSegment
+                audio = AudioSegment.from_file(path)
+                h.update(f"pcm:{audio.frame_rate}:{audio.channels}:{audio.sample_width}".encode())
+                h.update(audio.raw_data)
+                decoded = True
+            except Exception as e:
+                logger.debug(f"PCM decode failed for {path}, hashing file bytes: {e}")
+                h = hashlib.sha256()
+        if not decoded:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        digest = h.hexdigest()
+
+        if len(self._content_hashes) > 4096:
+            self._content_hashes.clear()
+        self._content_hashes[memo_key] = digest
+        return digest
+
+    def _record_video_info(self, video_path: str, cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Records a finished video in the probe index (dimensions / fps / duration / codec).
+        Videos delivered from the cache reuse the entry's stored info instead of probing.
+        """
+        meta = self.video_cache.get_meta(cache_key) if cache_key else None
+        if not meta:
+            meta = probe_video(video_path)
+            if cache_key and meta:
+                self.video_cache.register(cache_key, meta)
+        get_probe_index().record(video_path, meta)
+        return meta
+
+    def _video_cache_key(self, image_path: str, audio_path: str, options: Dict[str, Any], is_preview: bool) -> str:
+        """Cache key of a rendered video: image bytes + audio PCM + the options that change the output"""
+        setup_kwargs = self._build_setup_kwargs(options, is_preview)
+        # Scheduling / display only, the rendered frames are identical
+        for k in ("frame_batch_size", "pbar_desc", "stream_dir"):
+            setup_kwargs.pop(k, None)
+        if setup_kwargs["writer_type"] == "hls":
+            # HLS output is remuxed into the same single-pass file
+            setup_kwargs["writer_type"] = "ffmpeg_pipe"
+        render_options = {
+            "setup": setup_kwargs,
+            "run": self._build_run_kwargs(options, is_preview),
+            "preview_duration": options.get("preview_duration") or 0,
+        }
+
+        h = hashlib.sha256(b"avatar_video_v4")
+        h.update(self._content_hash(image_path).encode())
+        h.update(self._content_hash(audio_path, pcm=True).encode())
+        h.update(json.dumps(render_options, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    async def generate_motion_batch(
+        self,
+        audio_paths: List[str],
+        image_path: str,
+        options_list: List[Dict[str, Any]]
+    ) -> List[Optional[Any]]:
+        """
+        Precompute LMDM motion for several slides sharing one avatar in a single
+        lockstep diffusion run. Returns one motion per slide (None where the
+        slide will be served from the video cache, or in mock / preview mode);
+        pass each to generate_talking_head(motion=...).
+        """
+        motions: List[Optional[Any]] = [None] * len(audio_paths)
+        if not audio_paths or any(o.get("preview_duration") for o in options_list):
+            # Preview slices the audio per slide, so full-audio motion would not match
+            return motions
+
+        if not self._is_loaded:
+            await self.load_models()
+
+        if self._use_mock():
+            return motions
+
+        def _is_cached(i: int) -> bool:
+            key = self._video_cache_key(image_path, audio_paths[i], options_list[i], is_preview=False)
+            return self.video_cache.get(key) is not None
+
+        todo = [i for i in range(len(audio_paths)) if not await asyncio.to_thread(_is_cached, i)]
+        if not todo:
+            return motions
+
+        setup_kwargs = self._build_setup_kwargs(options_list[todo[0]], is_preview=False)
+        self._busy_message = f"批次產生動作序列 ({len(todo)} 張投影片)..."
+        results = await self._call_sdk("gen_motion_batch", {
+            "audio_paths": [audio_paths[i] for i in todo],
+            "source_path": image_path,
+            "more_kwargs": {"setup_kwargs": setup_kwargs},
+        })
+        for i, motion in zip(todo, results):
+            motions[i] = motion
+        return motions
+
     async def get_system_info(self) -> Dict[str, Any]:
         """
         取得系統資訊
@@ -355,15 +728,22 @@ class AvatarService:
         info = await device_manager.get_system_info()
         info.update({
              "model_loaded": self._is_loaded,
-             "avatar_enabled": True
+             "avatar_enabled": True,
+             "is_generating": self.render_queue.running_count > 0,
+             "busy_message": self._busy_message if self.render_queue.running_count > 0 else None,
+             "queue_length": self.render_queue.pending_count
         })
         return info
     
     def unload_models(self):
         """卸載模型釋放記憶體"""
         if self._is_loaded:
+            if self.worker_pool is not None:
+                self.worker_pool.shutdown()
+                self.worker_pool = None
             del self.sdk
             self.sdk = None
+            self._slot_sdks.clear()
             self._is_loaded = False
             
             try:
@@ -439,6 +819,31 @@ class AvatarService:
         """
         Process audio for preview mode: slice duration. (Run in thread)
         """
+        samples = pcm_sidecar.load_sidecar(audio_path)
+        if samples is not None:
+            # Slice the memory-mapped 16 kHz sidecar instead of decoding the whole MP3
+            try:
+                import numpy as np
+                sr = pcm_sidecar.SAMPLE_RATE
+                req_len = int(preview_duration * sr)
+                if len(samples) <= req_len:
+                    return audio_path
+                start = (len(samples) - req_len) // 2
+                clip = samples[start:start + req_len]
+
+                p_audio_path = str(Path(output_path).parent / f"preview_{Path(audio_path).stem}.wav")
+                with wave.open(p_audio_path, "wb") as w:
+                    w.setnchannels(1)
+                    w.setsampwidth(2)
+                    w.setframerate(sr)
+                    w.writeframes((np.clip(clip, -1, 1) * 32767).astype("<i2").tobytes())
+                # The slice doubles as the preview's own sidecar
+                pcm_sidecar.write_samples(clip, pcm_sidecar.sidecar_path(p_audio_path))
+                logger.info(f"Sliced audio saved to: {p_audio_path} (from PCM sidecar)")
+                return p_audio_path
+            except Exception as e:
+                logger.warning(f"Sidecar preview slice failed, decoding MP3: {e}")
+
         try:
             # import imageio_ffmpeg
             from pydub import AudioSegment
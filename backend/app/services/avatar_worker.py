@@ -0,0 +1,303 @@
+"""
+Out-of-process avatar render workers
+
+Each worker process loads one StreamSDK (all Ditto models) at start-up and
+then serves jobs from its slot of the render queue over a pair of
+multiprocessing queues. Render threads (and their torch/onnx thread pools)
+live in the workers, so the web process keeps its GIL and torch settings.
+
+messages
+    parent -> worker:  (method, call_id, kwargs) | None (shutdown)
+                       ("chunk", call_id, pcm bytes) / ("end", call_id, None)   (run_live input)
+    worker -> parent:  ("ready", None, use_mock)
+                       ("progress", call_id, (progress, message, image))
+                       ("done", call_id, result)
+                       ("error", call_id, message)
+"""
+import asyncio
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(slot: int, sdk_kwargs: Dict, num_threads: int, job_q, result_q, cancel_evt):
+    """Entry point of a worker process"""
+    # per-process thread budget (set before torch / onnxruntime are imported)
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(num_threads)
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+    try:
+        from app.services.ditto.stream_pipeline import StreamSDK, run, run_live, gen_motion_batch, USE_MOCK
+        sdk = StreamSDK(**sdk_kwargs)
+    except Exception as e:
+        result_q.put(("error", None, f"Worker {slot} failed to load models: {e}"))
+        return
+    result_q.put(("ready", None, USE_MOCK))
+
+    busy = threading.Event()
+    cancelled = threading.Event()
+    # serializes job start / end with the watcher, so a cancel lands on exactly one job
+    job_lock = threading.Lock()
+
+    def _watch_cancel():
+        while True:
+            cancel_evt.wait()
+            with job_lock:
+                if busy.is_set() and cancel_evt.is_set():
+                    cancel_evt.clear()
+                    cancelled.set()
+                    if hasattr(sdk, "cancel"):
+                        sdk.cancel()
+                    continue
+            # sent between jobs: kept pending, the next job start picks it up
+            busy.wait()
+
+    def _live_chunks(call_id):
+        # run_live input: the job queue carries the audio until "end"
+        while not cancelled.is_set():
+            try:
+                msg = job_q.get(timeout=1)
+            except queue.Empty:
+                continue
+            if msg is None:
+                job_q.put(None)    # shutdown after this job
+                return
+            kind, msg_call_id, data = msg
+            if msg_call_id != call_id:
+                continue
+            if kind == "end":
+                return
+            yield data
+
+    threading.Thread(target=_watch_cancel, daemon=True).start()
+
+    while True:
+        msg = job_q.get()
+        if msg is None:
+            break
+        method, call_id, kwargs = msg
+        if method in ("chunk", "end"):
+            # live input left over from a job that already ended
+            continue
+
+        def progress(p, m, img=None, _call_id=call_id):
+            result_q.put(("progress", _call_id, (p, m, img)))
+
+        with job_lock:
+            cancelled.clear()
+            busy.set()
+            # cancelled before this worker picked the job up
+            if cancel_evt.is_set():
+                cancel_evt.clear()
+                cancelled.set()
+        try:
+            if cancelled.is_set():
+                raise RuntimeError("Render cancelled")
+            if method == "run":
+                result = run(sdk, progress_callback=progress, **kwargs)
+            elif method == "run_live":
+                result = run_live(sdk, _live_chunks(call_id), progress_callback=progress, **kwargs)
+            elif method == "gen_motion_batch":
+                result = gen_motion_batch(sdk, **kwargs)
+            else:
+                raise ValueError(f"Unknown method: {method}")
+            result_q.put(("done", call_id, result))
+        except Exception as e:
+            result_q.put(("error", call_id, f"{type(e).__name__}: {e}"))
+        finally:
+            with job_lock:
+                busy.clear()
+                if hasattr(sdk, "reset_cancel"):
+                    sdk.reset_cancel()
+
+
+class _Worker:
+    """Parent-side handle of one worker process"""
+
+    def __init__(self, slot: int):
+        self.slot = slot
+        self.proc = None
+        self.job_q = None
+        self.result_q = None
+        self.cancel_evt = None
+        self.ready = threading.Event()
+        self.load_error: Optional[str] = None
+        self.use_mock = False
+        self.calls: Dict[int, Dict[str, Any]] = {}  # call_id -> {"future", "loop", "progress"}
+
+
+class AvatarWorkerPool:
+    """數位播報員渲染工作行程池 (每個 render queue 工作槽一個行程)"""
+
+    def __init__(self, num_workers: int, sdk_kwargs: Dict, threads_per_worker: Optional[int] = None):
+        self.num_workers = max(1, int(num_workers))
+        self.sdk_kwargs = sdk_kwargs
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.num_workers)
+        # spawn: CUDA / onnxruntime are not fork-safe once initialized
+        self._ctx = mp.get_context("spawn")
+        self._workers: List[_Worker] = [_Worker(slot) for slot in range(self.num_workers)]
+        self._call_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def use_mock(self) -> bool:
+        return any(w.use_mock for w in self._workers if w.ready.is_set())
+
+    def start(self, wait: bool = True) -> bool:
+        """Spawn every worker that is not running; wait=True blocks until all loaded models"""
+        for worker in self._workers:
+            self._ensure_worker(worker)
+        if wait:
+            for worker in self._workers:
+                worker.ready.wait()
+        return all(w.load_error is None for w in self._workers)
+
+    def _ensure_worker(self, worker: _Worker):
+        with self._lock:
+            if worker.proc is not None and worker.proc.is_alive():
+                return
+            worker.job_q = self._ctx.Queue()
+            worker.result_q = self._ctx.Queue()
+            worker.cancel_evt = self._ctx.Event()
+            worker.ready.clear()
+            worker.load_error = None
+            worker.proc = self._ctx.Process(
+                target=_worker_main,
+                args=(worker.slot, self.sdk_kwargs, self.threads_per_worker,
+                      worker.job_q, worker.result_q, worker.cancel_evt),
+                name=f"avatar-render-{worker.slot}",
+                daemon=True,
+            )
+            worker.proc.start()
+            threading.Thread(target=self._read_results, args=(worker, worker.proc, worker.result_q), daemon=True).start()
+            logger.info(f"Avatar render worker {worker.slot} started (pid {worker.proc.pid}, {self.threads_per_worker} threads)")
+
+    def _read_results(self, worker: _Worker, proc, result_q):
+        """Reader thread: routes worker messages to the waiting coroutines"""
+        while True:
+            try:
+                kind, call_id, data = result_q.get(timeout=1)
+            except queue.Empty:
+                if proc.is_alive():
+                    continue
+                self._fail_all(worker, f"Render worker {worker.slot} exited (code {proc.exitcode})")
+                worker.ready.set()
+                return
+
+            if kind == "ready":
+                worker.use_mock = bool(data)
+                worker.ready.set()
+                continue
+            if call_id is None:
+                # model loading failed
+                worker.load_error = data
+                logger.error(data)
+                worker.ready.set()
+                continue
+
+            call = worker.calls.get(call_id)
+            if call is None:
+                continue
+            if kind == "progress":
+                if call["progress"]:
+                    try:
+                        call["progress"](*data)
+                    except Exception as e:
+                        logger.warning(f"Progress callback failed: {e}")
+            elif kind == "done":
+                worker.calls.pop(call_id, None)
+                call["loop"].call_soon_threadsafe(_set_result, call["future"], data)
+            elif kind == "error":
+                worker.calls.pop(call_id, None)
+                call["loop"].call_soon_threadsafe(_set_exception, call["future"], RuntimeError(data))
+
+    def _fail_all(self, worker: _Worker, message: str):
+        calls, worker.calls = worker.calls, {}
+        for call in calls.values():
+            call["loop"].call_soon_threadsafe(_set_exception, call["future"], RuntimeError(message))
+
+    async def call(
+        self,
+        slot: int,
+        method: str,
+        kwargs: Dict,
+        progress_callback: Optional[Callable] = None,
+        audio_chunks: Optional[AsyncIterator[bytes]] = None,
+    ) -> Any:
+        """
+        Run `method` ("run" | "run_live" | "gen_motion_batch") on the worker of `slot`.
+        audio_chunks: live PCM input of "run_live", forwarded as it arrives
+        """
+        worker = self._workers[slot % self.num_workers]
+        self._ensure_worker(worker)
+        await asyncio.to_thread(worker.ready.wait)
+        if worker.load_error:
+            raise RuntimeError(worker.load_error)
+
+        # a cancel still pending from the slot's previous job must not stop this one;
+        # one sent for this job from here on reaches the worker at job start
+        from app.services.avatar_queue import is_cancelled
+        worker.cancel_evt.clear()
+        if is_cancelled():
+            raise RuntimeError("Render cancelled")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        call_id = next(self._call_ids)
+        worker.calls[call_id] = {"future": future, "loop": loop, "progress": progress_callback}
+        worker.job_q.put((method, call_id, kwargs))
+        if audio_chunks is None:
+            return await future
+
+        async def _forward():
+            try:
+                async for chunk in audio_chunks:
+                    worker.job_q.put(("chunk", call_id, chunk))
+            finally:
+                worker.job_q.put(("end", call_id, None))
+
+        forward_task = asyncio.create_task(_forward())
+        try:
+            return await future
+        finally:
+            forward_task.cancel()
+
+    def cancel(self, slot: int):
+        """Stop the job running on `slot`"""
+        worker = self._workers[slot % self.num_workers]
+        if worker.cancel_evt is not None:
+            worker.cancel_evt.set()
+
+    def shutdown(self):
+        for worker in self._workers:
+            if worker.proc is None:
+                continue
+            try:
+                worker.job_q.put(None)
+                worker.proc.join(timeout=5)
+            except Exception:
+                pass
+            if worker.proc.is_alive():
+                worker.proc.terminate()
+            worker.proc = None
+
+
+def _set_result(future: asyncio.Future, result: Any):
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future: asyncio.Future, exc: Exception):
+    if not future.done():
+        future.set_exception(exc)
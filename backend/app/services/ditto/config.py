@@ -52,6 +52,9 @@ class DittoConfig:
             "fade_in": 5,  # 淡入幀數
             "fade_out": 5,  # 淡出幀數
             "flag_stitching": True,
+            
+            # Warp / Decode
+            "frame_batch_size": 1,  # 每次推理的幀數 (CPU 建議 4-8)
         }
     
     def load_config(self) -> Dict:
@@ -94,6 +97,7 @@ class DittoConfig:
             "overlap_v2": kwargs["overlap_v2"],
             "smo_k_d": kwargs["smo_k_d"],
             "flag_stitching": kwargs["flag_stitching"],
+            "frame_batch_size": kwargs["frame_batch_size"],
         }
     
     def get_run_kwargs(self, **overrides) -> Dict:
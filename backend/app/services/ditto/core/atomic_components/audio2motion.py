@@ -50,6 +50,22 @@ def _cvt_LP_motion_info(inp, mode, ignore_keys=()):
             if s >= len(_arr):
                 break
         return dic
+
+    def _seq_arr2dic(_arr):
+        # [n, dim] -> {k: (n, dim_k)}, slices share memory with _arr
+        dic = {}
+        s = 0
+        for k, _, ss in ks_shape_map:
+            if k in ignore_keys:
+                continue
+            v = _arr[:, s:s + ss]
+            if k == 'scale':
+                v = v + 1
+            dic[k] = v
+            s += ss
+            if s >= _arr.shape[1]:
+                break
+        return dic
     
     if mode == 'dic2arr':
         assert isinstance(inp, dict)
@@ -57,6 +73,9 @@ def _cvt_LP_motion_info(inp, mode, ignore_keys=()):
     elif mode == 'arr2dic':
         assert inp.shape[0] >= 265, f"{inp.shape}"
         return _arr2dic(inp)   # {k: (1, dim)}
+    elif mode == 'arr2dic_seq':
+        assert inp.ndim == 2 and inp.shape[1] >= 265, f"{inp.shape}"
+        return _seq_arr2dic(inp)   # {k: (n, dim)}
     else:
         raise ValueError()
     
@@ -139,16 +158,20 @@ class Audio2Motion:
         return res_kp_seq
     
     def _update_kp_cond(self, res_kp_seq, idx):
+        self.kp_cond = self._next_kp_cond(res_kp_seq, idx, self.clip_idx, self.kp_cond)
+
+    def _next_kp_cond(self, res_kp_seq, idx, clip_idx, kp_cond):
         if self.fix_kp_cond == 0:  # 不重置
-            self.kp_cond = res_kp_seq[:, idx-1]
+            kp_cond = res_kp_seq[:, idx-1]
         elif self.fix_kp_cond > 0:
-            if self.clip_idx % self.fix_kp_cond == 0:  # 重置
-                self.kp_cond = self.s_kp_cond.copy()  # 重置所有
+            if clip_idx % self.fix_kp_cond == 0:  # 重置
+                kp_cond = self.s_kp_cond.copy()  # 重置所有
                 if self.fix_kp_cond_dim is not None:
                     ds, de = self.fix_kp_cond_dim
-                    self.kp_cond[:, ds:de] = res_kp_seq[:, idx-1, ds:de]
+                    kp_cond[:, ds:de] = res_kp_seq[:, idx-1, ds:de]
             else:
-                self.kp_cond = res_kp_seq[:, idx-1]
+                kp_cond = res_kp_seq[:, idx-1]
+        return kp_cond
 
     def _smo(self, res_kp_seq, s, e):
         if self.smo_k_d <= 1:
@@ -168,19 +191,82 @@ class Audio2Motion:
         """
 
         pred_kp_seq = self.lmdm(self.kp_cond, aud_cond, self.sampling_timesteps)
+        res_kp_seq = self._append_pred(res_kp_seq, pred_kp_seq)
+
+        self.clip_idx += 1
+
+        idx = res_kp_seq.shape[1] - self.overlap_v2
+        self._update_kp_cond(res_kp_seq, idx)
+
+        return res_kp_seq
+
+    def _append_pred(self, res_kp_seq, pred_kp_seq):
         if res_kp_seq is None:
             res_kp_seq = pred_kp_seq   # [1, seq_frames, dim]
             res_kp_seq = self._smo(res_kp_seq, 0, res_kp_seq.shape[1])
         else:
             res_kp_seq = self._fuse(res_kp_seq, pred_kp_seq)  # len(res_kp_seq) + valid_clip_len
             res_kp_seq = self._smo(res_kp_seq, res_kp_seq.shape[1] - self.valid_clip_len - self.fuse_length, res_kp_seq.shape[1] - self.valid_clip_len + 1)
+        return res_kp_seq
 
-        self.clip_idx += 1
+    def _clip_cond(self, aud_cond_all, idx):
+        # offline: [num_frames, dim] -> [1, seq_frames, dim], last clip padded with its last frame
+        aud_cond = aud_cond_all[idx:idx + self.seq_frames][None]
+        if aud_cond.shape[1] < self.seq_frames:
+            pad = np.stack([aud_cond[:, -1]] * (self.seq_frames - aud_cond.shape[1]), 1)
+            aud_cond = np.concatenate([aud_cond, pad], 1)
+        return aud_cond
 
-        idx = res_kp_seq.shape[1] - self.overlap_v2
-        self._update_kp_cond(res_kp_seq, idx)
+    def gen_offline(self, aud_cond_all):
+        """
+        aud_cond_all: [num_frames, dim]
+        return: res_kp_seq [1, num_frames, dim]
+        """
+        return self.gen_offline_batch([aud_cond_all])[0]
 
-        return res_kp_seq
+    def gen_offline_batch(self, aud_cond_all_lst, stop_event=None):
+        """
+        Offline motion for several independent sequences (e.g. the slides of
+        one deck). Clips within a sequence stay chained through kp_cond; the
+        sequences advance in lockstep so each DDIM timestep is one
+        (B, seq_frames, dim) LMDM forward.
+
+        aud_cond_all_lst: list of [num_frames, dim]
+        stop_event: threading.Event checked once per clip; set -> RuntimeError("Render cancelled")
+        return: list of res_kp_seq [1, num_frames, dim]
+        """
+        n_seq = len(aud_cond_all_lst)
+        num_frames_lst = [len(aud_cond_all) for aud_cond_all in aud_cond_all_lst]
+        idx_lst = [0] * n_seq
+        clip_idx_lst = [0] * n_seq
+        kp_cond_lst = [self.s_kp_cond.copy() for _ in range(n_seq)]
+        res_kp_seq_lst = [None] * n_seq
+
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                raise RuntimeError("Render cancelled")
+            active = [b for b in range(n_seq) if idx_lst[b] < num_frames_lst[b]]
+            if not active:
+                break
+
+            aud_cond = np.concatenate([self._clip_cond(aud_cond_all_lst[b], idx_lst[b]) for b in active], 0)
+            kp_cond = np.concatenate([kp_cond_lst[b] for b in active], 0)
+            pred_kp_seq = self.lmdm.batch(kp_cond, aud_cond, self.sampling_timesteps)
+
+            for j, b in enumerate(active):
+                res_kp_seq = self._append_pred(res_kp_seq_lst[b], pred_kp_seq[j:j + 1])
+                clip_idx_lst[b] += 1
+                idx = res_kp_seq.shape[1] - self.overlap_v2
+                kp_cond_lst[b] = self._next_kp_cond(res_kp_seq, idx, clip_idx_lst[b], kp_cond_lst[b])
+                res_kp_seq_lst[b] = res_kp_seq
+                idx_lst[b] += self.valid_clip_len
+
+        ret = []
+        for b in range(n_seq):
+            res_kp_seq = res_kp_seq_lst[b][:, :num_frames_lst[b]]
+            res_kp_seq = self._smo(res_kp_seq, 0, res_kp_seq.shape[1])
+            ret.append(res_kp_seq)
+        return ret
     
     def cvt_fmt(self, res_kp_seq):
         # res_kp_seq: [1, n, dim]
@@ -194,3 +280,11 @@ class Audio2Motion:
             x_d_info = _cvt_LP_motion_info(tmp_res_kp_seq[i], 'arr2dic')   # {k: (1, dim)}
             x_d_info_list.append(x_d_info)
         return x_d_info_list
+
+    def cvt_fmt_seq(self, res_kp_seq):
+        # res_kp_seq: [1, n, dim] -> {k: (n, dim)}, one dict for the whole sequence
+        if self.v_min_max_for_clip is not None:
+            tmp_res_kp_seq = np.clip(res_kp_seq[0], self.v_min, self.v_max)
+        else:
+            tmp_res_kp_seq = res_kp_seq[0]
+        return _cvt_LP_motion_info(tmp_res_kp_seq, 'arr2dic_seq')
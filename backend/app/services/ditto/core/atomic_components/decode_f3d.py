@@ -1,3 +1,4 @@
+import numpy as np
 from ..models.decoder import Decoder
 
 
@@ -19,4 +20,13 @@ class DecodeF3D:
     def __call__(self, f_s):
         out = self.decoder(f_s)
         return out
-    
\ No newline at end of file
+
+    def batch(self, f_3d_lst):
+        """
+        Decode several frames in one network call.
+        f_3d_lst: list of (1, 256, 64, 64)
+        return: (B, h, w, c)
+        """
+        f_3d = np.concatenate(f_3d_lst, 0)
+        out = self.decoder.decode_batch(f_3d)
+        return out
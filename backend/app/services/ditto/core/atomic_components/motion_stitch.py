@@ -205,6 +205,34 @@ def _fix_gaze(pose_s, x_d_info):
     return x_d_info
 
 
+def _fix_gaze_seq(pose_s, x_d_info):
+    # _fix_gaze for x_d_info: {k: (n, dim)}
+    x_ratio = 0.26
+    y_ratio = 0.28
+
+    yaw_s, pitch_s = pose_s
+    yaw_d = bin66_to_degree(x_d_info['yaw'])        # (n,)
+    pitch_d = bin66_to_degree(x_d_info['pitch'])    # (n,)
+
+    dx = (yaw_d - yaw_s) * x_ratio
+    dy = (pitch_d - pitch_s) * y_ratio
+
+    exp = x_d_info['exp'].copy()
+    exp[:, 33] += np.where(dx > 0, dx * 0.0007, dx * 0.001)
+    exp[:, 45] += np.where(dx > 0, dx * 0.001, dx * 0.0007)
+    exp[:, 34] += dy * -0.001
+    exp[:, 46] += dy * -0.001
+    x_d_info['exp'] = exp
+    return x_d_info
+
+
+# pose ctrl turns a frame's pose bins into degrees, which only the per-frame path handles
+_POSE_CTRL_KEYS = (
+    "delta_pitch", "delta_yaw", "delta_roll",
+    "alpha_pitch", "alpha_yaw", "alpha_roll",
+)
+
+
 def get_rotation_matrix(pitch_, yaw_, roll_):
     """ the input is in degree
     """
@@ -489,3 +517,122 @@ class MotionStitch:
         self.idx += 1
 
         return x_s, x_d
+
+    def batch(self, x_s_info_lst, x_d_seq, ctrl_kwargs_lst):
+        """
+        Same as __call__ for n consecutive frames at once.
+        x_s_info_lst: [n], x_s_info of the source frame for each driving frame
+        x_d_seq: {k: (n, dim)}, see Audio2Motion.cvt_fmt_seq
+        ctrl_kwargs_lst: [n], per-frame ctrl kwargs
+        return: x_s (n, 21, 3), x_d (n, 21, 3)
+        """
+        n = len(ctrl_kwargs_lst)
+        ctrl_kwargs_lst = [self._merge_kwargs(self.overall_ctrl_info, dict(kw)) for kw in ctrl_kwargs_lst]
+
+        if any(k in kw for kw in ctrl_kwargs_lst for k in _POSE_CTRL_KEYS):
+            x_s_lst, x_d_lst = [], []
+            for i in range(n):
+                x_d_info = {k: v[i:i + 1] for k, v in x_d_seq.items()}
+                x_s, x_d = self.__call__(x_s_info_lst[i], x_d_info, **ctrl_kwargs_lst[i])
+                x_s_lst.append(x_s)
+                x_d_lst.append(x_d)
+            return np.concatenate(x_s_lst, 0), np.concatenate(x_d_lst, 0)
+
+        if self.scale_ratio is None:
+            self.scale_b = x_s_info_lst[0]['scale'].item()
+            self.scale_ratio = self.scale_a / self.scale_b
+            self._set_scale_ratio(self.scale_ratio)
+
+        x_s_info = {
+            k: np.concatenate([info[k] for info in x_s_info_lst], 0)
+            for k in x_s_info_lst[0]
+        }
+
+        if self.relative_d and self.d0 is None:
+            self.d0 = {k: v[0:1].copy() for k, v in x_d_seq.items()}
+
+        x_d_info = _mix_s_d_info(
+            x_s_info,
+            dict(x_d_seq),
+            self.use_d_keys,
+            self.d0,
+        )
+
+        delta_eye = 0
+        if self.drive_eye and self.delta_eye_arr is not None:
+            L = len(self.delta_eye_idx_list)
+            eye_idx = [self.delta_eye_idx_list[(self.idx + i) % L] for i in range(n)]
+            delta_eye = self.delta_eye_arr[eye_idx].reshape(n, -1)
+        x_d_info = _fix_exp_for_x_d_info_v2(
+            x_d_info,
+            x_s_info,
+            delta_eye,
+            self.fix_exp_a1,
+            self.fix_exp_a2,
+            self.fix_exp_a3,
+        )
+
+        # vad: frames with vad_alpha >= 1 keep their exp
+        vad_alpha = np.array([kw.get("vad_alpha", 1) for kw in ctrl_kwargs_lst], dtype=np.float32)[:, None]
+        if (vad_alpha < 1).any():
+            vad_alpha = np.minimum(vad_alpha, 1)
+            x_d_info["exp"] = x_d_info["exp"] * vad_alpha + x_s_info["exp"] * (1 - vad_alpha)
+
+        if any("delta_exp" in kw for kw in ctrl_kwargs_lst):
+            exp = x_d_info["exp"].copy()
+            for i, kw in enumerate(ctrl_kwargs_lst):
+                if "delta_exp" in kw:
+                    exp[i:i + 1] = exp[i:i + 1] + kw["delta_exp"]
+            x_d_info["exp"] = exp
+
+        if self.fade_type == "d0" and self.fade_dst is None:
+            self.fade_dst = {k: v[0:1].copy() for k, v in x_d_info.items()}
+
+        # fade
+        fade_idx = [i for i, kw in enumerate(ctrl_kwargs_lst) if "fade_alpha" in kw]
+        if fade_idx and self.fade_type in ["d0", "s"]:
+            if self.fade_dst is not None:
+                fade_dst = self.fade_dst
+            else:
+                # fade_type == "s", source frame of each driving frame
+                fade_dst = x_s_info
+                if self.is_image_flag:
+                    self.fade_dst = {k: v[0:1].copy() for k, v in x_s_info.items()}
+
+            # per-key alpha, 1 for frames that do not fade this key
+            fade_alpha = {}
+            for i in fade_idx:
+                keys = ctrl_kwargs_lst[i].get("fade_out_keys", self.fade_out_keys)
+                if keys is None:
+                    keys = x_d_info.keys()
+                for k in keys:
+                    if k == 'kp':
+                        continue
+                    if k not in fade_alpha:
+                        fade_alpha[k] = np.ones((n, 1), dtype=np.float32)
+                    fade_alpha[k][i] = ctrl_kwargs_lst[i]["fade_alpha"]
+            for k, alpha in fade_alpha.items():
+                x_d_info[k] = x_d_info[k] * alpha + fade_dst[k] * (1 - alpha)
+
+        if self.drive_eye:
+            if self.pose_s is None:
+                yaw_s = bin66_to_degree(x_s_info_lst[0]['yaw']).item()
+                pitch_s = bin66_to_degree(x_s_info_lst[0]['pitch']).item()
+                self.pose_s = [yaw_s, pitch_s]
+            x_d_info = _fix_gaze_seq(self.pose_s, x_d_info)
+
+        if self.x_s is not None:
+            x_s = np.repeat(self.x_s, n, 0)
+        else:
+            x_s = transform_keypoint(x_s_info)
+            if self.is_image_flag:
+                self.x_s = x_s[0:1]
+
+        x_d = transform_keypoint(x_d_info)
+
+        if self.flag_stitching:
+            x_d = self.stitch_net.batch(x_s, x_d)
+
+        self.idx += n
+
+        return x_s, x_d
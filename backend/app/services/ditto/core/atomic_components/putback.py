@@ -1,3 +1,5 @@
+from collections import deque
+
 import cv2
 import numpy as np
 from ..utils.blend import blend_images_cy
@@ -31,9 +33,17 @@ class PutBackNumpy:
     
 
 class PutBack:
+    """
+    roi=True: only the bounding box of the warped 512 crop is warped and blended.
+    Output frames come from a small buffer pool; pass a frame back with release()
+    once it is written, so its background (outside the roi) can be reused as is.
+    """
+    MAX_POOL = 16
+
     def __init__(
         self,
         mask_template_path=None,
+        roi=True,
     ):
         if mask_template_path is None:
             mask = get_mask(512, 512, 0.9, 0.9)
@@ -44,7 +54,19 @@ class PutBack:
         self.mask_ori_float = np.ascontiguousarray(mask)[:,:,0]
         self.result_buffer = None
 
-    def __call__(self, frame_rgb, render_image, M_c2o):
+        self.roi = roi
+        self.roi_cache = {}     # key -> (x0, y0, x1, y1, M_roi)
+        self.buffer_pool = deque()    # (bg_key, buffer), filled by release()
+        self.buffer_keys = {}    # id(buffer) -> bg_key, for buffers handed out
+        self.roi_buffer = None
+
+    def reset(self):
+        # new source: drop cached rois and backgrounds
+        self.roi_cache = {}
+        self.buffer_pool.clear()
+        self.buffer_keys = {}
+
+    def _full_frame(self, frame_rgb, render_image, M_c2o):
         h, w = frame_rgb.shape[:2]
         mask_warped = cv2.warpAffine(
             self.mask_ori_float, M_c2o[:2, :], dsize=(w, h), flags=cv2.INTER_LINEAR
@@ -57,4 +79,80 @@ class PutBack:
         # Use Cython implementation for blending
         blend_images_cy(mask_warped, frame_warped, frame_rgb, self.result_buffer)
 
-        return self.result_buffer
\ No newline at end of file
+        return self.result_buffer
+
+    def _get_roi(self, frame_rgb, M_c2o, key):
+        if key is not None and key in self.roi_cache:
+            return self.roi_cache[key]
+
+        h, w = frame_rgb.shape[:2]
+        mh, mw = self.mask_ori_float.shape[:2]
+        corners = np.array([[0, 0, 1], [mw, 0, 1], [0, mh, 1], [mw, mh, 1]], dtype=np.float64)
+        pts = corners @ np.asarray(M_c2o[:2, :], dtype=np.float64).T
+
+        # +1 px margin for bilinear sampling
+        x0 = max(int(np.floor(pts[:, 0].min())) - 1, 0)
+        y0 = max(int(np.floor(pts[:, 1].min())) - 1, 0)
+        x1 = min(int(np.ceil(pts[:, 0].max())) + 2, w)
+        y1 = min(int(np.ceil(pts[:, 1].max())) + 2, h)
+
+        M_roi = np.array(M_c2o[:2, :], dtype=np.float64)
+        M_roi[0, 2] -= x0
+        M_roi[1, 2] -= y0
+
+        roi = (x0, y0, x1, y1, M_roi)
+        if key is not None:
+            self.roi_cache[key] = roi
+        return roi
+
+    def _get_buffer(self, frame_rgb, key):
+        buf = None
+        while self.buffer_pool:
+            bg_key, pooled = self.buffer_pool.popleft()
+            if pooled.shape == frame_rgb.shape:
+                buf = pooled
+                break
+        if buf is None:
+            buf = frame_rgb.copy()
+        elif key is None or bg_key != key:
+            np.copyto(buf, frame_rgb)
+        self.buffer_keys[id(buf)] = key
+        return buf
+
+    def release(self, buf):
+        """
+        hand a frame returned by __call__ back once it is no longer used
+        """
+        bg_key = self.buffer_keys.pop(id(buf), None)
+        if self.roi and len(self.buffer_pool) < self.MAX_POOL:
+            self.buffer_pool.append((bg_key, buf))
+
+    def __call__(self, frame_rgb, render_image, M_c2o, key=None):
+        """
+        key: id of the source frame (e.g. frame_idx), roi and background are cached per key
+        """
+        if not self.roi:
+            return self._full_frame(frame_rgb, render_image, M_c2o)
+
+        x0, y0, x1, y1, M_roi = self._get_roi(frame_rgb, M_c2o, key)
+        if x1 <= x0 or y1 <= y0:
+            # face outside the frame
+            return self._get_buffer(frame_rgb, key)
+
+        rw, rh = x1 - x0, y1 - y0
+        mask_warped = cv2.warpAffine(
+            self.mask_ori_float, M_roi, dsize=(rw, rh), flags=cv2.INTER_LINEAR
+        ).clip(0, 1)
+        frame_warped = cv2.warpAffine(
+            render_image, M_roi, dsize=(rw, rh), flags=cv2.INTER_LINEAR
+        )
+        if self.roi_buffer is None or self.roi_buffer.shape[:2] != (rh, rw):
+            self.roi_buffer = np.empty((rh, rw, 3), dtype=np.uint8)
+
+        frame_roi = np.ascontiguousarray(frame_rgb[y0:y1, x0:x1])
+        blend_images_cy(mask_warped, frame_warped, frame_roi, self.roi_buffer)
+
+        result = self._get_buffer(frame_rgb, key)
+        result[y0:y1, x0:x1] = self.roi_buffer
+        return result
+
@@ -1,3 +1,4 @@
+import numpy as np
 from ..models.warp_network import WarpNetwork
 
 
@@ -19,4 +20,15 @@ class WarpF3D:
     def __call__(self, f_s, x_s, x_d):
         out = self.warp_net(f_s, x_s, x_d)
         return out
-    
\ No newline at end of file
+
+    def batch(self, f_s_lst, x_s_lst, x_d_lst):
+        """
+        Warp several frames in one network call.
+        f_s_lst: list of (1, 32, 16, 64, 64); x_s_lst | x_d_lst: list of (1, 21, 3)
+        return: (B, 256, 64, 64)
+        """
+        f_s = np.concatenate(f_s_lst, 0)
+        x_s = np.concatenate(x_s_lst, 0)
+        x_d = np.concatenate(x_d_lst, 0)
+        out = self.warp_net.warp_batch(f_s, x_s, x_d)
+        return out
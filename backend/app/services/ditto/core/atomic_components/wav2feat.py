@@ -1,8 +1,10 @@
 import librosa
 import numpy as np
 import math
+import warnings
 
 from ..aux_models.hubert_stream import HubertStreaming
+from ..utils.audio_feat_cache import make_file_key, make_pcm_key
 
 """
 wavlm_cfg = {
@@ -19,14 +21,21 @@ hubert_cfg = {
 
 
 class Wav2Feat:
-    def __init__(self, w2f_cfg, w2f_type="hubert"):
+    def __init__(self, w2f_cfg, w2f_type="hubert", batch_size=1):
         self.w2f_type = w2f_type.lower()
         if self.w2f_type == "hubert":
-            self.w2f = Wav2FeatHubert(hubert_cfg=w2f_cfg)
+            self.w2f = Wav2FeatHubert(hubert_cfg=w2f_cfg, batch_size=batch_size)
             self.feat_dim = 1024
             self.support_streaming = True
         else:
             raise ValueError(f"Unsupported w2f_type: {w2f_type}")
+        self.feat_cache = None
+
+    def set_cache(self, feat_cache):
+        """
+        feat_cache: AudioFeatCache | None, persists offline features across runs
+        """
+        self.feat_cache = feat_cache
         
     def __call__(
         self, 
@@ -51,34 +60,102 @@ class Wav2Feat:
         chunksize=(3, 5, 2),
     ):
         # for offline
+        feat, _ = self._wav2feat_with_key(audio, sr, norm_mean_std, chunksize)
+        return feat
+
+    def wav2feat_from_file(self, audio_path, chunksize=(3, 5, 2), audio=None):
+        """
+        offline, from an encoded audio file (mp3/wav).
+        A cache hit returns the features without decoding the file.
+        audio: the file's samples at 16 kHz if already available (e.g. a PCM sidecar), skips the decode.
+        """
+        file_key = None
+        if self.feat_cache is not None:
+            file_key = make_file_key(audio_path, w2f_type=self.w2f_type, sr=16000, chunksize=list(chunksize))
+            feat = self.feat_cache.load_by_file(file_key)
+            if feat is not None:
+                return feat
+
+        if audio is None:
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", category=UserWarning, message=".*PySoundFile failed.*")
+                audio, _ = librosa.core.load(audio_path, sr=16000)
+
+        feat, pcm_key = self._wav2feat_with_key(audio, 16000, None, chunksize)
+        if file_key is not None:
+            self.feat_cache.link_file(file_key, pcm_key)
+        return feat
+
+    def _wav2feat_with_key(self, audio, sr, norm_mean_std, chunksize):
+        pcm_key = None
+        if self.feat_cache is not None:
+            pcm_key = make_pcm_key(
+                audio,
+                w2f_type=self.w2f_type,
+                sr=sr,
+                chunksize=list(chunksize),
+                norm_mean_std=norm_mean_std,
+            )
+            feat = self.feat_cache.load(pcm_key)
+            if feat is not None:
+                return feat, pcm_key
+
         if self.w2f_type == "hubert":
             feat = self.w2f.wav2feat(audio, sr=sr, chunksize=chunksize)
         elif self.w2f_type == "s2g":
             feat = self.w2f(audio, sr=sr, norm_mean_std=norm_mean_std)
         else:
             raise ValueError(f"Unsupported w2f_type: {self.w2f_type}")
-        return feat
+
+        if pcm_key is not None:
+            self.feat_cache.save(pcm_key, feat)
+        return feat, pcm_key
     
 
 class Wav2FeatHubert:
     def __init__(
         self,
         hubert_cfg,
+        batch_size=1,
     ):
         self.hubert = HubertStreaming(**hubert_cfg)
+        # offline: number of windows per hubert call (1 = window by window)
+        self.batch_size = max(1, int(batch_size))
+        self._batch_supported = None    # unknown until the first batched call
 
-    def __call__(self, audio_chunk, chunksize=(3, 5, 2)):
-        """
-        audio_chunk: int(sum(chunksize) * 0.04 * 16000) + 80    # 6480
-        """
+    @staticmethod
+    def _valid_feat(encoding_chunk, chunksize):
         valid_feat_s = - sum(chunksize[1:]) * 2   # -7
         valid_feat_e = - chunksize[2] * 2   # -2
 
-        encoding_chunk = self.hubert(audio_chunk)
         valid_encoding = encoding_chunk[valid_feat_s:valid_feat_e]
         valid_feat = valid_encoding.reshape(chunksize[1], 2, 1024).mean(1)    # [5, 1024]
         return valid_feat
 
+    def __call__(self, audio_chunk, chunksize=(3, 5, 2)):
+        """
+        audio_chunk: int(sum(chunksize) * 0.04 * 16000) + 80    # 6480
+        """
+        encoding_chunk = self.hubert(audio_chunk)
+        return self._valid_feat(encoding_chunk, chunksize)
+
+    def _wav2feat_batched(self, speech_pad, starts, split_len, chunksize):
+        """
+        The offline windows do not depend on each other, so K of them are
+        stacked into one [K, 6480] input. Returns None if the model can not
+        run batched; the caller then falls back to window by window.
+        """
+        res_lst = []
+        for b in range(0, len(starts), self.batch_size):
+            audio_chunks = np.stack([speech_pad[sss:sss + split_len] for sss in starts[b:b + self.batch_size]], 0)
+            encodings = self.hubert.forward_batch(audio_chunks)
+            if encodings is None:
+                self._batch_supported = False
+                return None
+            res_lst.extend(self._valid_feat(encoding_chunk, chunksize) for encoding_chunk in encodings)
+        self._batch_supported = True
+        return res_lst
+
     def wav2feat(self, audio, sr, chunksize=(3, 5, 2)):
         # for offline
         if sr != 16000:
@@ -95,6 +172,14 @@ class Wav2FeatHubert:
             np.zeros((split_len,), dtype=audio_16k.dtype),
         ], 0)
         
+        res_lst = None
+        if self.batch_size > 1 and self._batch_supported is not False:
+            starts = [int(i * 0.04 * 16000) for i in range(0, num_f, chunksize[1])]
+            res_lst = self._wav2feat_batched(speech_pad, starts, split_len, chunksize)
+        if res_lst is not None:
+            ret = np.concatenate(res_lst, 0)
+            return ret[:num_f]
+
         i = 0
         res_lst = []
         while i < num_f:
@@ -1,5 +1,10 @@
 import imageio
 import os
+import shutil
+import subprocess
+import tempfile
+import uuid
+import numpy as np
 
 
 class VideoWriterByImageIO:
@@ -34,3 +39,198 @@ class VideoWriterByImageIO:
 
     def close(self):
         self.writer.close()
+
+
+class VideoWriterByFFmpegPipe:
+    """
+    Single-pass writer: raw RGB frames are piped into one ffmpeg process that
+    also takes the narration audio as a second input, so the output is already
+    the final PowerPoint-compatible file (H.264 / yuv420p / AAC / faststart).
+    The ffmpeg process is started lazily on the first frame, once the frame
+    size is known.
+    """
+    def __init__(self, video_path, audio_path=None, fps=25, **kwargs):
+        self.video_path = video_path
+        self.audio_path = audio_path
+        self.fps = fps
+        self.crf = kwargs.get("crf", 18)
+        self.preset = kwargs.get("preset", "medium")
+        self.ffmpeg_path = kwargs.get("ffmpeg_path") or shutil.which("ffmpeg") or "ffmpeg"
+        self.proc = None
+        self._stderr = None
+
+        os.makedirs(os.path.dirname(video_path), exist_ok=True)
+
+    def _build_cmd(self, w, h):
+        cmd = [
+            self.ffmpeg_path, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{w}x{h}", "-r", str(self.fps),
+            "-i", "-",
+        ]
+        if self.audio_path:
+            cmd += ["-i", self.audio_path, "-map", "0:v", "-map", "1:a", "-c:a", "aac"]
+        cmd += [
+            # yuv420p needs even dimensions
+            "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+            "-c:v", "libx264",
+            "-preset", self.preset,
+            "-crf", str(self.crf),
+            "-pix_fmt", "yuv420p",
+            "-movflags", "+faststart",
+            self.video_path,
+        ]
+        return cmd
+
+    def _start(self, w, h):
+        self._stderr = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(
+            self._build_cmd(w, h),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=self._stderr,
+        )
+
+    def _read_stderr(self):
+        if self._stderr is None:
+            return ""
+        self._stderr.seek(0)
+        return self._stderr.read().decode("utf-8", errors="ignore").strip()
+
+    def __call__(self, img, fmt="bgr"):
+        if fmt == "bgr":
+            frame = img[..., ::-1]
+        else:
+            frame = img
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+
+        if self.proc is None:
+            h, w = frame.shape[:2]
+            self._start(w, h)
+        try:
+            self.proc.stdin.write(frame.data)
+        except BrokenPipeError:
+            raise RuntimeError(f"ffmpeg exited early: {self._read_stderr()}")
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self.proc.wait()
+        err = self._read_stderr()
+        self._stderr.close()
+        self.proc = None
+        if returncode != 0:
+            if os.path.exists(self.video_path):
+                os.remove(self.video_path)
+            raise RuntimeError(f"ffmpeg failed ({returncode}): {err}")
+
+
+class VideoWriterByNpy:
+    """
+    Writes frames into a [n_frames, h, w, 3] uint8 .npy file (memory-mappable),
+    e.g. the cached idle clip. The file only appears once close() succeeds.
+    """
+    def __init__(self, video_path, n_frames, **kwargs):
+        self.video_path = video_path
+        self.n_frames = n_frames
+        # unique per writer: thread-mode render slots share one process
+        self.tmp_path = f"{video_path}.{uuid.uuid4().hex[:8]}.tmp.npy"
+        self.arr = None
+        self.idx = 0
+
+        os.makedirs(os.path.dirname(video_path), exist_ok=True)
+
+    def __call__(self, img, fmt="bgr"):
+        if fmt == "bgr":
+            frame = img[..., ::-1]
+        else:
+            frame = img
+
+        if self.arr is None:
+            h, w = frame.shape[:2]
+            self.arr = np.lib.format.open_memmap(
+                self.tmp_path, mode="w+", dtype=np.uint8, shape=(self.n_frames, h, w, 3)
+            )
+        if self.idx < self.n_frames:
+            self.arr[self.idx] = frame
+            self.idx += 1
+
+    def close(self):
+        if self.arr is None:
+            return
+        self.arr.flush()
+        self.arr = None
+        if self.idx == self.n_frames:
+            os.replace(self.tmp_path, self.video_path)
+        elif os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+            raise RuntimeError(f"npy writer incomplete: {self.idx}/{self.n_frames} frames")
+
+
+class VideoWriterByHLS(VideoWriterByFFmpegPipe):
+    """
+    Progressive variant of the single-pass writer: the ffmpeg process emits an
+    HLS event playlist (stream_dir/index.m3u8 + 2s MPEG-TS segments) while
+    frames are still arriving, so the video can be played before the render
+    ends. close() remuxes the segments into video_path (stream copy, no
+    re-encode), which is the same final H.264 / AAC / faststart file.
+    """
+    PLAYLIST = "index.m3u8"
+
+    def __init__(self, video_path, stream_dir, audio_path=None, fps=25, segment_time=2, **kwargs):
+        super().__init__(video_path, audio_path=audio_path, fps=fps, **kwargs)
+        self.stream_dir = stream_dir
+        self.segment_time = segment_time
+        self.playlist_path = os.path.join(stream_dir, self.PLAYLIST)
+        os.makedirs(stream_dir, exist_ok=True)
+
+    def _build_cmd(self, w, h):
+        cmd = [
+            self.ffmpeg_path, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{w}x{h}", "-r", str(self.fps),
+            "-i", "-",
+        ]
+        if self.audio_path:
+            cmd += ["-i", self.audio_path, "-map", "0:v", "-map", "1:a", "-c:a", "aac"]
+        cmd += [
+            "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+            "-c:v", "libx264",
+            "-preset", self.preset,
+            "-crf", str(self.crf),
+            "-pix_fmt", "yuv420p",
+            # a keyframe at every segment boundary
+            "-force_key_frames", f"expr:gte(t,n_forced*{self.segment_time})",
+            # audio is read from a file: hold it until the video catches up
+            "-max_interleave_delta", "0",
+            "-f", "hls",
+            "-hls_time", str(self.segment_time),
+            "-hls_list_size", "0",
+            "-hls_playlist_type", "event",
+            "-hls_flags", "temp_file",
+            "-hls_segment_filename", os.path.join(self.stream_dir, "seg_%05d.ts"),
+            self.playlist_path,
+        ]
+        return cmd
+
+    def close(self):
+        if self.proc is None:
+            return
+        super().close()
+
+        cmd = [
+            self.ffmpeg_path, "-y", "-loglevel", "error",
+            "-i", self.playlist_path,
+            "-c", "copy",
+        ]
+        if self.audio_path:
+            cmd += ["-bsf:a", "aac_adtstoasc"]
+        cmd += ["-movflags", "+faststart", self.video_path]
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            if os.path.exists(self.video_path):
+                os.remove(self.video_path)
+            err = result.stderr.decode("utf-8", errors="ignore").strip()
+            raise RuntimeError(f"ffmpeg remux failed ({result.returncode}): {err}")
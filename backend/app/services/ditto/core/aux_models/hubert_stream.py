@@ -27,3 +27,23 @@ class HubertStreaming:
         else:
             output = self.forward_chunk(audio_chunk)
         return output
+
+    def forward_batch(self, audio_chunks):
+        """
+        audio_chunks: [K, 6480] independent windows
+        return: [K, T, 1024], or None if the model cannot run batched
+        """
+        try:
+            if self.model_type == "onnx":
+                output = self.model.run(None, {"input_values": audio_chunks})[0]
+            elif self.model_type == "ori" and hasattr(self.model, "session"):
+                output = self.model.session.run(None, {"input_values": audio_chunks})[0]
+            else:
+                # tensorrt engines are built with a fixed input shape
+                return None
+        except Exception:
+            # e.g. onnx export with a static batch dim of 1
+            return None
+        if output.ndim != 3 or output.shape[0] != audio_chunks.shape[0]:
+            return None
+        return output
@@ -11,8 +11,7 @@ class Decoder:
         self.model, self.model_type = load_model(model_path, device=device, **kwargs)
         self.device = device
         
-    def __call__(self, feature):
-
+    def _forward(self, feature):
         if self.model_type == "onnx":
             pred = self.model.run(None, {"feature": feature})[0]
         elif self.model_type == "tensorrt":
@@ -26,7 +25,23 @@ class Decoder:
                 pred = self.model(torch.from_numpy(feature).to(self.device)).float().cpu().numpy()
         else:
             raise ValueError(f"Unsupported model type: {self.model_type}")
-        
+        return pred
+
+    def __call__(self, feature):
+        pred = self._forward(feature)
         pred = np.transpose(pred[0], [1, 2, 0]).clip(0, 1) * 255    # [h, w, c]
         
         return pred
+
+    def decode_batch(self, feature):
+        """
+        feature: np.ndarray, shape (B, 256, 64, 64)
+        return: np.ndarray, shape (B, h, w, c)
+        """
+        if self.model_type != "pytorch":
+            # onnx / tensorrt exports are built with a fixed batch of 1
+            return np.stack([self.__call__(feature[i:i + 1]) for i in range(len(feature))], 0)
+
+        pred = self._forward(feature)
+        pred = np.transpose(pred, [0, 2, 3, 1]).clip(0, 1) * 255    # [b, h, w, c]
+        return pred
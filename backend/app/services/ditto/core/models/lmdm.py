@@ -21,6 +21,7 @@ class LMDM:
 
         self.model, self.model_type = load_model(model_path, device=device, **kwargs)
         self.device = device
+        self._batch_supported = None    # onnx: unknown until the first batched call
 
         self.motion_feat_dim = kwargs.get("motion_feat_dim", 265)
         self.audio_feat_dim = kwargs.get("audio_feat_dim", 1024+35)
@@ -104,13 +105,14 @@ class LMDM:
 
         cond_frame = kp_cond
         cond = aud_cond
+        batch_size = cond.shape[0]
 
-        x = np.random.randn(1, self.seq_frames, self.motion_feat_dim).astype(np.float32)
+        x = np.random.randn(batch_size, self.seq_frames, self.motion_feat_dim).astype(np.float32)
 
         x_start = None
         i = 0
         for _, time_next in self.time_pairs:
-            time_cond = self.time_cond_list[i]
+            time_cond = np.repeat(self.time_cond_list[i], batch_size)
             pred_noise, x_start = self._one_step(x, cond_frame, cond, time_cond)
             if time_next < 0:
                 x = x_start
@@ -137,4 +139,25 @@ class LMDM:
             pred_kp_seq = self._call_np(kp_cond, aud_cond, sampling_timesteps)
         return pred_kp_seq
 
-
+    def batch(self, kp_cond, aud_cond, sampling_timesteps):
+        """
+        kp_cond: [B, dim], aud_cond: [B, seq_frames, dim]
+        return: [B, seq_frames, motion_feat_dim]
+        """
+        if self.model_type == "pytorch":
+            return self.__call__(kp_cond, aud_cond, sampling_timesteps)
+
+        if self.model_type == "onnx" and self._batch_supported is not False:
+            try:
+                pred_kp_seq = self._call_np(kp_cond, aud_cond, sampling_timesteps)
+                self._batch_supported = True
+                return pred_kp_seq
+            except Exception:
+                # onnx export with a static batch dim of 1
+                self._batch_supported = False
+
+        # tensorrt / static-batch onnx: one sequence at a time
+        return np.concatenate([
+            self.__call__(kp_cond[i:i + 1], aud_cond[i:i + 1], sampling_timesteps)
+            for i in range(len(aud_cond))
+        ], 0)
@@ -126,18 +126,23 @@ class LMDM(nn.Module):
 
     @torch.no_grad()
     def ddim_sample(self, kp_cond, aud_cond, sampling_timesteps):
+        """
+        kp_cond: [B, dim], aud_cond: [B, seq_frames, dim]
+        B > 1 advances independent sequences in lockstep, one forward per timestep.
+        """
         self.setup(sampling_timesteps)
 
         cond_frame = kp_cond
         cond = aud_cond
+        batch_size = cond.shape[0]
 
-        shape = (1, self.seq_frames, self.motion_feat_dim)
+        shape = (batch_size, self.seq_frames, self.motion_feat_dim)
         x = torch.randn(shape, device=self.device)
 
         x_start = None
         i = 0
         for _, time_next in self.time_pairs:
-            time_cond = self.time_cond_list[i]
+            time_cond = self.time_cond_list[i].expand(batch_size)
             pred_noise, x_start = self.model_predictions(x, cond_frame, cond, time_cond)
             if time_next < 0:
                 x = x_start
@@ -10,6 +10,7 @@ class StitchNetwork:
         }
         self.model, self.model_type = load_model(model_path, device=device, **kwargs)
         self.device = device
+        self._batch_supported = None    # onnx: unknown until the first batched call
 
     def __call__(self, kp_source, kp_driving):
         if self.model_type == "onnx":
@@ -28,3 +29,26 @@ class StitchNetwork:
             raise ValueError(f"Unsupported model type: {self.model_type}")
         
         return pred
+
+    def batch(self, kp_source, kp_driving):
+        """
+        kp_source, kp_driving: [B, 21, 3]
+        return: [B, 21, 3]
+        """
+        if self.model_type == "pytorch" or len(kp_driving) == 1:
+            return self.__call__(kp_source, kp_driving)
+
+        if self.model_type == "onnx" and self._batch_supported is not False:
+            try:
+                pred = self.__call__(kp_source, kp_driving)
+                self._batch_supported = True
+                return pred
+            except Exception:
+                # onnx export with a static batch dim of 1
+                self._batch_supported = False
+
+        # tensorrt / static-batch onnx: one frame at a time
+        return np.concatenate([
+            self.__call__(kp_source[i:i + 1], kp_driving[i:i + 1])
+            for i in range(len(kp_driving))
+        ], 0)
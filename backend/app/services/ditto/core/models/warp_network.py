@@ -35,3 +35,16 @@ class WarpNetwork:
             raise ValueError(f"Unsupported model type: {self.model_type}")
         
         return pred
+
+    def warp_batch(self, feature_3d, kp_source, kp_driving):
+        """
+        feature_3d: np.ndarray, shape (B, 32, 16, 64, 64)
+        kp_source | kp_driving: np.ndarray, shape (B, 21, 3)
+        """
+        if self.model_type != "pytorch":
+            # onnx / tensorrt exports are built with a fixed batch of 1
+            return np.concatenate([
+                self.__call__(feature_3d[i:i + 1], kp_source[i:i + 1], kp_driving[i:i + 1])
+                for i in range(len(feature_3d))
+            ], 0)
+        return self.__call__(feature_3d, kp_source, kp_driving)
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import uuid
+
+import numpy as np
+
+
+"""
+Disk cache for audio features (e.g. hubert [num_f, 1024]).
+
+layout:
+    cache_dir/
+        <pcm_key>.npy     features, keyed by sha256(pcm) + sr + chunksize
+        <file_key>.ref    text file holding a pcm_key, keyed by sha256(file bytes) + params
+
+The .ref indirection lets a caller that only has the encoded audio file
+(mp3/wav) find the features without decoding it first.
+"""
+
+
+def _hash_params(h, **params):
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def make_pcm_key(audio, **params):
+    h = hashlib.sha256()
+    h.update(str(audio.dtype).encode())
+    h.update(np.ascontiguousarray(audio).data)
+    return _hash_params(h, **params)
+
+
+def make_file_key(audio_path, chunk_size=1 << 20, **params):
+    h = hashlib.sha256()
+    with open(audio_path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return _hash_params(h, **params)
+
+
+class AudioFeatCache:
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key, ext):
+        return os.path.join(self.cache_dir, f"{key}.{ext}")
+
+    def _atomic_write(self, path, write_fn):
+        # a failed write only costs a future cache miss, never the render
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            write_fn(tmp_path)
+            os.replace(tmp_path, path)
+            return True
+        except OSError:
+            return False
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load(self, pcm_key):
+        try:
+            return np.load(self._path(pcm_key, "npy"))
+        except (OSError, ValueError):
+            return None
+
+    def save(self, pcm_key, feat):
+        def _write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                np.save(f, feat)
+        return self._atomic_write(self._path(pcm_key, "npy"), _write)
+
+    def load_by_file(self, file_key):
+        try:
+            with open(self._path(file_key, "ref"), "r", encoding="utf-8") as f:
+                pcm_key = f.read().strip()
+        except OSError:
+            return None
+        return self.load(pcm_key)
+
+    def link_file(self, file_key, pcm_key):
+        def _write(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(pcm_key)
+        return self._atomic_write(self._path(file_key, "ref"), _write)
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+"""
+Energy based silence detection on 16 kHz audio, at video frame resolution
+(one frame = sr / fps samples, 640 for 16 kHz / 25 fps).
+"""
+
+
+def frame_rms_db(audio, sr=16000, fps=25):
+    """
+    return: [num_f] rms (dB) of each video frame
+    """
+    hop = sr // fps
+    num_f = int(np.ceil(len(audio) / hop))
+    pad = num_f * hop - len(audio)
+    frames = np.pad(audio.astype(np.float32), (0, pad)).reshape(num_f, hop)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-8))
+
+
+def detect_silence(
+    audio,
+    sr=16000,
+    fps=25,
+    thresh_db=-35,
+    min_silence_s=0.8,
+    pad_frames=3,
+):
+    """
+    thresh_db: silent if rms < speech level (95th percentile) + thresh_db
+    min_silence_s: shorter pauses stay rendered (mouth keeps moving naturally)
+    pad_frames: speech on/offset margin kept rendered on both sides
+
+    return: [(start, end)] silent frame ranges, end exclusive
+    """
+    rms_db = frame_rms_db(audio, sr, fps)
+    if len(rms_db) == 0:
+        return []
+
+    ref_db = np.percentile(rms_db, 95)
+    silent = rms_db < max(ref_db + thresh_db, -60)
+
+    # run lengths of silent frames
+    edges = np.diff(np.concatenate([[0], silent.astype(np.int8), [0]]))
+    starts = np.where(edges == 1)[0]
+    ends = np.where(edges == -1)[0]
+
+    num_f = len(rms_db)
+    min_len = int(min_silence_s * fps)
+    spans = []
+    for s, e in zip(starts, ends):
+        if e - s < min_len:
+            continue
+        # leading / trailing silence keeps no margin at the clip border
+        s = s if s == 0 else s + pad_frames
+        e = e if e == num_f else e - pad_frames
+        if e > s:
+            spans.append((int(s), int(e)))
+    return spans
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+
+"""
+Disk cache for avatar registration results (source_info).
+
+layout:
+    cache_dir/
+        <key>/
+            meta.json
+            f_s.npy         [n, 1, 32, 16, 64, 64]
+            M_c2o.npy       [n, 3, 3]
+            eye_open.npy    [n, 1, 2]
+            eye_ball.npy    [n, 1, 6]
+            sc.npy          [63]
+            x_s_info.<k>.npy   [n, ...] for every key of x_s_info
+
+Arrays are opened with mmap_mode="c" (copy-on-write), so a hit only pages in
+what the pipeline actually touches and never writes back to the cache.
+"""
+
+
+def _hash_file(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def make_source_key(source_path, **params):
+    """
+    sha256(source bytes) + registration params -> cache key
+    params: max_dim, n_frames, smo_k_s, crop_* ...
+    """
+    h = hashlib.sha256()
+    h.update(_hash_file(source_path).encode())
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class SourceInfoCache:
+    VERSION = 1
+    ARR_KEYS = ["f_s", "M_c2o", "eye_open", "eye_ball"]
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def has(self, key):
+        return os.path.isfile(os.path.join(self._entry_dir(key), "meta.json"))
+
+    def save(self, key, source_info):
+        """
+        source_info: output of AvatarRegistrar (img_rgb_lst is not stored)
+        """
+        if self.has(key):
+            return
+
+        # write to a private tmp dir, then rename into place (atomic for readers)
+        tmp_dir = os.path.join(self.cache_dir, f".tmp_{key}_{uuid.uuid4().hex[:8]}")
+        os.makedirs(tmp_dir)
+        try:
+            for k in self.ARR_KEYS:
+                arr = np.stack(source_info[f"{k}_lst"], 0)
+                np.save(os.path.join(tmp_dir, f"{k}.npy"), arr)
+            np.save(os.path.join(tmp_dir, "sc.npy"), np.asarray(source_info["sc"]))
+
+            x_s_info_lst = source_info["x_s_info_lst"]
+            x_s_info_keys = list(x_s_info_lst[0].keys())
+            for k in x_s_info_keys:
+                arr = np.stack([x_s_info[k] for x_s_info in x_s_info_lst], 0)
+                np.save(os.path.join(tmp_dir, f"x_s_info.{k}.npy"), arr)
+
+            meta = {
+                "version": self.VERSION,
+                "n_frames": len(x_s_info_lst),
+                "is_image_flag": bool(source_info["is_image_flag"]),
+                "x_s_info_keys": x_s_info_keys,
+            }
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+            os.rename(tmp_dir, self._entry_dir(key))
+        except OSError:
+            # another process won the race (or disk error): keep whatever is there
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def load(self, key):
+        """
+        return: source_info without img_rgb_lst, or None on miss
+        """
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != self.VERSION:
+                return None
+
+            def _load(name):
+                return np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode="c")
+
+            n = meta["n_frames"]
+            source_info = {}
+            for k in self.ARR_KEYS:
+                arr = _load(k)
+                source_info[f"{k}_lst"] = [arr[i] for i in range(n)]
+
+            x_s_info_arrs = {k: _load(f"x_s_info.{k}") for k in meta["x_s_info_keys"]}
+            source_info["x_s_info_lst"] = [
+                {k: v[i] for k, v in x_s_info_arrs.items()} for i in range(n)
+            ]
+            source_info["sc"] = _load("sc")
+            source_info["is_image_flag"] = meta["is_image_flag"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return source_info
@@ -243,6 +243,41 @@ def mock_run(
     return output_path
 
 
+def mock_gen_motion_batch(
+    SDK: MockStreamSDK,
+    audio_paths: list,
+    source_path: str,
+    more_kwargs: Optional[Dict] = None,
+):
+    """模擬模式沒有動作序列，回傳 None 讓 run 走一般流程"""
+    logger.info(f"[Mock] 略過批次動作生成 ({len(audio_paths)} 段音訊)")
+    return [None] * len(audio_paths)
+
+
+def mock_run_live(
+    SDK: MockStreamSDK,
+    audio_chunks,
+    source_path: str,
+    output_path: str,
+    more_kwargs: Optional[Dict] = None,
+    progress_callback: Optional[Callable] = None
+):
+    """模擬即時模式: 收完分段音訊 (16 kHz mono int16 PCM) 後走一般模擬流程"""
+    import wave
+
+    audio_path = output_path + ".live.wav"
+    with wave.open(audio_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        for chunk in audio_chunks:
+            wav.writeframes(chunk)
+    try:
+        return mock_run(SDK, audio_path, source_path, output_path, more_kwargs, progress_callback)
+    finally:
+        os.remove(audio_path)
+
+
 # ============================================
 # 使用範例
 # ============================================
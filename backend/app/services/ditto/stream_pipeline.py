@@ -18,7 +18,9 @@ import warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="librosa")
 warnings.filterwarnings("ignore", category=FutureWarning, module="librosa")
 from pathlib import Path
-from typing import Dict, Optional, Callable
+from typing import Dict, Iterable, List, Optional, Callable
+
+from app.utils.pcm_sidecar import load_sidecar
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +33,26 @@ if str(current_dir) not in sys.path:
 # 若 onnxruntime 無法安裝（Python 3.14），會自動降級到 mock 模式
 DITTO_MODE = os.getenv("DITTO_MODE", "full").lower()
 
+class _LiveWavWriter:
+    """16 kHz mono int16 wav, appended chunk by chunk (live mode audio track)"""
+
+    def __init__(self, path: str):
+        import wave
+        self._wav = wave.open(path, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(16000)
+
+    def write(self, chunk: bytes):
+        self._wav.writeframes(chunk)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._wav.close()
+
+
 def get_device():
     """判斷可用設備"""
     import torch
@@ -54,53 +76,165 @@ try:
             more_kwargs: Optional[Dict] = None,
             progress_callback: Optional[Callable] = None
         ):
-            import librosa
-            import math
-            import numpy as np
-            
             if more_kwargs is None:
                 more_kwargs = {}
                 
             setup_kwargs = more_kwargs.get("setup_kwargs", {})
             run_kwargs = more_kwargs.get("run_kwargs", {})
 
+            # 單次編碼: writer 直接輸出含音訊的最終檔案，不需要再 mux
+            single_pass = setup_kwargs.get("writer_type") in ("ffmpeg_pipe", "hls")
+            if single_pass:
+                setup_kwargs = {**setup_kwargs, "audio_path": audio_path}
+
             if progress_callback: progress_callback(10, "初始化 SDK...")
             
             if hasattr(SDK, "set_progress_callback"):
                 SDK.set_progress_callback(progress_callback)
+
+            # 靜音感知: 靜音片段改用快取的待機動作，不再逐幀渲染
+            silent_spans = None
+            idle_frames = None
+            # 16 kHz PCM sidecar from the TTS stage (memory-mapped): skips MP3 decode + resample
+            pcm = load_sidecar(audio_path)
+            if run_kwargs.get("skip_silence", False):
+                silent_spans = _detect_silence_file(audio_path, pcm)
+                if silent_spans:
+                    if progress_callback: progress_callback(15, "準備待機動作...")
+                    idle_frames = SDK.render_idle(source_path, **setup_kwargs)
             
             SDK.setup(source_path, output_path, **setup_kwargs)
 
             if progress_callback: progress_callback(30, "處理音訊...")
             
-            # 抑制 PySoundFile 警告
-            with warnings.catch_warnings():
-                warnings.filterwarnings("ignore", category=UserWarning, message=".*PySoundFile failed.*")
-                audio, sr = librosa.core.load(audio_path, sr=16000)
-            num_f = math.ceil(len(audio) / 16000 * 25)
+            # 音訊特徵 (快取命中時略過 MP3 解碼與 HuBERT 推理)
+            aud_feat = SDK.wav2feat.wav2feat_from_file(audio_path, audio=pcm)
+            num_f = len(aud_feat)
 
             fade_in = run_kwargs.get("fade_in", -1)
             fade_out = run_kwargs.get("fade_out", -1)
             ctrl_info = run_kwargs.get("ctrl_info", {})
             SDK.setup_Nd(N_d=num_f, fade_in=fade_in, fade_out=fade_out, ctrl_info=ctrl_info)
+            if silent_spans:
+                n_idle = SDK.setup_idle(silent_spans, idle_frames)
+                logger.info(f"靜音幀改用待機動作: {n_idle}/{num_f}")
 
             if progress_callback: progress_callback(50, f"開始推理 ({num_f} 幀)...")
             
-            # 使用非同步安全的模式（如果有 tqdm 就關閉它或重導向）
-            aud_feat = SDK.wav2feat.wav2feat(audio)
-            SDK.audio2motion_queue.put(aud_feat)
+            # 預先算好的動作序列 (gen_motion_batch) 可直接跳過 LMDM
+            res_kp_seq = run_kwargs.get("res_kp_seq")
+            if res_kp_seq is not None:
+                SDK.audio2motion_queue.put({"res_kp_seq": res_kp_seq})
+            else:
+                SDK.audio2motion_queue.put(aud_feat)
             
             # 關閉並等待完成
             SDK.close()
 
-            if progress_callback: progress_callback(90, "合併音訊影片...")
-            # 合併音訊 (ffmpeg)
-            cmd = f'ffmpeg -loglevel error -y -i "{SDK.tmp_output_path}" -i "{audio_path}" -map 0:v -map 1:a -c:v copy -c:a aac "{output_path}"'
-            os.system(cmd)
+            if not single_pass:
+                if progress_callback: progress_callback(90, "合併音訊影片...")
+                # 合併音訊 (ffmpeg)
+                cmd = f'ffmpeg -loglevel error -y -i "{SDK.tmp_output_path}" -i "{audio_path}" -map 0:v -map 1:a -c:v copy -c:a aac "{output_path}"'
+                os.system(cmd)
             
             if progress_callback: progress_callback(100, "生成完成")
             return output_path
 
+        def run_live(
+            SDK: StreamSDK,
+            audio_chunks: Iterable[bytes],
+            source_path: str,
+            output_path: str,
+            more_kwargs: Optional[Dict] = None,
+            progress_callback: Optional[Callable] = None
+        ):
+            """
+            即時模式: 音訊以 16 kHz mono int16 PCM 分段送入 (WebSocket / 逐步產生的 TTS)，
+            online LMDM 逐段產生動作，畫面隨即流過既有佇列；音訊結束後再合併成最終影片
+            """
+            import numpy as np
+
+            if more_kwargs is None:
+                more_kwargs = {}
+            run_kwargs = more_kwargs.get("run_kwargs", {})
+            setup_kwargs = {**more_kwargs.get("setup_kwargs", {}), "online_mode": True}
+            # 完整音訊要到最後才有: writer 只寫影像 (HLS 可即時播放)，音訊最後再合併
+            setup_kwargs.pop("audio_path", None)
+            if setup_kwargs.get("writer_type") != "hls":
+                setup_kwargs["writer_type"] = "imageio"
+
+            if progress_callback: progress_callback(10, "初始化 SDK...")
+            if hasattr(SDK, "set_progress_callback"):
+                SDK.set_progress_callback(progress_callback)
+
+            SDK.setup(source_path, output_path, **setup_kwargs)
+            SDK.setup_Nd(
+                N_d=-1,
+                fade_in=run_kwargs.get("fade_in", -1),
+                ctrl_info=run_kwargs.get("ctrl_info", {}),
+            )
+            SDK.start_live(chunksize=run_kwargs.get("chunksize", (3, 5, 2)))
+
+            if progress_callback: progress_callback(30, "等待音訊...")
+            wav_path = output_path + ".live.wav"
+            rest = b""    # odd trailing byte of a chunk (int16 split across messages)
+            with _LiveWavWriter(wav_path) as wav:
+                for chunk in audio_chunks:
+                    if SDK.stop_event.is_set():
+                        break
+                    chunk = rest + chunk
+                    n = len(chunk) // 2 * 2
+                    chunk, rest = chunk[:n], chunk[n:]
+                    wav.write(chunk)
+                    pcm = np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
+                    SDK.feed_audio(pcm)
+
+            try:
+                num_f = SDK.finish_audio(fade_out=run_kwargs.get("fade_out", -1))
+                logger.info(f"即時模式音訊結束: {num_f} 幀")
+                SDK.close()
+
+                if progress_callback: progress_callback(90, "合併音訊影片...")
+                cmd = f'ffmpeg -loglevel error -y -i "{SDK.tmp_output_path}" -i "{wav_path}" -map 0:v -map 1:a -c:v copy -c:a aac "{output_path}"'
+                os.system(cmd)
+            finally:
+                if os.path.exists(wav_path):
+                    os.remove(wav_path)
+                if SDK.tmp_output_path != output_path and os.path.exists(SDK.tmp_output_path):
+                    os.remove(SDK.tmp_output_path)
+
+            if progress_callback: progress_callback(100, "生成完成")
+            return output_path
+
+        def _detect_silence_file(audio_path: str, pcm=None):
+            """靜音區段 [(start, end)] (以 25fps 幀為單位)"""
+            from core.utils.silence import detect_silence
+
+            if pcm is None:
+                import librosa
+                pcm, _ = librosa.core.load(audio_path, sr=16000)
+            return detect_silence(pcm, sr=16000, fps=25)
+
+        def gen_motion_batch(
+            SDK: StreamSDK,
+            audio_paths: List[str],
+            source_path: str,
+            more_kwargs: Optional[Dict] = None,
+        ):
+            """
+            多張投影片共用同一頭像時，一次產生所有音訊的動作序列
+            (各投影片的 LMDM 擴散迴圈同步批次執行)，結果交給 run_kwargs["res_kp_seq"]
+            """
+            if more_kwargs is None:
+                more_kwargs = {}
+            setup_kwargs = more_kwargs.get("setup_kwargs", {})
+
+            aud_feat_lst = [
+                SDK.wav2feat.wav2feat_from_file(audio_path, audio=load_sidecar(audio_path))
+                for audio_path in audio_paths
+            ]
+            return SDK.gen_motion_batch(source_path, aud_feat_lst, **setup_kwargs)
+
         USE_MOCK = False
         logger.info("✓ 使用完整 Ditto 實作")
     else:
@@ -111,7 +245,9 @@ except Exception as e:
     logger.info("ℹ️  降級到模擬模式")
     from .mock_implementation import MockStreamSDK as StreamSDK
     from .mock_implementation import mock_run as run
+    from .mock_implementation import mock_gen_motion_batch as gen_motion_batch
+    from .mock_implementation import mock_run_live as run_live
     USE_MOCK = True
 
 # 導出
-__all__ = ['StreamSDK', 'run', 'USE_MOCK', 'get_device']
+__all__ = ['StreamSDK', 'run', 'run_live', 'gen_motion_batch', 'USE_MOCK', 'get_device']
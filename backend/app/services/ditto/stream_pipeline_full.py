@@ -14,10 +14,15 @@ from core.atomic_components.motion_stitch import MotionStitch
 from core.atomic_components.warp_f3d import WarpF3D
 from core.atomic_components.decode_f3d import DecodeF3D
 from core.atomic_components.putback import PutBack
-from core.atomic_components.writer import VideoWriterByImageIO
+from core.atomic_components.writer import VideoWriterByImageIO, VideoWriterByFFmpegPipe, VideoWriterByNpy, VideoWriterByHLS
 from core.atomic_components.wav2feat import Wav2Feat
 from core.atomic_components.cfg import parse_cfg, print_cfg
+from core.atomic_components.loader import load_source_frames
 from core.utils.face_restoration import FaceRestorer
+from core.utils.source_info_cache import SourceInfoCache, make_source_key
+from core.utils.audio_feat_cache import AudioFeatCache
+import os
+import math
 
 
 class StreamSDK:
@@ -35,6 +40,8 @@ class StreamSDK:
         ] = parse_cfg(cfg_pkl, data_root, kwargs)
         
         self.default_kwargs = default_kwargs
+        self.cancelled = False
+        self.stop_event = threading.Event()
         
         self.avatar_registrar = AvatarRegistrar(**avatar_registrar_cfg)
         self.condition_handler = ConditionHandler(**condition_handler_cfg)
@@ -49,15 +56,27 @@ class StreamSDK:
         # It handles its own lazy loading/downloading
         self.face_restorer = FaceRestorer(device=kwargs.get("device", "cuda"), upscale=1.0) # Use 1.0 for restoration only, keeping 512 size but cleaner output
 
-        self.wav2feat = Wav2Feat(**wav2feat_cfg)
+        # hubert_batch_size: offline hubert windows per model call
+        self.wav2feat = Wav2Feat(**wav2feat_cfg, batch_size=kwargs.get("hubert_batch_size", 1))
+        feat_cache_dir = kwargs.get("feat_cache_dir")
+        if feat_cache_dir:
+            self.wav2feat.set_cache(AudioFeatCache(feat_cache_dir))
         
         self.progress_callback = None
         self.writer_pbar = None
         
         # Cache for avatar registration
-        self._cached_source_path = None
+        # memory: last registered source; disk: content-addressed, shared across processes
+        self._cached_source_key = None
         self._cached_source_info = None
-        self._cached_crop_kwargs = None
+        source_cache_dir = kwargs.get("source_cache_dir")
+        self.source_info_cache = SourceInfoCache(source_cache_dir) if source_cache_dir else None
+
+        # Idle clip (silence-aware rendering): memory: last avatar; disk: next to the source cache
+        self.idle_cache_dir = os.path.join(source_cache_dir, "idle") if source_cache_dir else None
+        self._cached_idle_key = None
+        self._cached_idle_frames = None
+        self.idle_plan = None
 
     def set_progress_callback(self, callback):
         self.progress_callback = callback
@@ -68,9 +87,11 @@ class StreamSDK:
                 run_kwargs[k] = v
         return run_kwargs
 
-    def setup_Nd(self, N_d, fade_in=-1, fade_out=-1, ctrl_info=None):
+    def setup_Nd(self, N_d, fade_in=-1, fade_out=-1, ctrl_info=None, set_stitch_Nd=True):
         # for eye open at video end
-        self.motion_stitch.set_Nd(N_d)
+        # (live mode keeps the blink plan it started with: set_stitch_Nd=False)
+        if set_stitch_Nd:
+            self.motion_stitch.set_Nd(N_d)
         
         # update writer pbar total
         if self.writer_pbar is not None:
@@ -96,13 +117,118 @@ class StreamSDK:
                 ctrl_info[i] = item
         self.ctrl_info = ctrl_info
 
+    def render_idle(self, source_path, n_frames=50, **kwargs):
+        """
+        Idle-motion clip of the avatar (driven by silent audio), rendered once
+        per avatar and cached in memory and on disk.
+        return: [n_frames, h, w, 3] uint8 rgb
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        kwargs = {k: v for k, v in kwargs.items() if k not in ("writer_type", "audio_path", "pbar_desc", "n_frames", "stream_dir")}
+        opts = self._merge_kwargs(self.default_kwargs, dict(kwargs))
+        idle_key = make_source_key(
+            source_path,
+            kind="idle",
+            n_frames=n_frames,
+            **{k: opts.get(k) for k in (
+                "max_size", "template_n_frames", "crop_scale", "crop_vx_ratio", "crop_vy_ratio",
+                "crop_flag_do_rot", "smo_k_s", "emo", "sampling_timesteps", "enable_face_restoration",
+            )},
+        )
+        if self._cached_idle_key == idle_key:
+            return self._cached_idle_frames
+
+        idle_path = None
+        if self.idle_cache_dir is not None:
+            idle_path = os.path.join(self.idle_cache_dir, f"{idle_key}.npy")
+            try:
+                frames = np.load(idle_path, mmap_mode="r")
+                self._cached_idle_key, self._cached_idle_frames = idle_key, frames
+                return frames
+            except (OSError, ValueError):
+                pass
+        else:
+            import tempfile
+            idle_path = os.path.join(tempfile.gettempdir(), f"ditto_idle_{idle_key}.npy")
+
+        logger.info(f"Rendering idle clip ({n_frames} frames) for avatar")
+        progress_callback, self.progress_callback = self.progress_callback, None
+        try:
+            self.setup(source_path, idle_path, writer_type="npy", n_frames=n_frames, pbar_desc="idle", **kwargs)
+            aud_feat = self.wav2feat.wav2feat(np.zeros(((n_frames + 1) * 640,), dtype=np.float32), sr=16000)[:n_frames]
+            self.setup_Nd(N_d=n_frames)
+            self.audio2motion_queue.put(aud_feat)
+            self.close()
+        finally:
+            self.progress_callback = progress_callback
+
+        frames = np.load(idle_path, mmap_mode="r")
+        self._cached_idle_key, self._cached_idle_frames = idle_key, frames
+        return frames
+
+    def setup_idle(self, silent_spans, idle_frames, crossfade=4):
+        """
+        Call after setup_Nd(). Frames inside silent_spans are not rendered; the
+        writer fills them from idle_frames (ping-pong loop) and crossfades
+        `crossfade` rendered frames on each side.
+        silent_spans: [(start, end)] gen frame ranges, end exclusive
+        return: number of frames that skip rendering
+        """
+        self.idle_plan = None
+        if not silent_spans or idle_frames is None or len(idle_frames) < 2:
+            return 0
+        if not self.source_info["is_image_flag"]:
+            # video source: idle frames would break the background motion
+            return 0
+        if idle_frames.shape[1:] != self.source_info["img_rgb_lst"][0].shape:
+            return 0
+
+        N_d = self.motion_stitch.N_d
+        if N_d <= 0:
+            # online mode: length unknown
+            return 0
+        n = len(idle_frames)
+        period = 2 * n - 2
+        plan = {}
+        for s, e in silent_spans:
+            e = min(e, N_d)
+            if e <= s:
+                continue
+            ss = max(s - crossfade, 0)
+            ee = min(e + crossfade, N_d)
+            for i in range(ss, ee):
+                j = (i - ss) % period
+                idle_idx = j if j < n else period - j
+                if i < s:
+                    alpha = 1 - (i - ss + 1) / (s - ss + 1)
+                elif i >= e:
+                    alpha = (i - e + 1) / (ee - e + 1)
+                else:
+                    alpha = 0
+                plan[i] = (idle_idx, alpha)
+
+        self.idle_frames = idle_frames
+        self.idle_plan = plan
+        return sum(1 for _, alpha in plan.values() if alpha == 0)
+
+    def _get_idle_frame(self, gen_frame_idx):
+        """
+        return: (idle frame, weight of the rendered frame) or (None, 1)
+        """
+        if self.idle_plan is None or gen_frame_idx not in self.idle_plan:
+            return None, 1
+        idle_idx, alpha = self.idle_plan[gen_frame_idx]
+        return self.idle_frames[idle_idx], alpha
+
     def _start_workers(self):
         """Start worker threads."""
         QUEUE_MAX_SIZE = 100
         # self.QUEUE_TIMEOUT = None
 
+        # cancel state is kept: a cancel() sent before the workers start still stops this run
         self.worker_exception = None
-        self.stop_event = threading.Event()
 
         # Re-initialize queues to ensure they are clean
         self.audio2motion_queue = queue.Queue(maxsize=QUEUE_MAX_SIZE)
@@ -134,6 +260,59 @@ class StreamSDK:
              logger.info("Loading GFPGAN model...")
              self.face_restorer.load_model()
 
+        kwargs = self._setup_avatar(source_path, **kwargs)
+
+        # ======== Video Writer ========
+        # "imageio": write a temp video, audio is muxed afterwards by the caller
+        # "ffmpeg_pipe": single encode straight to the final file with audio muxed in
+        # "hls": like ffmpeg_pipe, but playable while rendering (stream_dir/index.m3u8)
+        # "npy": raw uint8 frames, n_frames known up front (idle clip)
+        self.output_path = output_path
+        self.writer_type = kwargs.get("writer_type", "imageio")
+        if self.writer_type == "ffmpeg_pipe":
+            self.tmp_output_path = output_path
+            self.writer = VideoWriterByFFmpegPipe(output_path, audio_path=kwargs.get("audio_path"))
+        elif self.writer_type == "hls":
+            # without audio (live mode) the caller muxes the audio into output_path afterwards
+            self.tmp_output_path = output_path if kwargs.get("audio_path") else output_path + ".tmp.mp4"
+            self.writer = VideoWriterByHLS(
+                self.tmp_output_path, stream_dir=kwargs["stream_dir"], audio_path=kwargs.get("audio_path")
+            )
+        elif self.writer_type == "npy":
+            self.tmp_output_path = output_path
+            self.writer = VideoWriterByNpy(output_path, n_frames=kwargs["n_frames"])
+        else:
+            self.tmp_output_path = output_path + ".tmp.mp4"
+            self.writer = VideoWriterByImageIO(self.tmp_output_path)
+        pbar_desc = kwargs.get("pbar_desc", "writer")
+        self.writer_pbar = tqdm(desc=pbar_desc)
+
+        # ======== Audio Feat Buffer ========
+        if self.online_mode:
+            # buffer: seq_frames - valid_clip_len
+            self.audio_feat = self.wav2feat.wav2feat(np.zeros((self.overlap_v2 * 640,), dtype=np.float32), sr=16000)
+            assert len(self.audio_feat) == self.overlap_v2, f"{len(self.audio_feat)}"
+        else:
+            self.audio_feat = np.zeros((0, self.wav2feat.feat_dim), dtype=np.float32)
+        self.cond_idx_start = 0 - len(self.audio_feat)
+
+        # silent spans are set per run by setup_idle()
+        self.idle_plan = None
+        # live mode: frame count is only known once the audio ends (finish_audio)
+        self.frame_limit = None
+
+        # ======== Start Worker Threads ========
+        # Threads are now started here in setup to allow restarting for subsequent runs
+        self._start_workers()
+
+    def _setup_avatar(self, source_path, **kwargs):
+        """
+        Options, avatar registration, condition handler, audio2motion and
+        motion stitch. Shared by setup() and gen_motion_batch().
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
         # ======== Prepare Options ========
         kwargs = self._merge_kwargs(self.default_kwargs, kwargs)
         # print("=" * 20, "setup kwargs", "=" * 20)
@@ -197,6 +376,11 @@ class StreamSDK:
                 delta_roll
         """
 
+        # -- warp_f3d / decode_f3d: micro-batching (1 = frame by frame) --
+        self.frame_batch_size = max(1, int(kwargs.get("frame_batch_size", 1)))
+        # -- motion_stitch: frames per vectorized stitch call --
+        self.motion_stitch_chunk = max(1, int(kwargs.get("motion_stitch_chunk", 64)))
+
         # only hubert support online mode
         assert self.wav2feat.support_streaming or not self.online_mode
 
@@ -208,18 +392,27 @@ class StreamSDK:
             "crop_flag_do_rot": self.crop_flag_do_rot,
         }
         
-        # Check cache
-        use_cache = False
-        if (self._cached_source_path == source_path and 
-            self._cached_crop_kwargs == crop_kwargs):
-            use_cache = True
+        n_frames = self.template_n_frames if self.template_n_frames > 0 else self.N_d
+        source_key = make_source_key(
+            source_path,
+            max_dim=self.max_size,
+            n_frames=n_frames,
+            smo_k_s=self.smo_k_s,
+            **crop_kwargs,
+        )
+
+        source_info = None
+        if self._cached_source_key == source_key:
             # logger defined in setup scope above
             logger.info("✨ Using cached avatar analysis results (Skipping face detection)")
-
-        if use_cache:
             source_info = self._cached_source_info
-        else:
-            n_frames = self.template_n_frames if self.template_n_frames > 0 else self.N_d
+        elif self.source_info_cache is not None:
+            source_info = self.source_info_cache.load(source_key)
+            if source_info is not None:
+                logger.info("✨ Using disk-cached avatar analysis results (Skipping face detection)")
+                source_info["img_rgb_lst"], _ = load_source_frames(source_path, max_dim=self.max_size, n_frames=n_frames)
+
+        if source_info is None:
             source_info = self.avatar_registrar(
                 source_path, 
                 max_dim=self.max_size, 
@@ -229,14 +422,20 @@ class StreamSDK:
 
             if len(source_info["x_s_info_lst"]) > 1 and self.smo_k_s > 1:
                 source_info["x_s_info_lst"] = smooth_x_s_info_lst(source_info["x_s_info_lst"], smo_k=self.smo_k_s)
-            
-            # Update cache
-            self._cached_source_path = source_path
-            self._cached_source_info = source_info
-            self._cached_crop_kwargs = crop_kwargs
+
+            if self.source_info_cache is not None:
+                try:
+                    self.source_info_cache.save(source_key, source_info)
+                except Exception as e:
+                    logger.warning(f"Failed to persist avatar analysis cache: {e}")
+
+        # Update cache
+        self._cached_source_key = source_key
+        self._cached_source_info = source_info
 
         self.source_info = source_info
         self.source_info_frames = len(source_info["x_s_info_lst"])
+        self.putback.reset()    # roi / background buffers are per source
 
         # ======== Setup Condition Handler ========
         self.condition_handler.setup(source_info, self.emo, eye_f0_mode=self.eye_f0_mode, ch_info=self.ch_info)
@@ -274,25 +473,25 @@ class StreamSDK:
             overall_ctrl_info=self.overall_ctrl_info,
         )
 
-        # ======== Video Writer ========
-        self.output_path = output_path
-        self.tmp_output_path = output_path + ".tmp.mp4"
-        self.writer = VideoWriterByImageIO(self.tmp_output_path)
-        pbar_desc = kwargs.get("pbar_desc", "writer")
-        self.writer_pbar = tqdm(desc=pbar_desc)
+        return kwargs
 
-        # ======== Audio Feat Buffer ========
-        if self.online_mode:
-            # buffer: seq_frames - valid_clip_len
-            self.audio_feat = self.wav2feat.wav2feat(np.zeros((self.overlap_v2 * 640,), dtype=np.float32), sr=16000)
-            assert len(self.audio_feat) == self.overlap_v2, f"{len(self.audio_feat)}"
-        else:
-            self.audio_feat = np.zeros((0, self.wav2feat.feat_dim), dtype=np.float32)
-        self.cond_idx_start = 0 - len(self.audio_feat)
+    def gen_motion_batch(self, source_path, aud_feat_lst, **kwargs):
+        """
+        Offline motion for several independent audios (e.g. slides) that share
+        one avatar and setup kwargs. The LMDM DDIM loops of all audios run in
+        lockstep; no worker threads or writer are started.
+        Feed each result back through run(..., res_kp_seq=...) to render it.
 
-        # ======== Start Worker Threads ========
-        # Threads are now started here in setup to allow restarting for subsequent runs
-        self._start_workers()
+        aud_feat_lst: list of [num_f, feat_dim]
+        return: list of res_kp_seq [1, num_f, motion_dim]
+        """
+        try:
+            self._setup_avatar(source_path, **kwargs)
+            aud_cond_all_lst = [self.condition_handler(aud_feat, 0) for aud_feat in aud_feat_lst]
+            # cancel() stops the lockstep loop between clips (no close() follows here)
+            return self.audio2motion.gen_offline_batch(aud_cond_all_lst, stop_event=self.stop_event)
+        finally:
+            self.reset_cancel()
 
     def _get_ctrl_info(self, fid):
         try:
@@ -306,6 +505,32 @@ class StreamSDK:
             traceback.print_exc()
             return {}
 
+    def _get_batch(self, q, batch_size):
+        """
+        Block for one item, then drain up to batch_size items that are already queued.
+        Returns (items, is_end); is_end is True once the None sentinel was consumed.
+        """
+        items = []
+        while not self.stop_event.is_set():
+            try:
+                item = q.get(timeout=1)
+            except queue.Empty:
+                continue
+            if item is None:
+                return items, True
+            items.append(item)
+            break
+
+        while items and len(items) < batch_size:
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return items, True
+            items.append(item)
+        return items, False
+
     def writer_worker(self):
         try:
             self._writer_worker()
@@ -314,7 +539,15 @@ class StreamSDK:
             self.stop_event.set()
 
     def _writer_worker(self):
+        out_idx = 0    # gen frame idx of the next output frame
         while not self.stop_event.is_set():
+            # silent span: cached idle frames, nothing comes through the pipeline
+            idle_frame, alpha = self._get_idle_frame(out_idx)
+            while idle_frame is not None and alpha == 0:
+                self._write_frame(idle_frame)
+                out_idx += 1
+                idle_frame, alpha = self._get_idle_frame(out_idx)
+
             try:
                 item = self.writer_queue.get(timeout=1)
             except queue.Empty:
@@ -323,42 +556,66 @@ class StreamSDK:
             if item is None:
                 break
             res_frame_rgb = item
-            self.writer(res_frame_rgb, fmt="rgb")
-            self.writer_pbar.update()
-            
-            # Throttling: Update progress logic
-            # 1. Update first 5 frames immediately (so user sees start)
-            # 2. Update every 5 frames thereafter to reduce overhead
-            # 3. Always update when finished
-            n = self.writer_pbar.n
-            should_update = (n <= 5) or (n % 5 == 0) or (n == self.writer_pbar.total)
-            
-            if self.progress_callback and should_update:
-                current = n
-                total = self.writer_pbar.total
-                if total is not None and total > 0:
-                    # Map progress to 50-90% range of overall task
-                    percent = 50 + int((current / total) * 40)
-                    
-                    # Encode frame preview
-                    try:
-                        img = Image.fromarray(res_frame_rgb)
-                        # Resize for preview (balance between quality and bandwidth)
-                        img.thumbnail((300, 300)) 
-                        buf = io.BytesIO()
-                        img.save(buf, format='JPEG', quality=80)
-                        img_str = base64.b64encode(buf.getvalue()).decode('utf-8')
-                    except Exception as e:
-                        import logging
-                        logging.getLogger(__name__).warning(f"Preview generation failed: {e}")
-                        img_str = None
-                        
-                    self.progress_callback(percent, f"正在生成影片幀: {current}/{total}", img_str)
+            if self.frame_limit is not None and out_idx >= self.frame_limit:
+                # live mode: frames of the zero padding after the last audio sample
+                self.putback.release(res_frame_rgb)
+                continue
+            if idle_frame is not None:
+                # crossfade between rendered and idle frame at span boundaries
+                frame = (res_frame_rgb * alpha + idle_frame * (1 - alpha)).astype(np.uint8)
+            else:
+                frame = res_frame_rgb
+            self._write_frame(frame)
+            out_idx += 1
+
+            # frame is written, its buffer goes back to putback
+            self.putback.release(res_frame_rgb)
             
             # Yield GIL to allow main thread (FastAPI) to handle status requests
             import time
             time.sleep(0)
 
+    def _write_frame(self, res_frame_rgb):
+        self.writer(res_frame_rgb, fmt="rgb")
+        self.writer_pbar.update()
+        
+        # Throttling: Update progress logic
+        # 1. Update first 5 frames immediately (so user sees start)
+        # 2. Update every 5 frames thereafter to reduce overhead
+        # 3. Always update when finished
+        n = self.writer_pbar.n
+        should_update = (n <= 5) or (n % 5 == 0) or (n == self.writer_pbar.total)
+        
+        if self.progress_callback and should_update:
+            current = n
+            total = self.writer_pbar.total
+            if total is not None and total > 0:
+                # Map progress to 50-90% range of overall task
+                percent = 50 + int((current / total) * 40)
+                
+                # Encode frame preview
+                try:
+                    img = Image.fromarray(res_frame_rgb)
+                    # Resize for preview (balance between quality and bandwidth)
+                    img.thumbnail((300, 300)) 
+                    buf = io.BytesIO()
+                    img.save(buf, format='JPEG', quality=80)
+                    img_str = base64.b64encode(buf.getvalue()).decode('utf-8')
+                except Exception as e:
+                    import logging
+                    logging.getLogger(__name__).warning(f"Preview generation failed: {e}")
+                    img_str = None
+                    
+                self.progress_callback(percent, f"正在生成影片幀: {current}/{total}", img_str)
+        elif self.progress_callback and should_update and self.online_mode:
+            # live mode: total unknown until the audio ends
+            img = Image.fromarray(res_frame_rgb)
+            img.thumbnail((300, 300))
+            buf = io.BytesIO()
+            img.save(buf, format='JPEG', quality=80)
+            img_str = base64.b64encode(buf.getvalue()).decode('utf-8')
+            self.progress_callback(50, f"即時生成中: {n} 幀", img_str)
+
     def putback_worker(self):
         try:
             self._putback_worker()
@@ -386,7 +643,7 @@ class StreamSDK:
             
             frame_rgb = self.source_info["img_rgb_lst"][frame_idx]
             M_c2o = self.source_info["M_c2o_lst"][frame_idx]
-            res_frame_rgb = self.putback(frame_rgb, render_img, M_c2o)
+            res_frame_rgb = self.putback(frame_rgb, render_img, M_c2o, key=frame_idx)
             self.writer_queue.put(res_frame_rgb)
 
     def decode_f3d_worker(self):
@@ -397,6 +654,9 @@ class StreamSDK:
             self.stop_event.set()
 
     def _decode_f3d_worker(self):
+        if self.frame_batch_size > 1:
+            return self._decode_f3d_worker_batched()
+
         while not self.stop_event.is_set():
             try:
                 item = self.decode_f3d_queue.get(timeout=1)
@@ -409,6 +669,17 @@ class StreamSDK:
             render_img = self.decode_f3d(f_3d)
             self.putback_queue.put([frame_idx, render_img])
 
+    def _decode_f3d_worker_batched(self):
+        while not self.stop_event.is_set():
+            items, is_end = self._get_batch(self.decode_f3d_queue, self.frame_batch_size)
+            if items:
+                render_imgs = self.decode_f3d.batch([f_3d for _, f_3d in items])
+                for (frame_idx, _), render_img in zip(items, render_imgs):
+                    self.putback_queue.put([frame_idx, render_img])
+            if is_end:
+                self.putback_queue.put(None)
+                break
+
     def warp_f3d_worker(self):
         try:
             self._warp_f3d_worker()
@@ -417,6 +688,9 @@ class StreamSDK:
             self.stop_event.set()
 
     def _warp_f3d_worker(self):
+        if self.frame_batch_size > 1:
+            return self._warp_f3d_worker_batched()
+
         while not self.stop_event.is_set():
             try:
                 item = self.warp_f3d_queue.get(timeout=1)
@@ -430,6 +704,22 @@ class StreamSDK:
             f_3d = self.warp_f3d(f_s, x_s, x_d)
             self.decode_f3d_queue.put([frame_idx, f_3d])
 
+    def _warp_f3d_worker_batched(self):
+        while not self.stop_event.is_set():
+            items, is_end = self._get_batch(self.warp_f3d_queue, self.frame_batch_size)
+            if items:
+                f_s_lst = [self.source_info["f_s_lst"][frame_idx] for frame_idx, _, _ in items]
+                f_3d = self.warp_f3d.batch(
+                    f_s_lst,
+                    [x_s for _, x_s, _ in items],
+                    [x_d for _, _, x_d in items],
+                )
+                for i, (frame_idx, _, _) in enumerate(items):
+                    self.decode_f3d_queue.put([frame_idx, f_3d[i:i + 1]])
+            if is_end:
+                self.decode_f3d_queue.put(None)
+                break
+
     def motion_stitch_worker(self):
         try:
             self._motion_stitch_worker()
@@ -447,15 +737,47 @@ class StreamSDK:
                 self.warp_f3d_queue.put(None)
                 break
             
-            frame_idx, x_d_info, ctrl_kwargs = item
-            x_s_info = self.source_info["x_s_info_lst"][frame_idx]
-            x_s, x_d = self.motion_stitch(x_s_info, x_d_info, **ctrl_kwargs)
-            self.warp_f3d_queue.put([frame_idx, x_s, x_d])
+            frame_idx_lst, x_d_seq, ctrl_kwargs_lst = item
+            x_s_info_lst = [self.source_info["x_s_info_lst"][frame_idx] for frame_idx in frame_idx_lst]
+            x_s, x_d = self.motion_stitch.batch(x_s_info_lst, x_d_seq, ctrl_kwargs_lst)
+            for i, frame_idx in enumerate(frame_idx_lst):
+                self.warp_f3d_queue.put([frame_idx, x_s[i:i + 1], x_d[i:i + 1]])
+
+    def _put_motion_seq(self, res_kp_seq, gen_frame_idx):
+        """
+        res_kp_seq: [1, n, dim] -> chunks of [frame_idx_lst, x_d_seq, ctrl_kwargs_lst]
+        return: next gen_frame_idx
+        """
+        x_d_seq = self.audio2motion.cvt_fmt_seq(res_kp_seq)
+        n = res_kp_seq.shape[1]
+        for s in range(0, n, self.motion_stitch_chunk):
+            e = min(s + self.motion_stitch_chunk, n)
+            gen_idx_lst = range(gen_frame_idx + s, gen_frame_idx + e)
+            # frames the writer takes from the idle clip are not rendered
+            keep = [i - gen_frame_idx for i in gen_idx_lst if self._get_idle_frame(i)[1] > 0]
+            if not keep:
+                continue
+            gen_idx_lst = [gen_frame_idx + i for i in keep]
+            item = [
+                [_mirror_index(i, self.source_info_frames) for i in gen_idx_lst],
+                {k: v[keep] for k, v in x_d_seq.items()},
+                [self._get_ctrl_info(i) for i in gen_idx_lst],
+            ]
+            while not self.stop_event.is_set():
+                try:
+                    self.motion_stitch_queue.put(item, timeout=1)
+                    break
+                except queue.Full:
+                    continue
+        return gen_frame_idx + n
 
     def audio2motion_worker(self):
         try:
-            # self._audio2motion_worker()
-            self._audio2motion_offline()
+            if self.online_mode:
+                # live: motion is generated clip by clip as audio chunks arrive
+                self._audio2motion_worker()
+            else:
+                self._audio2motion_offline()
         except Exception as e:
             self.worker_exception = e
             self.stop_event.set()
@@ -464,50 +786,22 @@ class StreamSDK:
 
         while not self.stop_event.is_set():
             try:
-                item = self.audio2motion_queue.get(timeout=1)    # audio feat
+                item = self.audio2motion_queue.get(timeout=1)    # audio feat | {"res_kp_seq": motion}
             except queue.Empty:
                 continue
 
             if item is None:
                 break
 
-            aud_feat = item
-
-            aud_cond_all = self.condition_handler(aud_feat, 0)
-            seq_frames = self.audio2motion.seq_frames
-            valid_clip_len = self.audio2motion.valid_clip_len
-            num_frames = len(aud_cond_all)
-            idx = 0
-            res_kp_seq = None
-            # Disable internal 'dit' pbar to reduce console noise (User Request)
-            pbar = tqdm(desc="dit", disable=True) 
-            while idx < num_frames:
-                pbar.update()
-                aud_cond = aud_cond_all[idx:idx + seq_frames][None]
-                if aud_cond.shape[1] < seq_frames:
-                    pad = np.stack([aud_cond[:, -1]] * (seq_frames - aud_cond.shape[1]), 1)
-                    aud_cond = np.concatenate([aud_cond, pad], 1)
-                res_kp_seq = self.audio2motion(aud_cond, res_kp_seq)
-                idx += valid_clip_len
-
-            pbar.close()
-            res_kp_seq = res_kp_seq[:, :num_frames]
-            res_kp_seq = self.audio2motion._smo(res_kp_seq, 0, res_kp_seq.shape[1])
-
-            x_d_info_list = self.audio2motion.cvt_fmt(res_kp_seq)
-
-            gen_frame_idx = 0
-            for x_d_info in x_d_info_list:
-                frame_idx = _mirror_index(gen_frame_idx, self.source_info_frames)
-                ctrl_kwargs = self._get_ctrl_info(gen_frame_idx)
+            if isinstance(item, dict):
+                # motion precomputed by gen_motion_batch
+                res_kp_seq = item["res_kp_seq"]
+            else:
+                aud_feat = item
+                aud_cond_all = self.condition_handler(aud_feat, 0)
+                res_kp_seq = self.audio2motion.gen_offline(aud_cond_all)
 
-                while not self.stop_event.is_set():
-                    try:
-                        self.motion_stitch_queue.put([frame_idx, x_d_info, ctrl_kwargs], timeout=1)
-                        break
-                    except queue.Full:
-                        continue
-                gen_frame_idx += 1
+            self._put_motion_seq(res_kp_seq, 0)
 
             break
 
@@ -573,20 +867,7 @@ class StreamSDK:
                     continue
                 else:
                     valid_res_kp_seq = res_kp_seq[:, res_kp_seq_valid_start: res_kp_seq_valid_start + real_valid_len]
-                    x_d_info_list = self.audio2motion.cvt_fmt(valid_res_kp_seq)
-
-                    for x_d_info in x_d_info_list:
-                        frame_idx = _mirror_index(gen_frame_idx, self.source_info_frames)
-                        ctrl_kwargs = self._get_ctrl_info(gen_frame_idx)
-
-                        while not self.stop_event.is_set():
-                            try:
-                                self.motion_stitch_queue.put([frame_idx, x_d_info, ctrl_kwargs], timeout=1)
-                                break
-                            except queue.Full:
-                                continue
-
-                        gen_frame_idx += 1
+                    gen_frame_idx = self._put_motion_seq(valid_res_kp_seq, gen_frame_idx)
 
                     res_kp_seq_valid_start += real_valid_len
                 
@@ -626,10 +907,76 @@ class StreamSDK:
         except:
             traceback.print_exc()
 
-        # Check if any worker encountered an exception
-        if self.worker_exception is not None:
-            raise self.worker_exception
+        try:
+            if self.cancelled:
+                # partial output must not look like a finished video
+                if os.path.exists(self.tmp_output_path):
+                    os.remove(self.tmp_output_path)
+                raise RuntimeError("Render cancelled")
+
+            # Check if any worker encountered an exception
+            if self.worker_exception is not None:
+                raise self.worker_exception
+        finally:
+            self.reset_cancel()
         
+    def cancel(self):
+        """
+        Stop the running job from another thread; close() then raises.
+        """
+        self.cancelled = True
+        self.stop_event.set()
+
+    def reset_cancel(self):
+        """Clear the cancel state for the next job"""
+        self.cancelled = False
+        self.stop_event = threading.Event()
+
+    def start_live(self, chunksize=(3, 5, 2)):
+        """
+        online mode: audio is pushed with feed_audio() as it arrives and
+        closed with finish_audio(), instead of a full feature sequence
+        """
+        assert self.online_mode, "start_live needs setup(..., online_mode=True)"
+        self.live_chunksize = tuple(chunksize)
+        self.live_split_len = int(sum(chunksize) * 0.04 * 16000) + 80    # 6480
+        self.live_stride = chunksize[1] * 640
+        # left context of the first window
+        self._live_buf = np.zeros((chunksize[0] * 640,), dtype=np.float32)
+        self._live_samples = 0
+
+    def feed_audio(self, audio):
+        """
+        audio: [n] float32, 16 kHz mono, any length.
+        Runs hubert on every complete window; the tail waits for the next call.
+        """
+        self._live_buf = np.concatenate([self._live_buf, audio.astype(np.float32)], 0)
+        self._live_samples += len(audio)
+        pos = 0
+        while len(self._live_buf) - pos >= self.live_split_len and not self.stop_event.is_set():
+            self.run_chunk(self._live_buf[pos:pos + self.live_split_len], self.live_chunksize)
+            pos += self.live_stride
+        self._live_buf = self._live_buf[pos:]
+
+    def finish_audio(self, fade_out=-1):
+        """
+        End of the live audio: fixes the frame count, then flushes the
+        remaining windows (zero padded). return: number of frames
+        """
+        num_f = math.ceil(self._live_samples / 640)
+        self.setup_Nd(N_d=num_f, fade_out=fade_out, ctrl_info=self.ctrl_info, set_stitch_Nd=False)
+        self.frame_limit = num_f
+
+        pos = 0
+        while pos < len(self._live_buf) and not self.stop_event.is_set():
+            audio_chunk = self._live_buf[pos:pos + self.live_split_len]
+            if len(audio_chunk) < self.live_split_len:
+                audio_chunk = np.pad(audio_chunk, (0, self.live_split_len - len(audio_chunk)), mode="constant")
+            self.run_chunk(audio_chunk, self.live_chunksize)
+            pos += self.live_stride
+        self._live_buf = self._live_buf[:0]
+        return num_f
+
     def run_chunk(self, audio_chunk, chunksize=(3, 5, 2)):
         # only for hubert
         aud_feat = self.wav2feat(audio_chunk, chunksize=chunksize)
@@ -21,4 +21,9 @@ def init_script_generator(api_key: Optional[str] = None):
 def init_avatar_service():
     global avatar_service
     avatar_service = AvatarService()
+    # Render queue job kinds (also the state key prefixes)
+    from app.tasks import run_avatar_generation_task, run_batch_avatar_task, run_live_avatar_task
+    avatar_service.render_queue.register("avatar", run_avatar_generation_task)
+    avatar_service.render_queue.register("avatar_batch", run_batch_avatar_task)
+    avatar_service.render_queue.register("avatar_live", run_live_avatar_task)
     return avatar_service
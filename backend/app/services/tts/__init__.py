@@ -1,6 +1,7 @@
 """
 TTS services - modularized from the original tts_service.py
 """
+import asyncio
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -18,11 +19,12 @@ class TTSService:
     Coordinates audio generation, PPT embedding, and notes synchronization.
     """
     
-    def __init__(self, output_dir: Path):
+    def __init__(self, output_dir: Path, engine=None):
+        """engine: engine name or instance (default: settings.TTS_ENGINE)"""
         self.output_dir = output_dir
-        self.audio_gen = AudioGenerator(output_dir)
-        self.ppt_embedder = PPTEmbedder(output_dir)
+        self.audio_gen = AudioGenerator(output_dir, engine=engine)
         self.notes_sync = NotesSync()
+        self.ppt_embedder = PPTEmbedder(output_dir, notes_sync=self.notes_sync)
     
     async def list_voices(self, language: str = None) -> List[Dict]:
         """List available TTS voices"""
@@ -61,7 +63,7 @@ class TTSService:
         Returns:
             Dict with filename, path, url_path, and audio_files
         """
-        # Embed audio
+        # Embed audio + notes (one load, one save)
         output_path, all_slide_scripts, audio_files = await self.ppt_embedder.embed_audio(
             original_pptx_path,
             slide_scripts,
@@ -72,15 +74,6 @@ class TTSService:
             progress_callback
         )
         
-        # Sync notes
-        if progress_callback:
-            progress_callback(90, "Synchronizing slide notes...")
-        
-        try:
-            self.notes_sync.sync_notes(output_path, all_slide_scripts)
-        except Exception as e:
-            logger.warning(f"Notes sync failed: {e}")
-        
         # Return result
         output_filename = Path(output_path).name
         return {
@@ -122,35 +115,48 @@ class TTSService:
         job_id: str = None
     ) -> List[str]:
         """批量生成音訊檔"""
-        audio_urls = []
         total = len(slide_scripts)
+        done = 0
         
-        for i, item in enumerate(slide_scripts):
+        async def one(item):
+            nonlocal done
+            info = await self.generate_slide_audio(item, voice, rate, pitch, job_id=job_id)
+            done += 1
             if progress_callback:
-                progress_callback(int(((i+1)/total)*100), f"Generating audio {i+1}/{total}...")
-            
-            script = item.get('script', '')
-            # Simple clean
-            clean_text = re.sub(r'===.*?===|---.*?---|[*()\[\]/]', ' ', script)
-            clean_text = re.sub(r'\([約大概]*\s*\d+\s*[秒分鐘seconds]+\)', '', clean_text)
-            clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-            
-            # Custom Pronunciation Fixes
-            clean_text = clean_text.replace("VPIC1", "VPIC one")
+                progress_callback(int((done/total)*100), f"Generating audio {done}/{total}...")
+            return info
+        
+        # Slides synthesize concurrently (bounded by AudioGenerator); gather keeps slide order
+        infos = await asyncio.gather(*(one(item) for item in slide_scripts))
+        return [info['url_path'] if info else None for info in infos]
+
+    async def generate_slide_audio(
+        self,
+        item: Dict,
+        voice: str,
+        rate: str = "+0%",
+        pitch: str = "+0Hz",
+        job_id: str = None
+    ) -> Optional[Dict]:
+        """單張投影片的音訊 (無講稿時回傳 None)"""
+        script = item.get('script', '')
+        # Simple clean
+        clean_text = re.sub(r'===.*?===|---.*?---|[*()\[\]/]', ' ', script)
+        clean_text = re.sub(r'\([約大概]*\s*\d+\s*[秒分鐘seconds]+\)', '', clean_text)
+        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+        
+        # Custom Pronunciation Fixes
+        clean_text = clean_text.replace("VPIC1", "VPIC one")
+        
+        if not clean_text:
+            return None
             
-            if not clean_text:
-                audio_urls.append(None)
-                continue
-                
-            # Use job_id subfolder if available, else root
-            filename = f"slide_{item.get('slide_no')}.mp3"
-            if job_id:
-                filename = f"audio_batch_{job_id}/{filename}"
-                
-            info = await self.audio_gen.generate_audio(clean_text, voice, rate, pitch, filename=filename)
-            audio_urls.append(info['url_path'])
+        # Use job_id subfolder if available, else root
+        filename = f"slide_{item.get('slide_no')}.mp3"
+        if job_id:
+            filename = f"audio_batch_{job_id}/{filename}"
             
-        return audio_urls
+        return await self.audio_gen.generate_audio(clean_text, voice, rate, pitch, filename=filename)
 
     async def assemble_final_pptx(
         self,
@@ -161,23 +167,22 @@ class TTSService:
         photo_path: Optional[str] = None,
         progress_callback: Optional[callable] = None,
     ) -> Dict:
-        """最終封裝"""
+        """最終封裝 (媒體 + 備忘稿，單次載入/儲存)"""
+        try:
+            notes_dict = {int(s['slide_no']): s['script'] for s in slide_scripts}
+        except Exception as e:
+            logger.error(f"Final notes sync skipped: {e}")
+            notes_dict = None
+
         final_path = await self.ppt_embedder.embed_both(
             original_pptx_path,
             slide_scripts,
             audio_paths,
             video_paths,
             photo_path,
-            progress_callback
+            progress_callback,
+            notes=notes_dict
         )
-        
-        # Sync notes (using slide_scripts)
-        try:
-            notes_dict = {int(s['slide_no']): s['script'] for s in slide_scripts}
-            logger.info(f"Notes sync: {len(notes_dict)} entries, {sum(1 for v in notes_dict.values() if v)} non-empty")
-            self.notes_sync.sync_notes(final_path, notes_dict)
-        except Exception as e:
-            logger.error(f"Final notes sync failed: {e}")
             
         output_filename = Path(final_path).name
         return {
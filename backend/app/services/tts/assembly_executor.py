@@ -0,0 +1,74 @@
+"""
+Bounded executor for PPTX assembly.
+
+python-pptx / lxml parsing, cv2 / mutagen probing and ZIP writes are
+synchronous; run on the event loop they stall every other request while a
+deck is assembled. Assemblies run on a small thread pool instead: at most
+PPT_ASSEMBLY_WORKERS at a time, the rest wait in FIFO order.
+
+Threads rather than processes: the work holds python-pptx objects and
+progress callbacks that cannot be pickled, and lxml, zlib and file I/O
+release the GIL for most of it. Progress callbacks are handed back to the
+event loop, so callers' callbacks keep running on the loop thread.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AssemblyExecutor:
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pptx-assembly")
+        # Only touched on the event loop thread
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Assemblies submitted and not finished (running + queued)"""
+        return self._pending
+
+    def _done(self):
+        self._pending -= 1
+
+    async def run(self, func: Callable, *args, progress_callback: Optional[Callable] = None, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) on the pool and await its result.
+        progress_callback, if given, is passed on as a keyword argument and
+        invoked on the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if progress_callback is not None:
+            kwargs["progress_callback"] = lambda p, m: loop.call_soon_threadsafe(progress_callback, p, m)
+
+        if self._pending >= self.max_workers:
+            logger.info(
+                f"PPTX assembly queued: {self.max_workers} running, "
+                f"{self._pending - self.max_workers} waiting ahead"
+            )
+        self._pending += 1
+
+        # Keep contextvars (current session id, ...) inside the worker thread
+        ctx = contextvars.copy_context()
+        future = self._pool.submit(functools.partial(ctx.run, func, *args, **kwargs))
+        # Counted until the thread is done: cancelling the awaiting coroutine does not stop it
+        future.add_done_callback(lambda _f: loop.call_soon_threadsafe(self._done))
+        return await asyncio.wrap_future(future, loop=loop)
+
+
+_executor: Optional[AssemblyExecutor] = None
+
+
+def get_assembly_executor() -> AssemblyExecutor:
+    """Process-wide executor sized by settings.PPT_ASSEMBLY_WORKERS"""
+    global _executor
+    if _executor is None:
+        _executor = AssemblyExecutor(settings.PPT_ASSEMBLY_WORKERS)
+    return _executor
@@ -1,28 +1,55 @@
 """
-Audio generation using Edge TTS with Content Hashing Cache.
+Audio generation (pluggable TTS engine, Edge TTS by default) with Content Hashing Cache.
 """
+import asyncio
+import os
 import uuid
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 import hashlib
-import shutil
+import re
 import logging
-import edge_tts
+from mutagen.mp3 import MP3
 from app.middleware.session import get_current_session_id
 from app.core.config import settings
+from app.config import settings as app_settings
+from app.utils.media_cache import MediaCache, link_or_copy
+from app.utils.media_probe import get_probe_index
+from app.utils import pcm_sidecar
+from .engines import get_engine
+from .mp3_concat import concat_mp3
+from .rate_limiter import get_limiter
 
 logger = logging.getLogger(__name__)
 
+# Sentence end for segmented synthesis: 。！？, or . ! ? followed by whitespace, CJK or end of text,
+# so decimals (3.5), URLs (www.example.com) and similar are never split into separate requests
+_SENTENCE_END = re.compile(r'(?<=[。！？])(?![。！？])|(?<=[.!?])(?=\s|[\u3000-\u9fff\uff00-\uffef]|$)')
+
 class AudioGenerator:
-    """Handles TTS audio generation using Edge TTS with caching"""
+    """Handles TTS audio generation through a TTS engine (see engines.py) with caching"""
     
-    _voices_cache = []
+    _voices_cache: Dict[str, List[Dict[str, Any]]] = {}  # engine name -> voices
 
-    def __init__(self, output_dir: Path):
+    def __init__(self, output_dir: Path, concurrency: int = None, engine: Any = None):
+        self.engine = engine if engine is not None and not isinstance(engine, str) else get_engine(engine)
         self.base_output_dir = output_dir
         self.base_output_dir.mkdir(parents=True, exist_ok=True)
         self.cache_dir = self.base_output_dir / ".cache"
-        self.cache_dir.mkdir(exist_ok=True)
+        # Indexed (hash, size, duration, last access, refcount), LRU-bounded to TTS_CACHE_MAX_GB
+        self.cache = MediaCache(
+            "tts", self.cache_dir, int(app_settings.TTS_CACHE_MAX_GB * 1024**3), ext=".mp3"
+        )
+        # 16 kHz PCM sidecars, same content hash as the MP3 (.cache/pcm16k/<hash>.npy)
+        self.pcm_cache = MediaCache(
+            "tts_pcm", self.cache_dir / "pcm16k", int(app_settings.TTS_PCM_CACHE_MAX_GB * 1024**3), ext=".npy"
+        ) if app_settings.TTS_PCM_SIDECAR else None
+        # Bounds in-flight synthesis requests across all callers (batch, pipeline, single)
+        self._semaphore = asyncio.Semaphore(max(1, concurrency or app_settings.TTS_CONCURRENCY))
+        # content_hash -> synthesis in progress, so concurrent identical requests share one
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # background sidecar decodes (referenced until done)
+        self._sidecar_tasks: Set[asyncio.Task] = set()
     
     def _get_session_output_dir(self) -> Path:
         """Get session-specific output directory."""
@@ -39,18 +66,17 @@ class AudioGenerator:
         Returns:
             List of voice dictionaries
         """
-        if not AudioGenerator._voices_cache:
-            logger.debug("Fetching voice list from edge-tts...")
-            import asyncio
+        voices = AudioGenerator._voices_cache.get(self.engine.name)
+        if not voices:
+            logger.debug(f"Fetching voice list from {self.engine.name} engine...")
             try:
                 # Use a larger timeout for network requests
-                AudioGenerator._voices_cache = await asyncio.wait_for(edge_tts.list_voices(), timeout=20.0)
-                logger.debug(f"Loaded {len(AudioGenerator._voices_cache)} voices.")
+                voices = await asyncio.wait_for(self.engine.list_voices(), timeout=20.0)
+                AudioGenerator._voices_cache[self.engine.name] = voices
+                logger.debug(f"Loaded {len(voices)} voices.")
             except Exception as e:
                 logger.error(f"Error fetching voices: {e}")
                 return []
-            
-        voices = AudioGenerator._voices_cache
         
         result = []
         for v in voices:
@@ -70,24 +96,167 @@ class AudioGenerator:
     def _compute_hash(self, text: str, voice: str, rate: str, pitch: str) -> str:
         """Compute MD5 hash for cache key"""
         content = f"{text}|{voice}|{rate}|{pitch}"
+        if self.engine.name != "edge":
+            # Other engines never share entries with edge-tts audio (edge keys stay as before)
+            content += f"|{self.engine.name}"
         return hashlib.md5(content.encode('utf-8')).hexdigest()
 
+    @staticmethod
+    def _split_segments(text: str) -> List[str]:
+        """Sentence segments of cleaned text; the whole text if splitting would drop anything"""
+        segments = [seg.strip() for seg in _SENTENCE_END.split(text) if seg.strip()]
+        if re.sub(r'\s+', '', "".join(segments)) != re.sub(r'\s+', '', text):
+            return [text]
+        return segments or [text]
+
+    def _index(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Index a cache file with its stream info (parsed once, here)"""
+        path = self.cache.path_for(content_hash)
+        meta = {"codec": "mp3"}
+        try:
+            info = MP3(str(path)).info
+            meta.update(duration=info.length, bitrate=info.bitrate, sample_rate=info.sample_rate)
+        except Exception as e:
+            logger.warning(f"Cannot read audio info of {path.name}: {e}")
+        self.cache.register(content_hash, meta)
+        return meta
+
+    def _start_sidecar(self, content_hash: str, output_path: Path):
+        """
+        Deliver <output>.16k.npy in the background: the decode takes seconds per
+        slide and the TTS response must not wait for it (a render that starts
+        first simply decodes the MP3 itself)
+        """
+        dst = pcm_sidecar.sidecar_path(output_path)
+        # A sidecar left from earlier content must never outlive its MP3
+        if dst.exists():
+            dst.unlink()
+        if self.pcm_cache is None:
+            return
+        task = asyncio.create_task(asyncio.to_thread(self._deliver_sidecar, content_hash, dst))
+        self._sidecar_tasks.add(task)
+        task.add_done_callback(self._sidecar_tasks.discard)
+
+    def _deliver_sidecar(self, content_hash: str, dst: Path):
+        """Place the 16 kHz PCM of a cache entry at dst (decoded once per content hash)"""
+        mp3_path = self.cache.path_for(content_hash)
+        src = self.pcm_cache.path_for(content_hash)
+        try:
+            # An entry decoded before the MP3 was evicted and re-synthesized is older than it: redo it
+            if pcm_sidecar.is_fresh(src, mp3_path) and self.pcm_cache.fetch(content_hash, dst):
+                return
+            if pcm_sidecar.decode_to(mp3_path, src):
+                self.pcm_cache.register(content_hash, {"sample_rate": pcm_sidecar.SAMPLE_RATE})
+                link_or_copy(src, dst)
+        except OSError as e:
+            logger.warning(f"PCM sidecar not delivered for {dst.name}: {e}")
+
+    async def _assemble_segments(self, content_hash: str, segments: List[str], voice: str, rate: str, pitch: str):
+        """Slide audio = concatenation of per-sentence cache entries (only missing sentences are synthesized)"""
+        cache_path = self.cache.path_for(content_hash)
+        hashes = [self._compute_hash(seg, voice, rate, pitch) for seg in segments]
+        paths = [self.cache.path_for(h) for h in hashes]
+        missing = {h: (seg, p) for h, seg, p in zip(hashes, segments, paths) if self.cache.get(h) is None}
+        logger.debug(f"Segmented TTS: {len(segments) - len(missing)}/{len(segments)} sentence(s) cached")
+
+        await asyncio.gather(*(
+            self._synthesize_shared(h, seg, voice, rate, pitch, p) for h, (seg, p) in missing.items()
+        ))
+        method = await asyncio.to_thread(concat_mp3, paths, cache_path)
+        await asyncio.to_thread(self._index, content_hash)
+        logger.debug(f"Joined {len(paths)} segment(s) into {cache_path.stem} ({method})")
+
+    async def _synthesize_shared(self, content_hash: str, text: str, voice: str, rate: str, pitch: str, cache_path: Path):
+        """Synthesize into cache_path once, even when several slides request the same text concurrently"""
+        while True:
+            pending = self._inflight.get(content_hash)
+            if pending is None:
+                break
+            try:
+                await asyncio.shield(pending)
+                return
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The request that owned the synthesis was cancelled, this one was not: take over
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[content_hash] = future
+        try:
+            await self._synthesize(text, voice, rate, pitch, cache_path)
+            await asyncio.to_thread(self._index, content_hash)
+            future.set_result(None)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved: the error is re-raised to this caller anyway
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(content_hash, None)
+
+    async def _synthesize(self, text: str, voice: str, rate: str, pitch: str, cache_path: Path):
+        logger.debug(f"Generating new audio for {cache_path.stem}")
+        # Only remote engines are paced
+        limiter = get_limiter(self.engine.host, app_settings.TTS_MAX_RPS) if self.engine.host else None
+        tmp_path = cache_path.with_name(f"{cache_path.stem}.{uuid.uuid4().hex[:8]}.tmp")
+
+        # Retry mechanism
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                async with self._semaphore:
+                    if limiter:
+                        await limiter.acquire()
+                    # Set a hard timeout to prevent infinite hang on network issues
+                    # Increased from 30s to 45s
+                    await asyncio.wait_for(
+                        self.engine.synthesize(text, voice, rate, pitch, tmp_path), timeout=45.0
+                    )
+                # Partial files never become visible as cache hits
+                os.replace(tmp_path, cache_path)
+                if limiter:
+                    limiter.on_success()
+                return
+            except asyncio.TimeoutError:
+                if limiter:
+                    limiter.on_error()
+                logger.warning(f"TTS generation timed out (Attempt {attempt+1}/{max_retries})")
+                if attempt == max_retries - 1:
+                    raise Exception("語音生成超時 (微軟伺服器無回應)，請檢查網路或稍後再試。")
+            except Exception as e:
+                if limiter:
+                    limiter.on_error()
+                logger.warning(f"TTS generation failed: {e} (Attempt {attempt+1}/{max_retries})")
+                if attempt == max_retries - 1:
+                    raise Exception(f"語音生成失敗: {str(e)}")
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+            
+            # Exponential backoff: 1s, 2s, 4s (outside the semaphore, so other slides keep going)
+            wait_time = 2 ** attempt
+            await asyncio.sleep(wait_time)
+
     async def generate_audio(
         self, 
         text: str, 
         voice: str, 
         rate: str = "+0%", 
         pitch: str = "+0Hz",
-        filename: Optional[str] = None
+        filename: Optional[str] = None,
+        segmented: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Generate audio file from text with caching support.
+        segmented: synthesize/cache sentence by sentence (default: TTS_SEGMENT_CACHE)
         """
         if not text.strip():
             raise ValueError("Text cannot be empty")
 
         # 0. Clean markers (ensure consistent cleaning across all entry points)
-        import re
         # Remove markers and special brackets used for counting
         text = re.sub(r'===.*?===|---.*?---|[*()\[\]/]', ' ', text)
         # Remove standalone dash lines or sequences like ---
@@ -102,37 +271,19 @@ class AudioGenerator:
 
         # 1. Compute Hash
         content_hash = self._compute_hash(text, voice, rate, pitch)
-        cache_path = self.cache_dir / f"{content_hash}.mp3"
+        cache_path = self.cache.path_for(content_hash)
         
-        # 2. Check Cache
-        # 2. Check Cache
-        if cache_path.exists():
+        # 2. Check Cache (index lookup, also marks the entry recently used)
+        if self.cache.get(content_hash) is not None:
             logger.debug(f"Cache hit for {content_hash}")
         else:
-            logger.debug(f"Generating new audio for {content_hash}")
-            import asyncio
-            
-            # Retry mechanism
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch)
-                    # Set a hard timeout to prevent infinite hang on network issues
-                    # Increased from 30s to 45s
-                    await asyncio.wait_for(communicate.save(str(cache_path)), timeout=45.0)
-                    break # Success, exit loop
-                except asyncio.TimeoutError:
-                    logger.warning(f"TTS generation timed out (Attempt {attempt+1}/{max_retries})")
-                    if attempt == max_retries - 1:
-                        raise Exception("語音生成超時 (微軟伺服器無回應)，請檢查網路或稍後再試。")
-                except Exception as e:
-                    logger.warning(f"TTS generation failed: {e} (Attempt {attempt+1}/{max_retries})")
-                    if attempt == max_retries - 1:
-                        raise Exception(f"語音生成失敗: {str(e)}")
-                
-                # Exponential backoff: 1s, 2s, 4s
-                wait_time = 2 ** attempt
-                await asyncio.sleep(wait_time)
+            if segmented is None:
+                segmented = app_settings.TTS_SEGMENT_CACHE
+            segments = self._split_segments(text) if segmented else [text]
+            if len(segments) > 1:
+                await self._assemble_segments(content_hash, segments, voice, rate, pitch)
+            else:
+                await self._synthesize_shared(content_hash, text, voice, rate, pitch, cache_path)
         
         # 3. Determine Output
         if not filename:
@@ -149,9 +300,17 @@ class AudioGenerator:
         if filename and ("/" in filename or "\\" in filename):
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
-        # 4. Copy from Cache to Output
-        # (Using copy significantly reduces I/O and generation time compared to calling API again)
-        shutil.copy2(cache_path, output_path)
+        # 4. Link from Cache to Output (hardlink / reflink; bytes are only copied across filesystems)
+        if not self.cache.fetch(content_hash, output_path):
+            link_or_copy(cache_path, output_path)
+        self._start_sidecar(content_hash, output_path)
+
+        meta = self.cache.get_meta(content_hash) or {}
+        if "duration" not in meta:
+            # Entry indexed from disk at startup: read its stream info once
+            meta = await asyncio.to_thread(self._index, content_hash) or {}
+        # Assembly reads the duration from the probe index instead of parsing the MP3
+        await asyncio.to_thread(get_probe_index().record, output_path, meta)
 
         # URL path includes session_id for proper routing
         url_path = f"/outputs/{session_id}/{filename}" if session_id != 'default' else f"/outputs/{filename}"
@@ -159,5 +318,6 @@ class AudioGenerator:
         return {
             "filename": filename,
             "path": str(output_path),
-            "url_path": url_path
+            "url_path": url_path,
+            "duration": meta.get("duration")
         }
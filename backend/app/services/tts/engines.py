@@ -0,0 +1,180 @@
+"""
+TTS engine backends used by AudioGenerator.
+
+An engine turns (text, voice, rate, pitch) into an audio file; caching,
+concurrency, rate limiting, retries and timeouts stay in AudioGenerator.
+
+- edge:    Microsoft Edge online TTS (default)
+- offline: deterministic local synthesis for load tests and benchmarks; the
+           audio is a speech-like tone pattern timed from text length and rate
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import shutil
+import subprocess
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _percent(value: str) -> float:
+    """'+20%' -> 0.2, '-10Hz' -> -10.0 (unit stripped)"""
+    match = re.match(r'^\s*([+-]?\d+(?:\.\d+)?)', value or "")
+    if not match:
+        return 0.0
+    number = float(match.group(1))
+    return number / 100 if value.strip().endswith("%") else number
+
+
+class EdgeTTSEngine:
+    """Microsoft Edge online TTS (edge-tts)"""
+
+    name = "edge"
+    # Synthesis endpoint, rate limited per host by AudioGenerator
+    host = "speech.platform.bing.com"
+
+    async def synthesize(self, text: str, voice: str, rate: str, pitch: str, output_path: Path):
+        import edge_tts
+        communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch)
+        await communicate.save(str(output_path))
+
+    async def list_voices(self) -> List[Dict[str, Any]]:
+        import edge_tts
+        return await edge_tts.list_voices()
+
+
+class OfflineTTSEngine:
+    """
+    Deterministic local engine: same input -> same bytes, no network.
+
+    Duration follows a typical narration pace (about 4.5 CJK characters or
+    2.7 Latin words per second, plus sentence pauses), scaled by the rate
+    ("+25%" speaks 1.25x faster). Each syllable is a short voiced tone burst
+    whose pitch depends on the voice and the pitch setting, so silence
+    detection and lip-sync see speech-like audio. MP3 output matches edge-tts
+    (24 kHz mono 48 kbps) and is encoded with ffmpeg; without ffmpeg, silent
+    but correctly timed MP3 frames are written instead.
+    """
+
+    name = "offline"
+    host = None
+
+    SAMPLE_RATE = 24000
+    CJK_PER_SEC = 4.5
+    WORDS_PER_SEC = 2.7
+    SENTENCE_PAUSE = 0.35
+    # MPEG-2 Layer III, 48 kbps, 24 kHz, mono: 576 samples / 144 bytes per frame
+    _MP3_FRAME_HEADER = bytes([0xFF, 0xF3, 0x64, 0xC4])
+    _MP3_FRAME_SIZE = 144
+    _MP3_FRAME_SAMPLES = 576
+
+    VOICES = [
+        {"ShortName": "offline-zh-TW-female", "FriendlyName": "Offline Chinese (Taiwan) Female", "Gender": "Female", "Locale": "zh-TW"},
+        {"ShortName": "offline-zh-TW-male", "FriendlyName": "Offline Chinese (Taiwan) Male", "Gender": "Male", "Locale": "zh-TW"},
+        {"ShortName": "offline-en-US-female", "FriendlyName": "Offline English (US) Female", "Gender": "Female", "Locale": "en-US"},
+        {"ShortName": "offline-en-US-male", "FriendlyName": "Offline English (US) Male", "Gender": "Male", "Locale": "en-US"},
+    ]
+
+    def __init__(self, ffmpeg_path: Optional[str] = None):
+        self.ffmpeg_path = ffmpeg_path or shutil.which("ffmpeg")
+
+    def plan(self, text: str, rate: str = "+0%") -> List[float]:
+        """Timeline as alternating [voiced, pause, voiced, ...] seconds"""
+        speed = max(0.1, 1.0 + _percent(rate))
+        timeline = []
+        for sentence in re.split(r'[。！？.!?；;]+', text):
+            cjk = len(re.findall(r'[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]', sentence))
+            words = len(re.findall(r'[A-Za-z0-9]+', sentence))
+            voiced = cjk / self.CJK_PER_SEC + words / self.WORDS_PER_SEC
+            if voiced > 0:
+                timeline += [voiced / speed, self.SENTENCE_PAUSE / speed]
+        return timeline or [0.0, 0.5]
+
+    def duration(self, text: str, rate: str = "+0%") -> float:
+        return sum(self.plan(text, rate))
+
+    def render_pcm(self, text: str, voice: str, rate: str = "+0%", pitch: str = "+0Hz") -> bytes:
+        """16-bit mono PCM at SAMPLE_RATE"""
+        import numpy as np
+        sr = self.SAMPLE_RATE
+        seed = int(hashlib.md5(voice.encode("utf-8")).hexdigest()[:8], 16)
+        base = (110.0 if "male" in voice.lower() and "female" not in voice.lower() else 200.0) + seed % 40
+        shift = _percent(pitch)
+        f0 = max(60.0, base * (1 + shift) if pitch.strip().endswith("%") else base + shift)
+        syllable = 1.0 / self.CJK_PER_SEC / max(0.1, 1.0 + _percent(rate))
+
+        chunks = []
+        for i, seconds in enumerate(self.plan(text, rate)):
+            n = int(round(seconds * sr))
+            if i % 2 or n == 0:
+                chunks.append(np.zeros(n, dtype=np.float32))
+                continue
+            t = np.arange(n, dtype=np.float32) / sr
+            # Syllable envelope (raised sine) with a slow deterministic pitch contour
+            envelope = np.sin(np.pi * ((t / syllable) % 1.0)) ** 2
+            freq = f0 * (1 + 0.08 * np.sin(2 * np.pi * 0.7 * t + seed % 7))
+            phase = 2 * np.pi * np.cumsum(freq) / sr
+            tone = np.sin(phase) + 0.5 * np.sin(2 * phase) + 0.25 * np.sin(3 * phase)
+            chunks.append((0.25 * envelope * tone).astype(np.float32))
+        signal = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        return (np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes()
+
+    def _write_wav(self, pcm: bytes, output_path: Path):
+        with wave.open(str(output_path), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.SAMPLE_RATE)
+            w.writeframes(pcm)
+
+    def _write_mp3(self, pcm: bytes, output_path: Path):
+        if self.ffmpeg_path:
+            cmd = [
+                self.ffmpeg_path, "-y", "-loglevel", "error",
+                "-f", "s16le", "-ar", str(self.SAMPLE_RATE), "-ac", "1", "-i", "-",
+                "-c:a", "libmp3lame", "-b:a", "48k",
+                "-write_xing", "0", "-id3v2_version", "0", "-map_metadata", "-1",
+                "-f", "mp3", str(output_path),
+            ]
+            result = subprocess.run(cmd, input=pcm, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            if result.returncode == 0:
+                return
+            logger.warning(f"Offline TTS: ffmpeg encode failed, writing silent MP3: {result.stderr.decode(errors='ignore').strip()}")
+        # Zeroed side info = a valid silent frame; keeps the timing exact
+        n_frames = -(-len(pcm) // 2 // self._MP3_FRAME_SAMPLES)
+        frame = self._MP3_FRAME_HEADER + bytes(self._MP3_FRAME_SIZE - len(self._MP3_FRAME_HEADER))
+        with open(output_path, "wb") as f:
+            f.write(frame * max(1, n_frames))
+
+    def _synthesize_sync(self, text: str, voice: str, rate: str, pitch: str, output_path: Path):
+        pcm = self.render_pcm(text, voice, rate, pitch)
+        if Path(output_path).suffix.lower() == ".wav":
+            self._write_wav(pcm, output_path)
+        else:
+            self._write_mp3(pcm, output_path)
+
+    async def synthesize(self, text: str, voice: str, rate: str, pitch: str, output_path: Path):
+        await asyncio.to_thread(self._synthesize_sync, text, voice, rate, pitch, output_path)
+
+    async def list_voices(self) -> List[Dict[str, Any]]:
+        return list(self.VOICES)
+
+
+ENGINES = {
+    EdgeTTSEngine.name: EdgeTTSEngine,
+    OfflineTTSEngine.name: OfflineTTSEngine,
+}
+
+
+def get_engine(name: Optional[str] = None):
+    """Engine instance by name (default: settings.TTS_ENGINE)"""
+    if name is None:
+        from app.config import settings
+        name = settings.TTS_ENGINE
+    engine_cls = ENGINES.get(name.lower())
+    if engine_cls is None:
+        raise ValueError(f"Unknown TTS engine: {name} (available: {', '.join(ENGINES)})")
+    return engine_cls()
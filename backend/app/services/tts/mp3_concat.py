@@ -0,0 +1,102 @@
+"""
+Gapless MP3 concatenation without re-encoding.
+
+MPEG audio frames are self-contained, so segments with the same stream
+parameters (version / sample rate / channel mode) can be joined by copying
+their frames. Only container metadata is dropped: ID3v2 / ID3v1 tags and the
+Xing / Info / VBRI header frame, whose frame count would otherwise describe
+just the first segment. Mismatched segments fall back to a pydub re-encode.
+"""
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+# Layer III bitrates (kbps) by bitrate index
+_BITRATES_V1 = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]
+_BITRATES_V2 = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+# Sample rates by version bits (3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5)
+_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def _parse_header(data: bytes, pos: int) -> Optional[Tuple[int, Tuple[int, int, int]]]:
+    """(frame length, stream params) of the Layer III frame at pos, or None"""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 3
+    layer = (data[pos + 1] >> 1) & 3
+    bitrate_idx = data[pos + 2] >> 4
+    rate_idx = (data[pos + 2] >> 2) & 3
+    padding = (data[pos + 2] >> 1) & 1
+    channel_mode = data[pos + 3] >> 6
+    if version == 1 or layer != 1 or bitrate_idx in (0, 15) or rate_idx == 3:
+        return None
+    sample_rate = _SAMPLE_RATES[version][rate_idx]
+    if version == 3:
+        length = 144000 * _BITRATES_V1[bitrate_idx] // sample_rate + padding
+    else:
+        length = 72000 * _BITRATES_V2[bitrate_idx] // sample_rate + padding
+    return length, (version, sample_rate, channel_mode)
+
+
+def _audio_frames(data: bytes) -> Tuple[bytes, Optional[Tuple[int, int, int]]]:
+    """Strip tags and the VBR header frame; returns (frame bytes, stream params)"""
+    start, end = 0, len(data)
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        start = 10 + size + (10 if data[5] & 0x10 else 0)
+    if end - start >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+
+    # Resync to the first frame
+    while start < end - 4 and _parse_header(data, start) is None:
+        start += 1
+    header = _parse_header(data, start)
+    if header is None:
+        return b"", None
+    length, params = header
+    # VBR header tags sit right after the side info (Xing / Info) or at offset 36 (VBRI)
+    head = data[start:start + min(length, 48)]
+    if b"Xing" in head or b"Info" in head or b"VBRI" in head:
+        start += length
+    return data[start:end], params
+
+
+def concat_mp3(paths: List[PathLike], dst: PathLike) -> str:
+    """
+    Join MP3 segments into dst (written atomically).
+    Returns the method used: "copy" (frame copy) or "reencode".
+    """
+    dst = Path(dst)
+    tmp_path = dst.with_name(f"{dst.stem}.{uuid.uuid4().hex[:8]}.tmp")
+    chunks, params = [], set()
+    for path in paths:
+        with open(path, "rb") as f:
+            frames, p = _audio_frames(f.read())
+        chunks.append(frames)
+        params.add(p)
+
+    try:
+        if len(params) == 1 and None not in params:
+            with open(tmp_path, "wb") as f:
+                for frames in chunks:
+                    f.write(frames)
+            method = "copy"
+        else:
+            logger.info(f"MP3 segments differ in stream format {params}, re-encoding")
+            from pydub import AudioSegment
+            combined = AudioSegment.empty()
+            for path in paths:
+                combined += AudioSegment.from_file(str(path), format="mp3")
+            combined.export(str(tmp_path), format="mp3")
+            method = "reencode"
+        os.replace(tmp_path, dst)
+        return method
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
@@ -46,41 +46,54 @@ class NotesSync:
         try:
             logger.info(f"[NotesSync] Starting sync for {path.name}")
             prs = Presentation(str(path))
-            
-            # Get visible slides only
-            visible_slides = [s for s in prs.slides if s.element.get('show') != '0']
-            logger.debug(f"[NotesSync] {len(visible_slides)} visible slides, {len(slide_scripts)} scripts")
-            
-            synced_count = 0
-            for slide_no, script_text in slide_scripts.items():
-                if not script_text:
-                    continue
-                
-                if not (1 <= slide_no <= len(visible_slides)):
-                    logger.warning(f"[NotesSync] Slide {slide_no} out of range")
-                    continue
-                
-                try:
-                    slide = visible_slides[slide_no - 1]
-                    notes_slide = slide.notes_slide
-                    
-                    if self._write_notes(notes_slide, script_text):
-                        synced_count += 1
-                        logger.debug(f"[NotesSync] Slide {slide_no}: synced")
-                    else:
-                        logger.debug(f"[NotesSync] Slide {slide_no}: Failed")
-                        
-                except Exception as e:
-                    logger.error(f"[NotesSync] Slide {slide_no}: {e}")
-            
+            synced_count = self.write_notes(prs, slide_scripts)
             prs.save(str(path))
-            logger.info(f"[NotesSync] ✅ Done - {synced_count}/{len(slide_scripts)} updated")
             return synced_count
             
         except Exception as e:
             logger.error(f"[NotesSync] Error: {e}", exc_info=True)
             return 0
 
+    def write_notes(self, prs, slide_scripts: Dict[int, str]) -> int:
+        """
+        Write notes into an already loaded Presentation (the caller saves it).
+        
+        Args:
+            prs: python-pptx Presentation
+            slide_scripts: Dict mapping slide number (1-indexed) to script text
+            
+        Returns:
+            Number of slides successfully updated
+        """
+        # Get visible slides only
+        visible_slides = [s for s in prs.slides if s.element.get('show') != '0']
+        logger.debug(f"[NotesSync] {len(visible_slides)} visible slides, {len(slide_scripts)} scripts")
+        
+        synced_count = 0
+        for slide_no, script_text in slide_scripts.items():
+            if not script_text:
+                continue
+            
+            if not (1 <= slide_no <= len(visible_slides)):
+                logger.warning(f"[NotesSync] Slide {slide_no} out of range")
+                continue
+            
+            try:
+                slide = visible_slides[slide_no - 1]
+                notes_slide = slide.notes_slide
+                
+                if self._write_notes(notes_slide, script_text):
+                    synced_count += 1
+                    logger.debug(f"[NotesSync] Slide {slide_no}: synced")
+                else:
+                    logger.debug(f"[NotesSync] Slide {slide_no}: Failed")
+                    
+            except Exception as e:
+                logger.error(f"[NotesSync] Slide {slide_no}: {e}")
+        
+        logger.info(f"[NotesSync] ✅ Done - {synced_count}/{len(slide_scripts)} updated")
+        return synced_count
+
     def _write_notes(self, notes_slide, text: str) -> bool:
         """
         Try multiple methods to write notes text.
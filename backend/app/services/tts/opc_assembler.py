@@ -0,0 +1,568 @@
+"""
+ZIP/OPC-level PPTX assembler.
+
+Alternative to the python-pptx path of PPTEmbedder.embed_both for large decks.
+Only the slide, notes, relationship and content-type parts that change are
+parsed and rewritten; every other archive entry is copied from the source as
+its raw compressed bytes (no decompress / recompress), and media are appended
+as stored entries (MP3 / MP4 / PNG / JPEG do not compress further). Assembly
+time therefore follows what changes, not the size of the deck.
+
+The XML written is the same as the python-pptx path: shape templates come
+from python-pptx, and autoplay timing, oval mask and notes writing reuse
+PPTEmbedder / NotesSync. Packages this assembler does not handle (ZIP64,
+encrypted entries, no notes master when a notes slide must be created) raise
+OPCUnsupported, and the caller falls back to python-pptx.
+"""
+import hashlib
+import itertools
+import logging
+import os
+import posixpath
+import struct
+import time
+import uuid
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from lxml import etree # type: ignore
+from pptx.media import SPEAKER_IMAGE_BYTES # type: ignore
+from pptx.opc.constants import CONTENT_TYPE as CT # type: ignore
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT # type: ignore
+from pptx.oxml import parse_xml # type: ignore
+from pptx.oxml.ns import qn # type: ignore
+from pptx.oxml.shapes.picture import CT_Picture # type: ignore
+from pptx.oxml.slide import CT_NotesSlide # type: ignore
+from pptx.parts.image import Image # type: ignore
+from pptx.shapes.picture import Movie, Picture # type: ignore
+from pptx.slide import NotesMaster, NotesSlide, Slide # type: ignore
+from pptx.util import Cm
+
+from .ppt_embedder import (
+    AUDIO_ICON_SIZE_CM,
+    AUDIO_MIME_TYPE,
+    MARGIN_COVER_CM,
+    MARGIN_DEFAULT_CM,
+    SLIDE_1_PHOTO_SCALE_FACTOR,
+)
+
+logger = logging.getLogger(__name__)
+
+_CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+_RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_CONTENT_TYPES = "[Content_Types].xml"
+
+# ZIP records (no ZIP64: decks beyond 4 GiB go through python-pptx)
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+_ZIP32_LIMIT = 0xFFFFFFFF
+_CHUNK = 1 << 20
+
+
+class OPCUnsupported(Exception):
+    """The package needs something only the python-pptx path handles"""
+
+
+def _digest(source: Union[str, bytes]) -> Tuple[str, int, int]:
+    """(sha1, size, crc32) of bytes or of a file, read once"""
+    if isinstance(source, bytes):
+        return hashlib.sha1(source).hexdigest(), len(source), zlib.crc32(source)
+    sha1, size, crc = hashlib.sha1(), 0, 0
+    with open(source, "rb") as f:
+        while True:
+            chunk = f.read(_CHUNK)
+            if not chunk:
+                break
+            sha1.update(chunk)
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+    return sha1.hexdigest(), size, crc
+
+
+def _copy_n(src, dst, n: int):
+    while n > 0:
+        chunk = src.read(min(_CHUNK, n))
+        if not chunk:
+            raise OPCUnsupported("truncated archive entry")
+        dst.write(chunk)
+        n -= len(chunk)
+
+
+class _ZipWriter:
+    """Minimal ZIP writer: raw entry copies from another archive plus new entries"""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.central: List[bytes] = []
+
+    def _add_entry(self, name: str, method: int, flags: int, date_time, crc: int, csize: int, usize: int,
+                   extract_version: int = 20, create_version: int = 20, create_system: int = 0,
+                   external_attr: int = 0o600 << 16):
+        offset = self.fp.tell()
+        if offset + csize > _ZIP32_LIMIT or usize > _ZIP32_LIMIT:
+            raise OPCUnsupported("archive exceeds 4 GiB (ZIP64)")
+        try:
+            name_bytes = name.encode("ascii")
+        except UnicodeEncodeError:
+            name_bytes, flags = name.encode("utf-8"), flags | 0x800
+        year, month, day, hour, minute, second = date_time
+        dos_time = (hour << 11) | (minute << 5) | (second // 2)
+        dos_date = (max(year, 1980) - 1980) << 9 | (month << 5) | day
+        self.fp.write(_LOCAL_HEADER.pack(
+            b"PK\x03\x04", extract_version, flags, method, dos_time, dos_date,
+            crc, csize, usize, len(name_bytes), 0,
+        ))
+        self.fp.write(name_bytes)
+        self.central.append(_CENTRAL_HEADER.pack(
+            b"PK\x01\x02", create_system << 8 | create_version, extract_version, flags, method,
+            dos_time, dos_date, crc, csize, usize, len(name_bytes), 0, 0, 0, 0,
+            external_attr, offset,
+        ) + name_bytes)
+
+    def copy_raw(self, src_fp, info: zipfile.ZipInfo):
+        """Copy an entry's compressed bytes as they are"""
+        if info.flag_bits & 0x1:
+            raise OPCUnsupported(f"encrypted entry {info.filename}")
+        src_fp.seek(info.header_offset)
+        header = src_fp.read(_LOCAL_HEADER.size)
+        if header[:4] != b"PK\x03\x04":
+            raise OPCUnsupported(f"bad local header for {info.filename}")
+        name_len, extra_len = struct.unpack("<2H", header[26:30])
+        src_fp.seek(info.header_offset + _LOCAL_HEADER.size + name_len + extra_len)
+        # Sizes and CRC go into the local header, so no data descriptor (bit 3)
+        self._add_entry(
+            info.filename, info.compress_type, info.flag_bits & ~0x08, info.date_time,
+            info.CRC, info.compress_size, info.file_size,
+            info.extract_version, info.create_version, info.create_system, info.external_attr,
+        )
+        _copy_n(src_fp, self.fp, info.compress_size)
+
+    def write_bytes(self, name: str, data: bytes, compress: bool = True):
+        crc = zlib.crc32(data)
+        if compress:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+            payload, method = compressor.compress(data) + compressor.flush(), zipfile.ZIP_DEFLATED
+        else:
+            payload, method = data, zipfile.ZIP_STORED
+        self._add_entry(name, method, 0, time.localtime()[:6], crc, len(payload), len(data))
+        self.fp.write(payload)
+
+    def write_file(self, name: str, path: str, size: int, crc: int):
+        """Stored entry streamed from a file (size / crc known from _digest)"""
+        self._add_entry(name, zipfile.ZIP_STORED, 0, time.localtime()[:6], crc, size, size, extract_version=10)
+        with open(path, "rb") as f:
+            _copy_n(f, self.fp, size)
+
+    def close(self):
+        if len(self.central) > 0xFFFF:
+            raise OPCUnsupported("too many archive entries (ZIP64)")
+        offset = self.fp.tell()
+        for record in self.central:
+            self.fp.write(record)
+        size = self.fp.tell() - offset
+        if offset + size > _ZIP32_LIMIT:
+            raise OPCUnsupported("archive exceeds 4 GiB (ZIP64)")
+        self.fp.write(_END_RECORD.pack(b"PK\x05\x06", 0, 0, len(self.central), len(self.central), size, offset, 0))
+
+
+class _Package:
+    """Source package plus the pending changes (part names have no leading '/')"""
+
+    def __init__(self, src: zipfile.ZipFile):
+        self.src = src
+        self.names = set(src.namelist())
+        self.parts: Dict[str, Any] = {}      # parsed XML parts
+        self.dirty: Dict[str, None] = {}     # parts to serialize (ordered set)
+        self.added: Dict[str, Union[bytes, Tuple[str, int, int]]] = {}  # new media: bytes or (path, size, crc)
+        self.by_sha1: Dict[str, str] = {}
+        self.stats = {"added_bytes": 0, "deduped": 0}
+
+        self.parts[_CONTENT_TYPES] = etree.fromstring(src.read(_CONTENT_TYPES))
+        self.presentation = self.related("", RT.OFFICE_DOCUMENT)
+        if self.presentation is None:
+            raise OPCUnsupported("no presentation part")
+
+    # --- parts ---
+
+    def xml(self, name: str, touch: bool = False):
+        if name not in self.parts:
+            self.parts[name] = parse_xml(self.src.read(name))
+        if touch:
+            self.dirty[name] = None
+        return self.parts[name]
+
+    def next_partname(self, prefix: str, ext: str) -> str:
+        """First free prefix{n}.ext, numbered across extensions with gaps reused (as python-pptx does)"""
+        used = set()
+        for name in itertools.chain(self.names, self.parts, self.added):
+            if name.startswith(prefix):
+                number = name[len(prefix):].split(".", 1)[0]
+                if number.isdigit():
+                    used.add(int(number))
+        n = 1
+        while n in used:
+            n += 1
+        return f"{prefix}{n}.{ext}"
+
+    def set_content_type(self, name: str, content_type: str):
+        types = self.parts[_CONTENT_TYPES]
+        ext = name.rsplit(".", 1)[-1].lower()
+        for default in types.iter(f"{{{_CT_NS}}}Default"):
+            if default.get("Extension", "").lower() == ext and default.get("ContentType") == content_type:
+                return
+        etree.SubElement(types, f"{{{_CT_NS}}}Override", PartName=f"/{name}", ContentType=content_type)
+        self.dirty[_CONTENT_TYPES] = None
+
+    def add_media(self, kind: str, source: Union[str, bytes], ext: str, content_type: str) -> str:
+        """New ppt/media/{kind}N.ext part, shared with any earlier part of identical bytes"""
+        sha1, size, crc = _digest(source)
+        name = self.by_sha1.get(sha1)
+        if name is not None:
+            self.stats["deduped"] += 1
+            return name
+        name = self.next_partname(f"ppt/media/{kind}", ext)
+        self.added[name] = source if isinstance(source, bytes) else (source, size, crc)
+        self.by_sha1[sha1] = name
+        self.stats["added_bytes"] += size
+        self.set_content_type(name, content_type)
+        return name
+
+    # --- relationships ---
+
+    @staticmethod
+    def rels_name(name: str) -> str:
+        folder, base = posixpath.split(name)
+        return posixpath.join(folder, "_rels", f"{base}.rels")
+
+    def rels(self, name: str):
+        rels_name = self.rels_name(name)
+        if rels_name not in self.parts:
+            if rels_name in self.names:
+                self.parts[rels_name] = etree.fromstring(self.src.read(rels_name))
+            else:
+                self.parts[rels_name] = etree.Element(f"{{{_RELS_NS}}}Relationships", nsmap={None: _RELS_NS})
+        return self.parts[rels_name]
+
+    def related(self, name: str, reltype: str) -> Optional[str]:
+        """Part name of the first internal relationship of reltype from name"""
+        for rel in self.rels(name):
+            if rel.get("Type") == reltype and rel.get("TargetMode") != "External":
+                target = rel.get("Target", "")
+                if target.startswith("/"):
+                    return target[1:]
+                return posixpath.normpath(posixpath.join(posixpath.dirname(name), target))
+        return None
+
+    def relate(self, name: str, target_name: str, reltype: str) -> str:
+        """rId of name -> target_name (reused if it already exists)"""
+        rels = self.rels(name)
+        target = posixpath.relpath(target_name, posixpath.dirname(name) or ".")
+        used = set()
+        for rel in rels:
+            if rel.get("Type") == reltype and rel.get("Target") == target and rel.get("TargetMode") != "External":
+                return rel.get("Id")
+            used.add(rel.get("Id"))
+        n = 1
+        while f"rId{n}" in used:
+            n += 1
+        etree.SubElement(rels, f"{{{_RELS_NS}}}Relationship", Id=f"rId{n}", Type=reltype, Target=target)
+        self.dirty[self.rels_name(name)] = None
+        return f"rId{n}"
+
+    # --- slides ---
+
+    def slides(self) -> List[str]:
+        """Slide part names in presentation order"""
+        prs = self.xml(self.presentation)
+        targets = {rel.get("Id"): rel.get("Target") for rel in self.rels(self.presentation)}
+        folder = posixpath.dirname(self.presentation)
+        slides = []
+        sld_id_lst = prs.find(qn("p:sldIdLst"))
+        for sld_id in (sld_id_lst if sld_id_lst is not None else []):
+            target = targets.get(sld_id.get(qn("r:id")))
+            if target:
+                slides.append(target[1:] if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target)))
+        return slides
+
+    def slide_size(self) -> Tuple[int, int]:
+        sld_sz = self.xml(self.presentation).find(qn("p:sldSz"))
+        if sld_sz is None:
+            raise OPCUnsupported("presentation has no slide size")
+        return int(sld_sz.get("cx")), int(sld_sz.get("cy"))
+
+    def is_shown(self, name: str) -> bool:
+        """Reads only the root element of the slide"""
+        with self.src.open(name) as fp:
+            for _, elm in etree.iterparse(fp, events=("start",)):
+                return str(elm.get("show")) not in ("0", "false")
+        return True
+
+    # --- output ---
+
+    def _serialize(self, name: str) -> bytes:
+        return etree.tostring(self.parts[name], encoding="UTF-8", standalone=True)
+
+    def save(self, src_path: Path, dst: Path) -> Tuple[int, int]:
+        """Write the package to dst atomically; returns (raw copied entries, rewritten parts)"""
+        tmp_path = dst.with_name(f"{dst.stem}.{uuid.uuid4().hex[:8]}.tmp")
+        copied = 0
+        try:
+            with open(src_path, "rb") as src_fp, open(tmp_path, "wb") as out:
+                writer = _ZipWriter(out)
+                for info in self.src.infolist():
+                    if info.filename in self.dirty:
+                        writer.write_bytes(info.filename, self._serialize(info.filename))
+                    else:
+                        writer.copy_raw(src_fp, info)
+                        copied += 1
+                for name in self.dirty:
+                    if name not in self.names:
+                        writer.write_bytes(name, self._serialize(name))
+                for name, source in self.added.items():
+                    if isinstance(source, bytes):
+                        writer.write_bytes(name, source, compress=False)
+                    else:
+                        writer.write_file(name, *source)
+                writer.close()
+            os.replace(tmp_path, dst)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return copied, len(self.dirty)
+
+
+class OPCAssembler:
+    """
+    Same result as PPTEmbedder.embed_both (media strategies, autoplay, notes),
+    written at the ZIP/OPC level.
+    """
+
+    def __init__(self, embedder):
+        # Geometry helpers, XML helpers and notes writer are shared with the python-pptx path
+        self.embedder = embedder
+        self.notes_sync = embedder.notes_sync
+
+    def assemble(
+        self,
+        original_path: Path,
+        output_path: Path,
+        audio_paths: List[Optional[str]],
+        video_paths: List[Optional[str]],
+        photo_path: Optional[str] = None,
+        progress_callback: Optional[Callable] = None,
+        notes: Optional[Dict[int, str]] = None,
+    ):
+        start = time.perf_counter()
+        embedder = self.embedder
+        with zipfile.ZipFile(original_path) as src:
+            pkg = _Package(src)
+            slide_w, slide_h = pkg.slide_size()
+            slides = pkg.slides()
+            total_slides = len(slides)
+            visible = [name for name in slides if pkg.is_shown(name)]
+
+            for idx, slide_name in enumerate(visible):
+                slide_no = idx + 1
+                if progress_callback:
+                    progress_callback(
+                        int((slide_no / total_slides) * 100),
+                        f"Assembling slide {slide_no}/{total_slides}..."
+                    )
+
+                video_path = embedder._resolve_path(video_paths[idx]) if idx < len(video_paths) else None
+                audio_path = embedder._resolve_path(audio_paths[idx]) if idx < len(audio_paths) else None
+
+                try:
+                    if video_path and os.path.exists(video_path):
+                        self._video_strategy(pkg, slide_name, video_path, slide_no, photo_path, slide_w, slide_h)
+                    elif photo_path and os.path.exists(photo_path) and audio_path and os.path.exists(audio_path):
+                        duration = embedder._get_audio_duration(audio_path)
+                        self._static_avatar_strategy(pkg, slide_name, photo_path, audio_path, duration, idx == 0, slide_w, slide_h)
+                    elif audio_path and os.path.exists(audio_path):
+                        duration = embedder._get_audio_duration(audio_path)
+                        self._audio_only_strategy(pkg, slide_name, audio_path, duration, slide_h)
+                except OPCUnsupported:
+                    raise
+                except Exception as e:
+                    logger.error(f"Failed to process media for slide {slide_no}: {e}", exc_info=True)
+
+            if notes and self.notes_sync is not None:
+                self._write_notes(pkg, visible, notes)
+
+            copied, rewritten = pkg.save(Path(original_path), Path(output_path))
+
+        logger.info(
+            f"OPC assembly of {Path(original_path).name}: {copied} entries copied raw, "
+            f"{rewritten} parts rewritten, {len(pkg.added)} media added "
+            f"({pkg.stats['added_bytes'] / 1024 / 1024:.1f} MB, {pkg.stats['deduped']} deduplicated) "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+    # --- Strategies (mirror PPTEmbedder) ---
+
+    def _video_strategy(self, pkg: _Package, slide_name: str, video_path: str, slide_no: int,
+                        poster_path: Optional[str], slide_w: int, slide_h: int):
+        orig_w, orig_h = self.embedder._get_video_dimensions_robust(video_path)
+        aspect_ratio = orig_w / orig_h if orig_h > 0 else 1.0
+
+        if slide_no == 1:
+            v_width = int(slide_w * 0.15)
+            v_height = int(v_width / aspect_ratio)
+            margin = Cm(MARGIN_COVER_CM)
+            left = slide_w - v_width - margin
+            top = slide_h - v_height - margin
+        else:
+            v_width = int(slide_w * 0.05)
+            v_height = int(v_width / aspect_ratio)
+            margin = Cm(MARGIN_DEFAULT_CM)
+            left = margin
+            top = slide_h - v_height - margin
+
+        sld = pkg.xml(slide_name, touch=True)
+        if poster_path and not os.path.exists(poster_path):
+            poster_path = None
+        pic = self._add_movie(
+            pkg, slide_name, video_path, self.embedder._detect_mime(video_path),
+            left, top, v_width, v_height, poster_path
+        )
+        self.embedder._set_shape_to_oval(Movie(pic, None))
+        self.embedder._add_autoplay_timing(Slide(sld, None), pic.shape_id)
+
+    def _static_avatar_strategy(self, pkg: _Package, slide_name: str, photo_path: str, audio_path: str,
+                                duration: float, is_title: bool, slide_w: int, slide_h: int):
+        sld = pkg.xml(slide_name, touch=True)
+        if is_title:
+            target_w = slide_w * SLIDE_1_PHOTO_SCALE_FACTOR
+            pic = self._add_picture(pkg, slide_name, photo_path, target_w)
+            margin = Cm(MARGIN_COVER_CM)
+            pic.left = int(slide_w - target_w - margin)
+            pic.top = int(slide_h - pic.height - margin)
+
+            icon_sz = Cm(AUDIO_ICON_SIZE_CM)
+            self._insert_audio_shape(
+                pkg, slide_name, audio_path,
+                left=slide_w - icon_sz - Cm(0.5),
+                top=slide_h - icon_sz - Cm(0.5),
+                width=icon_sz, height=icon_sz
+            )
+        else:
+            size = Cm(AUDIO_ICON_SIZE_CM)
+            margin = Cm(MARGIN_DEFAULT_CM)
+            pic = self._add_picture(pkg, slide_name, photo_path, size)
+            pic.left = int(margin)
+            pic.top = int(slide_h - margin - pic.height)
+
+            self._insert_audio_shape(
+                pkg, slide_name, audio_path,
+                left=pic.left + pic.width + Cm(0.1),
+                top=slide_h - margin - size,
+                width=size, height=size,
+                show_poster=True
+            )
+
+        self.embedder._set_slide_transition(Slide(sld, None), duration)
+
+    def _audio_only_strategy(self, pkg: _Package, slide_name: str, audio_path: str, duration: float, slide_h: int):
+        icon_sz = Cm(0.5)
+        margin = Cm(0.5)
+        self._insert_audio_shape(
+            pkg, slide_name, audio_path,
+            left=margin,
+            top=slide_h - icon_sz - margin,
+            width=icon_sz, height=icon_sz,
+            show_poster=True
+        )
+        self.embedder._set_slide_transition(Slide(pkg.xml(slide_name, touch=True), None), duration)
+
+    # --- Shapes ---
+
+    def _insert_audio_shape(self, pkg: _Package, slide_name: str, audio_path: str,
+                            left, top, width, height, show_poster: bool = False):
+        poster = None
+        if show_poster:
+            asset = Path(__file__).parent.parent.parent / "assets" / "audio_icon.png"
+            if asset.exists(): poster = str(asset)
+        pic = self._add_movie(pkg, slide_name, audio_path, AUDIO_MIME_TYPE, left, top, width, height, poster)
+        self.embedder._add_autoplay_timing(Slide(pkg.xml(slide_name), None), pic.shape_id)
+
+    def _add_image(self, pkg: _Package, image_path: Optional[str]) -> Tuple[str, Any]:
+        image = Image.from_file(image_path) if image_path else Image.from_blob(SPEAKER_IMAGE_BYTES)
+        return pkg.add_media("image", image.blob, image.ext, image.content_type), image
+
+    def _add_movie(self, pkg: _Package, slide_name: str, media_path: str, mime_type: str,
+                   left, top, width, height, poster_path: Optional[str]):
+        """p:pic for audio / video, with the relationships python-pptx's add_movie creates"""
+        ext = Path(media_path).suffix.lstrip(".").lower() or mime_type.split("/")[-1]
+        media = pkg.add_media("media", media_path, ext, mime_type)
+        media_rId = pkg.relate(slide_name, media, RT.MEDIA)
+        video_rId = pkg.relate(slide_name, media, RT.VIDEO)
+        poster, _ = self._add_image(pkg, poster_path)
+        poster_rId = pkg.relate(slide_name, poster, RT.IMAGE)
+
+        sp_tree = pkg.xml(slide_name, touch=True).cSld.spTree
+        shape_id = sp_tree.max_shape_id + 1
+        pic = CT_Picture.new_video_pic(
+            shape_id, os.path.basename(media_path), video_rId, media_rId, poster_rId,
+            int(left), int(top), int(width), int(height)
+        )
+        sp_tree.append(pic)
+        return pic
+
+    def _add_picture(self, pkg: _Package, slide_name: str, image_path: str, width) -> Picture:
+        """Picture scaled to width (aspect ratio kept), at 0,0 like add_picture(width=...)"""
+        image_part, image = self._add_image(pkg, image_path)
+        rId = pkg.relate(slide_name, image_part, RT.IMAGE)
+        px_w, px_h = image.size
+        dpi_x, dpi_y = image.dpi
+        native_w = int(round(914400 * px_w / dpi_x))
+        native_h = int(round(914400 * px_h / dpi_y))
+        height = int(round(native_h * float(width) / float(native_w)))
+
+        sp_tree = pkg.xml(slide_name, touch=True).cSld.spTree
+        shape_id = sp_tree.max_shape_id + 1
+        pic = CT_Picture.new_pic(
+            shape_id, f"Picture {shape_id - 1}", image.filename or f"image.{image.ext}",
+            rId, 0, 0, int(width), height
+        )
+        sp_tree.append(pic)
+        return Picture(pic, None)
+
+    # --- Notes ---
+
+    def _write_notes(self, pkg: _Package, visible: List[str], notes: Dict[int, str]):
+        logger.info(f"Notes sync: {len(notes)} entries, {sum(1 for v in notes.values() if v)} non-empty")
+        synced_count = 0
+        for slide_no, script_text in notes.items():
+            if not script_text:
+                continue
+            if not (1 <= slide_no <= len(visible)):
+                logger.warning(f"[NotesSync] Slide {slide_no} out of range")
+                continue
+            slide_name = visible[slide_no - 1]
+            notes_name = pkg.related(slide_name, RT.NOTES_SLIDE) or self._add_notes_slide(pkg, slide_name)
+            try:
+                if self.notes_sync._write_notes(NotesSlide(pkg.xml(notes_name, touch=True), None), script_text):
+                    synced_count += 1
+            except Exception as e:
+                logger.error(f"[NotesSync] Slide {slide_no}: {e}")
+        logger.info(f"[NotesSync] ✅ Done - {synced_count}/{len(notes)} updated")
+
+    def _add_notes_slide(self, pkg: _Package, slide_name: str) -> str:
+        """New notes slide cloned from the notes master, as python-pptx creates it"""
+        master_name = pkg.related(pkg.presentation, RT.NOTES_MASTER)
+        if master_name is None:
+            raise OPCUnsupported("deck has no notes master")
+        notes = CT_NotesSlide.new()
+        NotesSlide(notes, None).clone_master_placeholders(NotesMaster(pkg.xml(master_name), None))
+
+        name = pkg.next_partname("ppt/notesSlides/notesSlide", "xml")
+        pkg.parts[name] = notes
+        pkg.dirty[name] = None
+        pkg.set_content_type(name, CT.PML_NOTES_SLIDE)
+        pkg.relate(name, master_name, RT.NOTES_MASTER)
+        pkg.relate(name, slide_name, RT.SLIDE)
+        pkg.relate(slide_name, name, RT.NOTES_SLIDE)
+        return name
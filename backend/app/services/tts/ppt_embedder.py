@@ -9,27 +9,31 @@ Refactored for enterprise standards:
 - Constants for configuration
 """
 
+import asyncio
+import hashlib
 import logging
 import os
 import re
-import shutil
-import uuid
 import collections
 import collections.abc
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any, Union
 
-import cv2
-from mutagen.mp3 import MP3
 from pptx import Presentation
 from pptx.util import Cm, Pt
 from pptx.oxml import parse_xml # type: ignore
 from pptx.oxml.ns import qn     # type: ignore
 
+from app.config import settings as app_settings
+from app.utils.media_probe import get_probe_index
+from .assembly_executor import get_assembly_executor
+
 # --- Monkey Patch for python-pptx ---
 # Fixes "AttributeError: 'Part' object has no attribute 'sha1'"
 import pptx.opc.package # type: ignore
+from pptx.parts.image import ImagePart # type: ignore
+from pptx.parts.media import MediaPart # type: ignore
 
 # Fixes for python 3.10+ container imports
 if not hasattr(collections, 'Container'):
@@ -39,11 +43,20 @@ if not hasattr(collections, 'Mapping'):
 if not hasattr(collections, 'MutableMapping'):
     collections.MutableMapping = collections.abc.MutableMapping # type: ignore
 
-if not hasattr(pptx.opc.package.Part, 'sha1'):
-    @property
-    def sha1_patch(self):
-        return f"patched_sha1_{id(self)}"
-    pptx.opc.package.Part.sha1 = sha1_patch
+# python-pptx de-duplicates pictures/media by comparing the new file's SHA1 with
+# `part.sha1` of every image/media part in the package. Parts loaded from an
+# existing deck with an unmapped content type (e.g. audio/mpeg) are plain Parts
+# without sha1, so give them a real content hash (an id()-based value would make
+# every lookup miss and store identical bytes once per slide). ImagePart hashes
+# its blob on every lookup; the hash is cached per part for all three classes.
+def _content_sha1(self):
+    sha1 = self.__dict__.get('_content_sha1')
+    if sha1 is None:
+        sha1 = self.__dict__['_content_sha1'] = hashlib.sha1(self.blob).hexdigest()
+    return sha1
+
+for _part_cls in (pptx.opc.package.Part, ImagePart, MediaPart):
+    _part_cls.sha1 = property(_content_sha1)
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +67,7 @@ SLIDE_OTHER_MEDIA_SIZE_CM = 2.0            # 2.0 cm compacted size
 MARGIN_DEFAULT_CM = 0.5
 MARGIN_COVER_CM = 1.0
 AUDIO_ICON_SIZE_CM = 0.85
+AUDIO_MIME_TYPE = 'audio/mp3'                # narration media type (python-pptx and OPC assembly)
 EMU_PER_PIXEL_96DPI = 9525                 # 1 pixel = 9525 EMU (approx)
 
 class PPTEmbedder:
@@ -61,8 +75,23 @@ class PPTEmbedder:
     Handles embedding of audio and video into PowerPoint presentations.
     """
 
-    def __init__(self, output_dir: Path):
+    def __init__(
+        self,
+        output_dir: Path,
+        notes_sync: Optional[Any] = None,
+    ):
         self.output_dir = output_dir
+        # Writes notes into the same in-memory Presentation before the single save
+        self.notes_sync = notes_sync
+
+    def _write_notes(self, prs, notes: Optional[Dict[int, str]]):
+        if not notes or self.notes_sync is None:
+            return
+        try:
+            logger.info(f"Notes sync: {len(notes)} entries, {sum(1 for v in notes.values() if v)} non-empty")
+            self.notes_sync.write_notes(prs, notes)
+        except Exception as e:
+            logger.error(f"Notes sync failed: {e}")
 
     async def embed_both(
         self,
@@ -72,19 +101,49 @@ class PPTEmbedder:
         video_paths: List[Optional[str]],
         photo_path: Optional[str] = None,
         progress_callback: Optional[callable] = None,
+        notes: Optional[Dict[int, str]] = None,
     ) -> str:
         """
-        Embeds both audio and video into the PPT.
+        Embeds both audio and video into the PPT (and notes, if given).
         Priority: Video > Static Photo + Audio > Only Audio
+        The original is loaded once and everything is written with a single save,
+        on the assembly executor (the event loop stays free).
         """
         original_path = Path(original_pptx_path)
-        output_filename = self._get_sequential_filename(original_path, "final")
-        output_path = self.output_dir / output_filename
-        
-        # Copy original first
-        shutil.copy(original_path, output_path)
+        output_path = self._reserve_output_path(original_path, "final")
+        try:
+            return await get_assembly_executor().run(
+                self._embed_both_sync, original_path, output_path, audio_paths, video_paths,
+                photo_path, notes, progress_callback=progress_callback
+            )
+        except BaseException:
+            self._release_output_path(output_path)
+            raise
 
-        prs = Presentation(output_path)
+    def _embed_both_sync(
+        self,
+        original_path: Path,
+        output_path: Path,
+        audio_paths: List[Optional[str]],
+        video_paths: List[Optional[str]],
+        photo_path: Optional[str] = None,
+        notes: Optional[Dict[int, str]] = None,
+        progress_callback: Optional[callable] = None,
+    ) -> str:
+        if app_settings.PPT_ASSEMBLER == "opc":
+            from .opc_assembler import OPCAssembler, OPCUnsupported
+            try:
+                OPCAssembler(self).assemble(
+                    original_path, output_path, audio_paths, video_paths,
+                    photo_path, progress_callback, notes
+                )
+                return str(output_path.resolve())
+            except OPCUnsupported as e:
+                logger.info(f"OPC assembler cannot handle {original_path.name} ({e}), using python-pptx")
+            except Exception as e:
+                logger.warning(f"OPC assembly failed for {original_path.name}, using python-pptx: {e}", exc_info=True)
+
+        prs = Presentation(str(original_path))
         total_slides = len(prs.slides)
         
         # Filter visible slides
@@ -121,6 +180,7 @@ class PPTEmbedder:
             except Exception as e:
                 logger.error(f"Failed to process media for slide {slide_no}: {e}", exc_info=True)
 
+        self._write_notes(prs, notes)
         prs.save(output_path)
         return str(output_path.resolve())
 
@@ -135,26 +195,21 @@ class PPTEmbedder:
         progress_callback: Optional[callable] = None,
     ) -> Tuple[str, Dict[int, str], List[str]]:
         """
-        Generates and embeds audio based on scripts.
+        Generates and embeds audio based on scripts, plus the scripts as notes (single save).
         """
         original_path = Path(original_pptx_path)
-        output_filename = self._get_sequential_filename(original_path)
-        output_path = self.output_dir / output_filename
-        shutil.copy(original_path, output_path)
+        executor = get_assembly_executor()
         
-        prs = Presentation(output_path)
+        prs = await executor.run(Presentation, str(original_path))
         all_slide_scripts: Dict[int, str] = {}
-        audio_files: List[str] = []
         
         script_data_map = {int(item['slide_no']): item for item in slide_scripts}
         visible_slides = [s for s in prs.slides if str(s.element.get('show')) not in ('0', 'false')]
-        total = len(visible_slides)
 
+        # 1. Synthesize all slides concurrently (AudioGenerator bounds concurrency and request rate)
+        jobs = {}
         for idx, slide in enumerate(visible_slides):
             slide_no = idx + 1
-            if progress_callback:
-                progress_callback(int((slide_no/total)*80), f"Processing slide {slide_no}/{total}...")
-
             data = script_data_map.get(slide_no)
             if not data:
                 continue
@@ -163,13 +218,54 @@ class PPTEmbedder:
             all_slide_scripts[slide_no] = raw_script
             
             clean_script = self._clean_script_text(raw_script)
-            if not clean_script:
-                continue
+            if clean_script:
+                jobs[slide_no] = clean_script
 
+        done = 0
+
+        async def synthesize(slide_no: int, clean_script: str):
+            nonlocal done
             try:
-                audio_info = await audio_generator.generate_audio(
+                return await audio_generator.generate_audio(
                     clean_script, voice, rate, pitch, filename=f"slide_{slide_no}.mp3"
                 )
+            finally:
+                done += 1
+                if progress_callback:
+                    progress_callback(int((done/max(len(jobs), 1))*80), f"Processing slide {done}/{len(jobs)}...")
+
+        results = await asyncio.gather(
+            *(synthesize(slide_no, text) for slide_no, text in jobs.items()), return_exceptions=True
+        )
+
+        # 2. Embed + save on the assembly executor
+        output_path = self._reserve_output_path(original_path)
+        try:
+            audio_files = await executor.run(
+                self._embed_audio_sync, prs, visible_slides, list(zip(jobs, results)),
+                all_slide_scripts, output_path, progress_callback=progress_callback
+            )
+        except BaseException:
+            self._release_output_path(output_path)
+            raise
+        return str(output_path.resolve()), all_slide_scripts, audio_files
+
+    def _embed_audio_sync(
+        self,
+        prs,
+        visible_slides: List[Any],
+        slide_audio: List[Tuple[int, Any]],
+        all_slide_scripts: Dict[int, str],
+        output_path: Path,
+        progress_callback: Optional[callable] = None,
+    ) -> List[str]:
+        """Embeds synthesized audio in slide order, writes notes and saves."""
+        audio_files: List[str] = []
+        for slide_no, audio_info in slide_audio:
+            slide = visible_slides[slide_no - 1]
+            try:
+                if isinstance(audio_info, BaseException):
+                    raise audio_info
                 audio_path = audio_info['path']
                 audio_files.append(audio_path)
                 
@@ -179,8 +275,11 @@ class PPTEmbedder:
             except Exception as e:
                 logger.error(f"Generate/Embed audio failed for slide {slide_no}: {e}")
 
+        if progress_callback:
+            progress_callback(90, "Synchronizing slide notes...")
+        self._write_notes(prs, all_slide_scripts)
         prs.save(output_path)
-        return str(output_path.resolve()), all_slide_scripts, audio_files
+        return audio_files
 
     async def embed_videos(
         self,
@@ -189,8 +288,18 @@ class PPTEmbedder:
         progress_callback: Optional[callable] = None,
     ) -> str:
         """
-        Embeds pre-generated videos into an existing PPTX.
+        Embeds pre-generated videos into an existing PPTX (on the assembly executor).
         """
+        return await get_assembly_executor().run(
+            self._embed_videos_sync, pptx_path, video_paths, progress_callback=progress_callback
+        )
+
+    def _embed_videos_sync(
+        self,
+        pptx_path: str,
+        video_paths: List[Optional[str]],
+        progress_callback: Optional[callable] = None,
+    ) -> str:
         prs = Presentation(pptx_path)
         total = len(prs.slides)
 
@@ -350,10 +459,8 @@ class PPTEmbedder:
         return path
 
     def _get_audio_duration(self, path: str) -> float:
-        try:
-            return MP3(path).info.length
-        except:
-            return 0.0
+        # Narration delivered by AudioGenerator is already recorded in the probe index
+        return get_probe_index().audio_info(path).get("duration") or 0.0
 
     def _clean_script_text(self, text: str) -> str:
         """Cleans script text for TTS."""
@@ -387,46 +494,34 @@ class PPTEmbedder:
             
         return f"{base}_{max_seq+1:03d}.pptx"
 
-    def _get_video_dimensions_robust(self, video_path: str) -> Tuple[int, int]:
+    def _reserve_output_path(self, original_path: Path, prefix: str = None) -> Path:
         """
-        Robustly gets video dimensions using OpenCV.
-        Handles Unicode paths by copying to a temp file if needed.
+        Picks the next sequential filename and creates it empty, so concurrent
+        assemblies of the same deck never get the same name.
         """
-        def _read(p):
-            cap = cv2.VideoCapture(p)
-            if cap.isOpened():
-                w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                cap.release()
-                return w, h
-            return 0, 0
-
-        # Attempt 1: Direct
+        while True:
+            output_path = self.output_dir / self._get_sequential_filename(original_path, prefix)
+            try:
+                open(output_path, 'x').close()
+                return output_path
+            except FileExistsError:
+                continue
+
+    def _release_output_path(self, output_path: Path):
+        """Removes a reserved name that was never written."""
         try:
-            w, h = _read(video_path)
-            if w > 0: return w, h
-        except Exception: 
+            if output_path.stat().st_size == 0:
+                output_path.unlink()
+        except OSError:
             pass
 
-        # Attempt 2: Temp copy (Unicode/Path fix)
-        try:
-            logger.info(f"Direct read failed for {video_path}, using temp workaround.")
-            folder = os.path.dirname(video_path)
-            ext = os.path.splitext(video_path)[1]
-            temp_name = f"probe_{uuid.uuid4().hex[:8]}{ext}"
-            temp_path = os.path.join(folder, temp_name)
-            
-            shutil.copy2(video_path, temp_path)
-            w, h = _read(temp_path)
-            
-            try: os.remove(temp_path)
-            except: pass
-            
-            if w > 0: return w, h
-        except Exception as e:
-            logger.warning(f"Video dim detect failed: {e}")
-            
-        return 0, 0
+    def _get_video_dimensions_robust(self, video_path: str) -> Tuple[int, int]:
+        """
+        Video dimensions from the probe index (recorded when the video was rendered);
+        only unknown or changed files are opened with OpenCV.
+        """
+        info = get_probe_index().video_info(video_path)
+        return info.get("width", 0), info.get("height", 0)
 
     def _detect_mime(self, path: str) -> str:
         lower = path.lower()
@@ -444,14 +539,14 @@ class PPTEmbedder:
         try:
             m = slide.shapes.add_movie(
                 audio_path, left=left, top=top, width=width, height=height,
-                poster_frame_image=poster, mime_type='audio/mp3'
+                poster_frame_image=poster, mime_type=AUDIO_MIME_TYPE
             )
             self._add_autoplay_timing(slide, m.shape_id)
         except Exception:
             # Retry without poster
             m = slide.shapes.add_movie(
                 audio_path, left=left, top=top, width=width, height=height,
-                poster_frame_image=None, mime_type='audio/mp3'
+                poster_frame_image=None, mime_type=AUDIO_MIME_TYPE
             )
             self._add_autoplay_timing(slide, m.shape_id)
 
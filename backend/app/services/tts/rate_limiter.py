@@ -0,0 +1,58 @@
+"""
+Adaptive (AIMD) request pacing for remote TTS endpoints.
+
+Requests to one host are spaced 1/rate seconds apart. Every success raises the
+rate additively; every failure halves it and holds new requests back for a
+cooldown, so a throttling server is backed off quickly and recovered slowly.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveRateLimiter:
+    """每個主機一個：成功時緩慢加速，失敗時減半並冷卻"""
+
+    def __init__(self, host: str, rate: float, min_rate: float = 0.5, max_rate: float = None,
+                 increase: float = 0.25, cooldown: float = 2.0):
+        self.host = host
+        self.max_rate = max_rate or rate
+        self.min_rate = min(min_rate, self.max_rate)
+        self.rate = rate
+        self.increase = increase
+        self.cooldown = cooldown
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for the next send slot"""
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + 1.0 / self.rate
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_error(self):
+        previous = self.rate
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._next_slot = max(self._next_slot, time.monotonic() + self.cooldown)
+        if previous != self.rate:
+            logger.info(f"[RateLimit {self.host}] Backing off: {previous:.2f} -> {self.rate:.2f} req/s")
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def get_limiter(host: str, rate: float, **kwargs) -> AdaptiveRateLimiter:
+    """Shared limiter for host (created on first use)"""
+    limiter = _limiters.get(host)
+    if limiter is None:
+        limiter = _limiters[host] = AdaptiveRateLimiter(host, rate, **kwargs)
+    return limiter
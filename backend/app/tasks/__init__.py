@@ -1,12 +1,15 @@
-from .avatar import run_avatar_generation_task, run_batch_avatar_task
+from .avatar import run_avatar_generation_task, run_batch_avatar_task, run_live_avatar_task
 from .ppt import background_parse_ppt, run_assemble_task
 from .tts import run_narrated_pptx_task, run_tts_batch_task
+from .pipeline import run_produce_task
 
 __all__ = [
     'run_avatar_generation_task',
     'run_batch_avatar_task',
+    'run_live_avatar_task',
     'background_parse_ppt',
     'run_assemble_task',
     'run_narrated_pptx_task',
-    'run_tts_batch_task'
+    'run_tts_batch_task',
+    'run_produce_task'
 ]
@@ -1,4 +1,6 @@
 from app.tasks.common import *
+import asyncio
+from app.services.avatar_queue import is_cancelled
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,11 +15,24 @@ async def run_avatar_generation_task(
 ):
     """Background worker for single avatar generation"""
     try:
+        playlist = None
+
         def prog(p, m, image=None):
+            nonlocal playlist
             data = {"progress": p, "message": m}
             if image:
                 data["current_frame"] = image
+            # published once the render has written its first segment (never on a cache hit)
+            if playlist is not None and playlist.exists():
+                data["stream_url"] = f"/api/avatar/job/{job_id}/stream/index.m3u8"
+                playlist = None
             state.update_ppt_job(f"avatar_{job_id}", data)
+
+        if options.get("stream"):
+            # Progressive HLS output, playable while frames are still rendering
+            stream_dir = await asyncio.to_thread(instances.avatar_service.prepare_stream_dir, job_id)
+            options = {**options, "stream_dir": str(stream_dir)}
+            playlist = stream_dir / "index.m3u8"
             
         result = await instances.avatar_service.generate_talking_head(
             audio_path=audio_path,
@@ -39,10 +54,47 @@ async def run_avatar_generation_task(
     except Exception as e:
          logger.error(f"Avatar task failed: {e}")
          state.update_ppt_job(f"avatar_{job_id}", {"status": "failed", "error": str(e)})
-    finally:
-        # Use photo_id if available to match acquisition, else fallback to job_id
-        lock_id = options.get("photo_id", job_id) if isinstance(options, dict) else job_id
-        instances.avatar_service.release_lock(user_id=lock_id)
+
+@async_task_handler("Live Avatar Generation")
+async def run_live_avatar_task(
+    job_id: str,
+    photo_path: str,
+    output_path: str,
+    options: Dict
+):
+    """Background worker for live avatar generation (audio pushed in chunks)"""
+    state_key = f"avatar_live_{job_id}"
+    try:
+        def prog(p, m, image=None):
+            data = {"progress": p, "message": m}
+            if image:
+                data["current_frame"] = image
+            state.update_ppt_job(state_key, data)
+
+        # Live preview is the point of this mode: always stream HLS
+        stream_dir = await asyncio.to_thread(instances.avatar_service.prepare_stream_dir, job_id)
+        options = {**options, "stream_dir": str(stream_dir)}
+
+        result = await instances.avatar_service.generate_talking_head_live(
+            job_id=job_id,
+            image_path=photo_path,
+            output_path=output_path,
+            progress_callback=prog,
+            options=options
+        )
+
+        if result["success"]:
+            state.update_ppt_job(state_key, {
+                "status": "completed",
+                "progress": 100,
+                "message": "Live avatar generation completed",
+                "video_url": f"/outputs/{Path(output_path).name}"
+            })
+        elif not is_cancelled():
+            state.update_ppt_job(state_key, {"status": "failed", "message": result["message"], "error": result["message"]})
+    except Exception as e:
+         logger.error(f"Live avatar task failed: {e}")
+         state.update_ppt_job(state_key, {"status": "failed", "error": str(e)})
 
 @async_task_handler("Batch Avatar Generation")
 async def run_batch_avatar_task(
@@ -115,10 +167,10 @@ async def run_batch_avatar_task(
         
         logger.info(f"[Batch Avatar {short_id}] Using image: {image_path}")
         logger.info(f"[Batch Avatar {short_id}] Received {len(audio_paths)} audio paths for processing")
-        for i, audio_path in enumerate(audio_paths):
+        def resolve_audio_path(i, audio_path):
             if not audio_path:
                 logger.warning(f"[Batch Avatar {short_id}] Skipping empty audio path at index {i}")
-                continue
+                return None
                 
             # Resolve audio path correctly - Use absolute paths to avoid CWD issues
             audio_path_str = str(audio_path)
@@ -140,12 +192,48 @@ async def run_batch_avatar_task(
                         p = p_legacy
                     else:
                         logger.error(f"[Batch Avatar {short_id}] Audio path error: {audio_path} (Resolved to: {p})")
-                        continue
+                        return None
+            return p
+
+        def slide_options(i):
+            return {
+                "emotion": options.get("emotion", 4),
+                "crop_scale": options.get("crop_scale", 2.3),
+                "sampling_steps": options.get("sampling_steps", 50),
+                "max_size": options.get("max_size", 480),  # 解析度：480/720/1080
+                "preview_duration": options.get("preview_duration"),
+                "frame_batch_size": options.get("frame_batch_size", 1),
+                "skip_silence": options.get("skip_silence", True),
+                "pbar_desc": f"Slide {i+1}/{len(audio_paths)}" # Show readable slide progress
+            }
+
+        resolved_paths = [resolve_audio_path(i, audio_path) for i, audio_path in enumerate(audio_paths)]
+        output_paths = [str(job_dir / f"slide_{i+1}.mp4") for i in range(total)]
+
+        # Slides still to render (resolved audio, no output yet)
+        pending = [
+            i for i, p in enumerate(resolved_paths)
+            if p is not None and not (Path(output_paths[i]).exists() and Path(output_paths[i]).stat().st_size > 0)
+        ]
+
+        # Multi-slide motion batching: the LMDM diffusion of up to N slides runs in lockstep
+        motion_batch_size = max(1, int(options.get("motion_batch_size", 4)))
+        motions = {}
+
+        for i, audio_path in enumerate(audio_paths):
+            if is_cancelled():
+                logger.info(f"[Batch Avatar {short_id}] Cancelled before slide {i+1}")
+                log_to_ip(f"⛔ Batch Cancelled at slide {i+1}")
+                break
+
+            p = resolved_paths[i]
+            if p is None:
+                continue
             
             logger.info(f"[Batch Avatar {short_id}] Processing slide {i+1} with audio: {p.name}")
 
             output_name = f"slide_{i+1}.mp4"
-            output_path = str(job_dir / output_name)
+            output_path = output_paths[i]
             
             if Path(output_path).exists() and Path(output_path).stat().st_size > 0:
                 logger.info(f"[Batch Avatar {short_id}] ⏭️ Slide {i+1} exists, skipping generation")
@@ -153,20 +241,24 @@ async def run_batch_avatar_task(
                 progress_callback(i)(100, f"Slide {i+1} already exists, skipping")
                 result = {"success": True, "message": "Skipped"}
             else:
+                if motion_batch_size > 1 and i not in motions:
+                    group = [j for j in pending if j >= i][:motion_batch_size]
+                    progress_callback(i)(5, f"Generating motion for {len(group)} slides...")
+                    group_motions = await instances.avatar_service.generate_motion_batch(
+                        audio_paths=[str(resolved_paths[j]) for j in group],
+                        image_path=image_path,
+                        options_list=[slide_options(j) for j in group],
+                    )
+                    motions.update(zip(group, group_motions))
+
                 # Generate video for ALL slides (not just slide 1)
                 result = await instances.avatar_service.generate_talking_head(
                     audio_path=str(p),
                     image_path=image_path,
                     output_path=output_path,
                     progress_callback=progress_callback(i),
-                    options={
-                        "emotion": options.get("emotion", 4),
-                        "crop_scale": options.get("crop_scale", 2.3),
-                        "sampling_steps": options.get("sampling_steps", 50),
-                        "max_size": options.get("max_size", 480),  # 解析度：480/720/1080
-                        "preview_duration": options.get("preview_duration"),
-                        "pbar_desc": f"Slide {i+1}/{len(audio_paths)}" # Show readable slide progress
-                    }
+                    options=slide_options(i),
+                    motion=motions.pop(i, None)
                 )
 
             
@@ -208,6 +300,3 @@ async def run_batch_avatar_task(
          state.update_ppt_job(f"avatar_batch_{job_id}", {"status": "failed", "error": str(e)})
     finally:
         PowerManager.allow_sleep()
-        # Use photo_id if available to match acquisition, else fallback to job_id
-        lock_id = options.get("photo_id", job_id) if isinstance(options, dict) else job_id
-        instances.avatar_service.release_lock(user_id=lock_id)
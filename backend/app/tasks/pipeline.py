@@ -0,0 +1,172 @@
+from app.tasks.common import *
+import asyncio
+from app.middleware.session import current_session_id
+from app.tasks.ppt import resolve_photo_path
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Overall progress budget per stage (TTS -> avatar video -> PPTX assembly)
+TTS_SHARE, VIDEO_SHARE, ASSEMBLY_SHARE = 20, 70, 10
+
+
+@async_task_handler("Presentation Production")
+async def run_produce_task(
+    full_job_id: str,
+    file_id: str,
+    slide_scripts: List[Dict],
+    voice: str,
+    rate: str,
+    pitch: str,
+    photo_id: str = None,
+    avatar_options: Dict = None,
+    session_id: str = 'default'
+):
+    """
+    End-to-end job: TTS -> avatar render -> final PPTX, pipelined per slide.
+
+    Each slide's audio is submitted to the avatar render queue as soon as it is
+    synthesized, so rendering starts while later slides are still in TTS.
+    Per-slide state lives in the job's result ({"slides": [...]}).
+    """
+    token = current_session_id.set(session_id)
+    submitted = []
+    try:
+        original_file = state.get_uploaded_file(file_id)
+        if not original_file or not Path(original_file.get("path", "")).exists():
+            raise Exception(f"Original file not found (file_id: {file_id}). The file may have been deleted or the session expired.")
+
+        photo_path = resolve_photo_path(photo_id)
+        render = bool(photo_path) and instances.avatar_service is not None
+        if photo_id and not render:
+            logger.warning(f"[Produce {full_job_id[:16]}] No avatar available, assembling audio only")
+
+        total = len(slide_scripts)
+        slides = [
+            {
+                "slide_no": item.get("slide_no", i + 1),
+                "tts": "pending",
+                "audio_url": None,
+                "video": "pending" if render else "skipped",
+                "video_url": None,
+            }
+            for i, item in enumerate(slide_scripts)
+        ]
+        audio_paths: List[str] = [None] * total
+        video_paths: List[str] = [None] * total
+
+        job_dir = settings.OUTPUT_DIR / full_job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+
+        def publish(message: str, progress: int = None):
+            if progress is None:
+                tts_done = sum(1 for s in slides if s["tts"] != "pending")
+                video_done = sum(1 for s in slides if s["video"] in ("done", "failed", "skipped"))
+                if render:
+                    progress = (tts_done * TTS_SHARE + video_done * VIDEO_SHARE) // max(total, 1)
+                else:
+                    progress = tts_done * (TTS_SHARE + VIDEO_SHARE) // max(total, 1)
+            state.update_ppt_job(full_job_id, {
+                "progress": progress,
+                "message": message,
+                "result": {"slides": slides}
+            })
+
+        options = {
+            "emotion": 4,
+            "crop_scale": 2.3,
+            "sampling_steps": 50,
+            "max_size": 480,
+            "skip_silence": True,
+            **(avatar_options or {}),
+        }
+
+        async def render_slide(i: int, audio_path: str):
+            slide_no = slides[i]["slide_no"]
+            sub_id = f"{full_job_id}_slide_{slide_no}"
+            output_path = job_dir / f"slide_{slide_no}.mp4"
+
+            state.add_ppt_job(f"avatar_{sub_id}", {
+                "job_id": sub_id, "type": "avatar", "status": "queued",
+                "progress": 0, "message": "Waiting in render queue...", "video_url": None
+            })
+            await instances.avatar_service.render_queue.submit(
+                sub_id, "avatar",
+                {
+                    "job_id": sub_id, "photo_path": photo_path, "audio_path": audio_path,
+                    "output_path": str(output_path),
+                    "options": {**options, "pbar_desc": f"Slide {slide_no}/{total}"}
+                },
+                priority=1
+            )
+            submitted.append(sub_id)
+            slides[i]["video"] = "queued"
+            publish(f"Slide {slide_no}: queued for avatar rendering")
+
+            status = await instances.avatar_service.render_queue.wait(sub_id)
+            if status == "done" and output_path.exists() and output_path.stat().st_size > 0:
+                video_paths[i] = str(output_path.absolute())
+                slides[i]["video"] = "done"
+                slides[i]["video_url"] = f"/outputs/{full_job_id}/{output_path.name}"
+                publish(f"Slide {slide_no}: avatar video ready")
+            else:
+                slides[i]["video"] = "failed"
+                publish(f"Slide {slide_no}: avatar rendering {status if status != 'done' else 'failed'}")
+
+        # Stage 1 -> 2: slides synthesize concurrently (bounded by AudioGenerator),
+        # and every finished audio goes straight into the render queue
+        async def produce_slide(i: int, item: Dict):
+            slide_no = slides[i]["slide_no"]
+            try:
+                info = await instances.tts_service.generate_slide_audio(
+                    item, voice, rate, pitch, job_id=full_job_id
+                )
+            except Exception as e:
+                logger.error(f"[Produce {full_job_id[:16]}] TTS failed for slide {slide_no}: {e}")
+                info = None
+                slides[i]["tts"] = "failed"
+            else:
+                slides[i]["tts"] = "done" if info and info.get("path") else "skipped"
+
+            if slides[i]["tts"] != "done":
+                slides[i]["video"] = "skipped"
+                publish(f"Slide {slide_no}: no narration")
+                return
+
+            audio_paths[i] = info["path"]
+            slides[i]["audio_url"] = info["url_path"]
+            publish(f"Slide {slide_no}: audio ready")
+            if render:
+                await render_slide(i, info["path"])
+
+        await asyncio.gather(*(produce_slide(i, item) for i, item in enumerate(slide_scripts)))
+
+        # Stage 3: python-pptx writes the package in one save, so assembly waits for the last slide
+        base = TTS_SHARE + VIDEO_SHARE
+
+        def assembly_progress(p, m):
+            publish(m, base + p * ASSEMBLY_SHARE // 100)
+
+        result = await instances.tts_service.assemble_final_pptx(
+            original_file["path"],
+            slide_scripts,
+            audio_paths,
+            video_paths,
+            photo_path=photo_path,
+            progress_callback=assembly_progress
+        )
+
+        state.update_ppt_job(full_job_id, {
+            "status": "completed",
+            "progress": 100,
+            "message": "Presentation produced.",
+            "result": {**result, "slides": slides}
+        })
+    except Exception as e:
+        logger.error(f"Produce task failed: {e}")
+        for sub_id in submitted:
+            instances.avatar_service.render_queue.cancel(sub_id)
+        state.update_ppt_job(full_job_id, {"status": "failed", "message": str(e)})
+        raise
+    finally:
+        current_session_id.reset(token)
@@ -22,6 +22,28 @@ async def background_parse_ppt(file_id: str, save_path: str):
     state.set_parse_status(file_id, {"status": "completed", "progress": 100, "message": "Analysis complete"})
 
 
+def resolve_photo_path(photo_id: str = None):
+    """Resolve an uploaded avatar photo id to a path on disk (None if not found)"""
+    photo_path = None
+    if photo_id:
+        p_data = state.get_uploaded_file(f"avatar_{photo_id}")
+        if p_data:
+            photo_path = p_data.get("path")
+        else:
+            # Fallback search: Check for direct filename match FIRST
+            direct_path = settings.UPLOAD_DIR / photo_id
+            if direct_path.exists():
+                photo_path = str(direct_path)
+            else:
+                # Legacy check: Check for avatar_ prefix
+                try:
+                    matches = list(settings.UPLOAD_DIR.glob(f"avatar_{photo_id}.*"))
+                    if matches:
+                        photo_path = str(matches[0])
+                except: pass
+    return photo_path
+
+
 @async_task_handler("Final PPT Assembly")
 async def run_assemble_task(full_job_id: str, file_id: str, slide_scripts: List[Dict], audio_paths: List[str], video_paths: List[str], photo_id: str = None):
     """Background task for final PPT assembly"""
@@ -45,23 +67,7 @@ async def run_assemble_task(full_job_id: str, file_id: str, slide_scripts: List[
 
     
     # Resolve Photo Path (if provided)
-    photo_path = None
-    if photo_id:
-        p_data = state.get_uploaded_file(f"avatar_{photo_id}")
-        if p_data:
-            photo_path = p_data.get("path")
-        else:
-            # Fallback search: Check for direct filename match FIRST
-            direct_path = settings.UPLOAD_DIR / photo_id
-            if direct_path.exists():
-                photo_path = str(direct_path)
-            else:
-                # Legacy check: Check for avatar_ prefix
-                try:
-                    matches = list(settings.UPLOAD_DIR.glob(f"avatar_{photo_id}.*"))
-                    if matches:
-                        photo_path = str(matches[0])
-                except: pass
+    photo_path = resolve_photo_path(photo_id)
             
     # Standardize audio and video paths to absolute
     abs_audio_paths = []
@@ -0,0 +1,276 @@
+"""
+Content-addressed media cache with a size-bounded LRU index
+
+Files live in cache_dir as <key><ext>; the index (size, metadata, last access,
+refcount) is kept in the media_cache table so hits and eviction never have to
+stat the directory. Delivery hardlinks (or reflinks) the cached file into place
+and only copies when the destination is on another filesystem.
+
+refcount is the number of hardlinks handed out that still exist (st_nlink - 1).
+Evicting such an entry frees no disk space, so referenced entries go last.
+"""
+import datetime
+import logging
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from app.models.db_models import SessionLocal, MediaCacheRecord, init_db
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+FICLONE = 0x40049409  # linux ioctl: share extents (btrfs / xfs / overlay reflink)
+
+
+def _reflink(src: PathLike, dst: PathLike):
+    import fcntl
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.remove(dst)
+            raise
+
+
+def link_or_copy(src: PathLike, dst: PathLike) -> str:
+    """
+    Place src at dst without copying data when possible.
+    Returns the method used: "hardlink", "reflink" or "copy".
+
+    dst is unlinked first, so writers that later truncate dst in place
+    can never reach the shared inode.
+    """
+    dst = str(dst)
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        pass
+    try:
+        _reflink(src, dst)
+        return "reflink"
+    except (OSError, ImportError):
+        pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+class MediaCache:
+    """快取檔案 (內容雜湊為鍵) + LRU 容量上限"""
+
+    def __init__(self, namespace: str, cache_dir: PathLike, max_bytes: int, ext: str = ""):
+        self.namespace = namespace
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.ext = ext
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Caches may be built at import time, before the state manager created the tables
+        init_db()
+        self._reconcile()
+
+    def _record_key(self, key: str) -> str:
+        return f"{self.namespace}/{key}"
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.ext}"
+
+    def _reconcile(self):
+        """Index files written before the index existed (or by older versions) so LRU covers them"""
+        db = SessionLocal()
+        try:
+            indexed = {
+                r.path for r in db.query(MediaCacheRecord.path).filter(MediaCacheRecord.namespace == self.namespace)
+            }
+            added = 0
+            for path in self.cache_dir.iterdir():
+                if not path.is_file() or path.name.endswith(".tmp") or str(path) in indexed:
+                    continue
+                st = path.stat()
+                db.merge(MediaCacheRecord(
+                    cache_key=self._record_key(path.stem),
+                    namespace=self.namespace,
+                    path=str(path),
+                    size=st.st_size,
+                    refcount=max(0, st.st_nlink - 1),
+                    last_access=datetime.datetime.utcfromtimestamp(st.st_mtime),
+                ))
+                added += 1
+            db.commit()
+            if added:
+                logger.info(f"[MediaCache:{self.namespace}] Indexed {added} existing file(s)")
+        except Exception as e:
+            logger.warning(f"[MediaCache:{self.namespace}] Reconcile failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+        self.evict()
+
+    def get(self, key: str) -> Optional[Path]:
+        """Cached file for key (marks it recently used), or None"""
+        db = SessionLocal()
+        try:
+            record = db.query(MediaCacheRecord).filter(MediaCacheRecord.cache_key == self._record_key(key)).first()
+            if record is None:
+                return None
+            path = Path(record.path)
+            if not path.is_file():
+                db.delete(record)
+                db.commit()
+                return None
+            record.last_access = datetime.datetime.utcnow()
+            db.commit()
+            return path
+        except Exception as e:
+            logger.warning(f"[MediaCache:{self.namespace}] Lookup failed: {e}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+    def get_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            record = db.query(MediaCacheRecord).filter(MediaCacheRecord.cache_key == self._record_key(key)).first()
+            return record.meta if record else None
+        finally:
+            db.close()
+
+    def fetch(self, key: str, dst: PathLike) -> bool:
+        """Deliver the cached file to dst; False on miss"""
+        path = self.get(key)
+        if path is None:
+            return False
+        try:
+            method = link_or_copy(path, dst)
+            logger.debug(f"[MediaCache:{self.namespace}] {key[:12]}... delivered by {method}")
+        except OSError as e:
+            logger.warning(f"[MediaCache:{self.namespace}] Delivery failed: {e}")
+            return False
+        if method == "hardlink":
+            self._set_refcount(key, path)
+        return True
+
+    def _set_refcount(self, key: str, path: Path):
+        db = SessionLocal()
+        try:
+            record = db.query(MediaCacheRecord).filter(MediaCacheRecord.cache_key == self._record_key(key)).first()
+            if record is not None:
+                record.refcount = max(0, path.stat().st_nlink - 1)
+                db.commit()
+        except Exception as e:
+            logger.debug(f"[MediaCache:{self.namespace}] Refcount update failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def put(self, key: str, src: PathLike, meta: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+        """Store src under key (linked when possible), then evict down to the byte budget"""
+        path = self.path_for(key)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            link_or_copy(src, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"[MediaCache:{self.namespace}] Failed to store {key[:12]}...: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return None
+        return self.register(key, meta)
+
+    def register(self, key: str, meta: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+        """Index a file already written at path_for(key), then evict down to the byte budget"""
+        path = self.path_for(key)
+        db = SessionLocal()
+        try:
+            st = path.stat()
+            db.merge(MediaCacheRecord(
+                cache_key=self._record_key(key),
+                namespace=self.namespace,
+                path=str(path),
+                size=st.st_size,
+                meta=meta,
+                refcount=max(0, st.st_nlink - 1),
+                last_access=datetime.datetime.utcnow(),
+            ))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"[MediaCache:{self.namespace}] Failed to index {key[:12]}...: {e}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+        self.evict(keep=key)
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Remove least recently used entries until the namespace fits max_bytes; returns bytes freed"""
+        keep_key = self._record_key(keep) if keep else None
+        freed = 0
+        with self._lock:
+            db = SessionLocal()
+            try:
+                records = (
+                    db.query(MediaCacheRecord)
+                    .filter(MediaCacheRecord.namespace == self.namespace)
+                    .order_by(MediaCacheRecord.last_access)
+                    .all()
+                )
+                total = sum(r.size or 0 for r in records)
+                if total > self.max_bytes:
+                    # Refresh refcounts (links may have been deleted since), unreferenced entries first
+                    for record in records:
+                        try:
+                            record.refcount = max(0, os.stat(record.path).st_nlink - 1)
+                        except OSError:
+                            record.refcount = 0
+                    records.sort(key=lambda r: (r.refcount > 0, r.last_access))
+                for record in records:
+                    if total <= self.max_bytes:
+                        break
+                    if record.cache_key == keep_key:
+                        continue
+                    try:
+                        os.remove(record.path)
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        # e.g. still open on Windows: retry on the next eviction
+                        logger.debug(f"[MediaCache:{self.namespace}] Cannot evict {record.path}: {e}")
+                        continue
+                    total -= record.size or 0
+                    freed += record.size or 0
+                    db.delete(record)
+                db.commit()
+            except Exception as e:
+                logger.warning(f"[MediaCache:{self.namespace}] Eviction failed: {e}")
+                db.rollback()
+            finally:
+                db.close()
+        if freed:
+            logger.info(f"[MediaCache:{self.namespace}] Evicted {freed / 1024**2:.1f} MB")
+        return freed
+
+    def stats(self) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            rows = db.query(MediaCacheRecord.size, MediaCacheRecord.refcount).filter(
+                MediaCacheRecord.namespace == self.namespace
+            ).all()
+            return {
+                "entries": len(rows),
+                "bytes": sum(r.size or 0 for r in rows),
+                "referenced": sum(1 for r in rows if r.refcount),
+                "max_bytes": self.max_bytes,
+            }
+        finally:
+            db.close()
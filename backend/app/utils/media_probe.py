@@ -0,0 +1,216 @@
+"""
+Persistent media probe index
+
+Stream info of media files (width, height, fps, duration, codec, ...) keyed by
+(path, size, mtime). The generators record what they write (AvatarService:
+rendered videos, AudioGenerator: delivered narration), so assembly reads
+dimensions and durations from the index instead of opening every file with
+cv2 / mutagen. A file whose size or mtime changed no longer matches and is
+probed again; media the generators never saw is probed once and recorded.
+"""
+import datetime
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from app.models.db_models import SessionLocal, MediaProbeRecord, init_db
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+MEMO_SIZE = 4096
+
+
+def _read_video(path: str) -> Optional[Dict[str, Any]]:
+    import cv2
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            return None
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width <= 0 or height <= 0:
+            return None
+        fps = float(cap.get(cv2.CAP_PROP_FPS) or 0)
+        frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC) or 0)
+        codec = "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip("\x00 ").lower()
+        return {
+            "width": width,
+            "height": height,
+            "fps": fps or None,
+            "duration": frames / fps if fps and frames > 0 else None,
+            "codec": codec or None,
+        }
+    finally:
+        cap.release()
+
+
+def probe_video(path: PathLike) -> Dict[str, Any]:
+    """Video stream info via OpenCV ({} if unreadable)"""
+    path = str(path)
+    try:
+        info = _read_video(path)
+        if info:
+            return info
+    except Exception:
+        pass
+
+    # Some OpenCV builds cannot open Unicode paths: probe an ASCII-named copy
+    try:
+        logger.info(f"Direct read failed for {path}, using temp workaround.")
+        temp_path = os.path.join(os.path.dirname(path), f"probe_{uuid.uuid4().hex[:8]}{os.path.splitext(path)[1]}")
+        shutil.copy2(path, temp_path)
+        try:
+            return _read_video(temp_path) or {}
+        finally:
+            try: os.remove(temp_path)
+            except OSError: pass
+    except Exception as e:
+        logger.warning(f"Video probe failed for {path}: {e}")
+    return {}
+
+
+def probe_audio(path: PathLike) -> Dict[str, Any]:
+    """Audio stream info via mutagen ({} if unreadable)"""
+    try:
+        import mutagen
+        audio = mutagen.File(str(path))
+        if audio is None or audio.info is None:
+            return {}
+        info = audio.info
+        return {
+            "duration": info.length,
+            "bitrate": getattr(info, "bitrate", None),
+            "sample_rate": getattr(info, "sample_rate", None),
+            "codec": Path(path).suffix.lstrip(".").lower() or None,
+        }
+    except Exception as e:
+        logger.warning(f"Audio probe failed for {path}: {e}")
+        return {}
+
+
+class MediaProbeIndex:
+    """媒體資訊索引: (path, size, mtime) -> 串流資訊 (media_probe table + in-memory memo)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memo: "OrderedDict[str, Tuple[int, int, Dict[str, Any]]]" = OrderedDict()
+        init_db()
+        self._prune()
+
+    @staticmethod
+    def _key(path: PathLike) -> str:
+        return os.path.abspath(str(path))
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _remember(self, key: str, stat: Tuple[int, int], meta: Dict[str, Any]):
+        with self._lock:
+            self._memo[key] = (stat[0], stat[1], meta)
+            self._memo.move_to_end(key)
+            while len(self._memo) > MEMO_SIZE:
+                self._memo.popitem(last=False)
+
+    def _prune(self):
+        """Drop records of files that no longer exist"""
+        db = SessionLocal()
+        try:
+            stale = [r.path for r in db.query(MediaProbeRecord.path) if not os.path.exists(r.path)]
+            if stale:
+                db.query(MediaProbeRecord).filter(MediaProbeRecord.path.in_(stale)).delete(synchronize_session=False)
+                db.commit()
+                logger.info(f"[MediaProbe] Pruned {len(stale)} record(s) of removed files")
+        except Exception as e:
+            logger.warning(f"[MediaProbe] Prune failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def lookup(self, path: PathLike) -> Optional[Dict[str, Any]]:
+        """Recorded info if the file is unchanged since it was recorded, else None"""
+        key = self._key(path)
+        stat = self._stat(key)
+        if stat is None:
+            return None
+        with self._lock:
+            memo = self._memo.get(key)
+        if memo and memo[:2] == stat:
+            return memo[2]
+
+        db = SessionLocal()
+        try:
+            record = db.query(MediaProbeRecord).filter(MediaProbeRecord.path == key).first()
+            if record is None or (record.size, record.mtime_ns) != stat:
+                return None
+            meta = record.meta or {}
+        except Exception as e:
+            logger.warning(f"[MediaProbe] Lookup failed: {e}")
+            return None
+        finally:
+            db.close()
+        self._remember(key, stat, meta)
+        return meta
+
+    def record(self, path: PathLike, meta: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Store info for the file as it is now (nothing is stored for empty info)"""
+        meta = {k: v for k, v in (meta or {}).items() if v is not None}
+        key = self._key(path)
+        stat = self._stat(key)
+        if not meta or stat is None:
+            return None
+
+        db = SessionLocal()
+        try:
+            db.merge(MediaProbeRecord(
+                path=key,
+                size=stat[0],
+                mtime_ns=stat[1],
+                meta=meta,
+                updated_at=datetime.datetime.utcnow(),
+            ))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"[MediaProbe] Record failed for {key}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+        self._remember(key, stat, meta)
+        return meta
+
+    def video_info(self, path: PathLike) -> Dict[str, Any]:
+        meta = self.lookup(path)
+        if meta is None:
+            meta = self.record(path, probe_video(path)) or {}
+        return meta
+
+    def audio_info(self, path: PathLike) -> Dict[str, Any]:
+        meta = self.lookup(path)
+        if meta is None:
+            meta = self.record(path, probe_audio(path)) or {}
+        return meta
+
+
+_index: Optional[MediaProbeIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_probe_index() -> MediaProbeIndex:
+    """Process-wide probe index (assembly threads share it)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = MediaProbeIndex()
+        return _index
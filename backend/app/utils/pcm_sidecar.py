@@ -0,0 +1,73 @@
+"""
+16 kHz mono PCM sidecars for narration audio
+
+<audio>.16k.npy holds the float32 samples the avatar pipeline would otherwise
+get from librosa.core.load(<audio>, sr=16000) (full decode + resample per
+render). The sidecar is memory-mapped, so consumers read it zero-copy. A
+sidecar older than its audio file is stale and ignored.
+"""
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Union
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+SAMPLE_RATE = 16000
+SUFFIX = ".16k.npy"
+
+
+def sidecar_path(audio_path: PathLike) -> Path:
+    return Path(f"{audio_path}{SUFFIX}")
+
+
+def is_fresh(samples_path: PathLike, audio_path: PathLike) -> bool:
+    """True if samples_path exists and is not older than audio_path"""
+    try:
+        return os.stat(samples_path).st_mtime >= os.stat(audio_path).st_mtime
+    except OSError:
+        return False
+
+
+def load_sidecar(audio_path: PathLike):
+    """Memory-mapped float32 samples at 16 kHz, or None if there is no valid sidecar"""
+    path = sidecar_path(audio_path)
+    if not is_fresh(path, audio_path):
+        return None
+    try:
+        import numpy as np
+        samples = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if samples.dtype != "float32" or samples.ndim != 1:
+        return None
+    return samples
+
+
+def write_samples(samples, dst: PathLike):
+    """Save float32 samples to dst atomically"""
+    import numpy as np
+    dst = Path(dst)
+    tmp_path = dst.with_name(f"{dst.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(samples, dtype=np.float32))
+        os.replace(tmp_path, dst)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def decode_to(audio_path: PathLike, dst: PathLike) -> bool:
+    """Decode + resample audio_path exactly as the avatar pipeline does, into dst"""
+    try:
+        import librosa
+        samples, _ = librosa.core.load(str(audio_path), sr=SAMPLE_RATE)
+    except Exception as e:
+        logger.debug(f"PCM sidecar skipped for {audio_path}: {e}")
+        return False
+    write_samples(samples, dst)
+    return True
@@ -1,7 +1,7 @@
 import logging
 import threading
 from typing import Dict, Optional, Any
-from app.models.db_models import SessionLocal, FileRecord, ParseStatusRecord, JobRecord, CacheRecord, init_db
+from app.models.db_models import SessionLocal, FileRecord, ParseStatusRecord, JobRecord, CacheRecord, RenderQueueRecord, init_db
 
 logger = logging.getLogger(__name__)
 
@@ -205,13 +205,14 @@ class StateManager:
                 db.commit()
             
             # Update memory cache for transient data
-            if "current_frame" in updates:
-                if job_id not in self._job_memory_cache:
-                    self._job_memory_cache[job_id] = {}
-                self._job_memory_cache[job_id]["current_frame"] = updates["current_frame"]
+            for key in ("current_frame", "stream_url"):
+                if key in updates:
+                    if job_id not in self._job_memory_cache:
+                        self._job_memory_cache[job_id] = {}
+                    self._job_memory_cache[job_id][key] = updates[key]
             
             # Cleanup memory cache on completion
-            if updates.get("status") in ["completed", "failed"] and job_id in self._job_memory_cache:
+            if updates.get("status") in ["completed", "failed", "cancelled"] and job_id in self._job_memory_cache:
                 self._job_memory_cache[job_id].pop("current_frame", None)
         except Exception as e:
             logger.error(f"Failed to update job {job_id}: {e}")
@@ -261,5 +262,62 @@ class StateManager:
         finally:
             db.close()
 
+    # Render Queue
+    def add_render_job(self, job_id: str, kind: str, payload: Dict, priority: int = 1):
+        """Persist a queued avatar render job"""
+        db = SessionLocal()
+        try:
+            record = db.query(RenderQueueRecord).filter(RenderQueueRecord.job_id == job_id).first()
+            if not record:
+                record = RenderQueueRecord(job_id=job_id)
+                db.add(record)
+
+            record.kind = kind
+            record.payload = payload
+            record.priority = priority
+            record.status = "queued"
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to add render job {job_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def update_render_job(self, job_id: str, status: str):
+        """Update render job status ('queued', 'running', 'done', 'cancelled')"""
+        db = SessionLocal()
+        try:
+            record = db.query(RenderQueueRecord).filter(RenderQueueRecord.job_id == job_id).first()
+            if record:
+                record.status = status
+                db.commit()
+        except Exception as e:
+            logger.error(f"Failed to update render job {job_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def get_pending_render_jobs(self) -> list[Dict]:
+        """Jobs still queued or interrupted while running, oldest first"""
+        db = SessionLocal()
+        try:
+            records = (
+                db.query(RenderQueueRecord)
+                .filter(RenderQueueRecord.status.in_(["queued", "running"]))
+                .order_by(RenderQueueRecord.created_at)
+                .all()
+            )
+            return [
+                {
+                    "job_id": record.job_id,
+                    "kind": record.kind,
+                    "payload": record.payload,
+                    "priority": record.priority,
+                }
+                for record in records
+            ]
+        finally:
+            db.close()
+
 # Global state manager instance
 state = StateManager()
@@ -228,7 +228,10 @@ export default function GenerationStep({
                     }
                 } else if (status.status === 'failed') {
                     onError(status.error || status.message);
+                } else if (status.status === 'cancelled') {
+                    // Final: cancelled through the API / render queue, shown by StepAvatarGeneration
                 } else {
+                    // queued / processing
                     setTimeout(() => { if (active) poll(); }, 2000);
                 }
             } catch (err) {
@@ -299,7 +302,10 @@ export default function GenerationStep({
 
                 } else if (status.status === 'failed') {
                     onError(status.error || status.message);
+                } else if (status.status === 'cancelled') {
+                    // Final: cancelled through the API / render queue, shown by StepAvatarGeneration
                 } else {
+                    // queued / processing
                     setTimeout(() => { if (active) poll(); }, 2000);
                 }
             } catch (err) {
@@ -195,7 +195,11 @@ export default function StepAvatarGeneration({
                             <div className="progress-details">
                                 <span className="percent">{progress.progress}%</span>
                                 <span className="label">
-                                    {progress.status === 'completed' ? '影片合成完成' : '影像渲染中...'}
+                                    {progress.status === 'completed' ? '影片合成完成'
+                                        : progress.status === 'cancelled' ? '已取消'
+                                        : progress.status === 'queued'
+                                            ? (progress.queue_position ? `排隊中 (第 ${progress.queue_position} 位)` : '排隊中...')
+                                        : '影像渲染中...'}
                                 </span>
                             </div>
                             <div className="progress-bar-bg large">
@@ -234,7 +238,7 @@ export default function StepAvatarGeneration({
                                 </div>
                             )}
 
-                            {progress.status === 'processing' && (
+                            {(progress.status === 'processing' || progress.status === 'queued') && (
                                 <button className="btn btn-secondary-sm mt-6 text-gray-400 hover:text-white" onClick={onRegenerate}>⛔ 取消並重新開始</button>
                             )}
 
@@ -252,6 +256,9 @@ export default function StepAvatarGeneration({
                             {progress.status === 'failed' && (
                                 <button className="btn btn-danger btn-lg mt-4 w-full" onClick={onRegenerate}>重試影片生成</button>
                             )}
+                            {progress.status === 'cancelled' && (
+                                <button className="btn btn-secondary btn-lg mt-4 w-full" onClick={onRegenerate}>↺ 重新生成影片</button>
+                            )}
                         </div>
                     )}
                 </>
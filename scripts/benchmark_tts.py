@@ -0,0 +1,156 @@
+"""
+Narration pipeline benchmark (repeatable, no internet needed).
+
+  # In-process: TTSService batch synthesis with the offline engine
+  python scripts/benchmark_tts.py engine --slides 40 --runs 3
+
+  # Against a running backend started with TTS_ENGINE=offline
+  python scripts/benchmark_tts.py http --url http://localhost:8000 --slides 40 --runs 3
+  python scripts/benchmark_tts.py http --produce FILE_ID --photo PHOTO_ID   # TTS + avatar + assembly
+
+--cold makes every run use fresh text (every sentence is unique, so neither
+slide nor sentence cache entries hit); the default repeats the same deck, so
+runs after the first measure the cache-hit path.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+PHRASES = [
+    "今天要跟大家介紹我們這一季的產品規劃。",
+    "首先請看這張圖表，營收比去年同期成長了百分之十二。",
+    "接下來說明三個主要的改善方向。",
+    "第一是縮短交期，第二是降低不良率，第三是提升客戶滿意度。",
+    "This slide summarizes the key results of the pilot program.",
+    "We reduced the average processing time from five minutes to forty seconds.",
+    "以上就是這一頁的重點，我們繼續看下一頁。",
+]
+
+
+def make_deck(slides: int, sentences: int, salt: str = ""):
+    """Deterministic slide scripts (salt makes every sentence unique per run and slide)"""
+    deck = []
+    for i in range(slides):
+        parts = []
+        for j in range(sentences):
+            phrase = PHRASES[(i * 3 + j) % len(PHRASES)]
+            # salted per sentence: segment caching (TTS_SEGMENT_CACHE) must not hit either
+            parts.append(f"版本{salt}，第{i + 1}頁第{j + 1}句，{phrase}" if salt else phrase)
+        deck.append({"slide_no": str(i + 1), "script": " ".join(parts)})
+    return deck
+
+
+def cold_salt(args, run: int) -> str:
+    """Salt of a --cold run, unique across invocations too (an earlier benchmark's cache never hits)"""
+    return f"{args.started}-{run}" if args.cold else ""
+
+
+def report(name: str, timings, slides: int):
+    print(f"\n{name}: {len(timings)} run(s), {slides} slides each")
+    for i, t in enumerate(timings):
+        print(f"  run {i + 1}: {t:8.2f} s   {slides / t:8.1f} slides/s")
+    if len(timings) > 1:
+        print(f"  median {statistics.median(timings):.2f} s, min {min(timings):.2f} s, max {max(timings):.2f} s")
+
+
+def bench_engine(args):
+    backend = Path(__file__).resolve().parent.parent / "backend"
+    workdir = Path(tempfile.mkdtemp(prefix="tts_bench_"))
+    # The state DB and prompts dir are relative to the CWD: keep them out of the project
+    os.chdir(workdir)
+    sys.path.insert(0, str(backend))
+    from app.services.tts import TTSService
+
+    service = TTSService(workdir / "outputs", engine=args.engine)
+    print(f"Engine: {service.audio_gen.engine.name}, output: {workdir}")
+
+    async def run_all():
+        timings = []
+        for run in range(args.runs):
+            deck = make_deck(args.slides, args.sentences, salt=cold_salt(args, run))
+            start = time.perf_counter()
+            urls = await service.generate_batch_audio(deck, args.voice, args.rate, job_id=f"bench_{run}")
+            timings.append(time.perf_counter() - start)
+            missing = sum(1 for u in urls if not u)
+            if missing:
+                print(f"  run {run + 1}: {missing} slide(s) without audio")
+        return timings
+
+    report("generate_batch_audio", asyncio.run(run_all()), args.slides)
+
+
+def _request(url: str, payload=None):
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+def _wait(base: str, job_id: str, poll: float, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = _request(f"{base}/api/ppt/job/{job_id}/status")
+        if status["status"] in ("completed", "failed", "cancelled"):
+            return status
+        time.sleep(poll)
+    raise TimeoutError(f"Job {job_id} did not finish within {timeout}s")
+
+
+def bench_http(args):
+    base = args.url.rstrip("/")
+    timings = []
+    for run in range(args.runs):
+        deck = make_deck(args.slides, args.sentences, salt=cold_salt(args, run))
+        start = time.perf_counter()
+        if args.produce:
+            job = _request(f"{base}/api/ppt/produce", {
+                "file_id": args.produce, "slide_scripts": deck, "voice": args.voice,
+                "rate": args.rate, "photo_id": args.photo,
+            })
+        else:
+            job = _request(f"{base}/api/tts/generate-batch", {
+                "slide_scripts": deck, "voice": args.voice, "rate": args.rate,
+            })
+        status = _wait(base, job["job_id"], args.poll, args.timeout)
+        timings.append(time.perf_counter() - start)
+        if status["status"] != "completed":
+            print(f"  run {run + 1}: {status['status']} - {status.get('message')}")
+    report("/api/ppt/produce" if args.produce else "/api/tts/generate-batch", timings, args.slides)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TTS / narration throughput")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    for name in ("engine", "http"):
+        p = sub.add_parser(name)
+        p.add_argument("--slides", type=int, default=40)
+        p.add_argument("--sentences", type=int, default=4, help="sentences per slide")
+        p.add_argument("--runs", type=int, default=3)
+        p.add_argument("--cold", action="store_true", help="unique text per run (no cache hits)")
+        p.add_argument("--voice", default="zh-TW-HsiaoChenNeural")
+        p.add_argument("--rate", default="+0%")
+    sub.choices["engine"].add_argument("--engine", default="offline", help="TTS engine (offline / edge)")
+    http = sub.choices["http"]
+    http.add_argument("--url", default="http://localhost:8000")
+    http.add_argument("--produce", metavar="FILE_ID", help="benchmark /api/ppt/produce on an uploaded deck")
+    http.add_argument("--photo", metavar="PHOTO_ID", help="avatar photo for --produce")
+    http.add_argument("--poll", type=float, default=0.5)
+    http.add_argument("--timeout", type=float, default=3600)
+    args = parser.parse_args()
+    args.started = int(time.time())
+
+    if args.mode == "engine":
+        bench_engine(args)
+    else:
+        bench_http(args)
+
+
+if __name__ == "__main__":
+    main()